@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+
+set -e
+set -x
+
+uv run python scripts/bench_import.py --check "$@"
+uv run python scripts/bench_hotpaths.py
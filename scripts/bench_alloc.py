@@ -0,0 +1,162 @@
+"""Benchmark the allocations of reading gitmojis.
+
+Compares the `Gitmoji` model, whose derived strings are precomputed and
+interned, with the previous model, which built them in properties on every
+read. Two workloads are measured with `tracemalloc`:
+
+- `questions`: reading `value` and `name` of every gitmoji, as `questions()`
+  does,
+- `classify`: classifying a message and reading the `value` of its gitmoji,
+  as tools rendering large histories do. The parsed messages are kept too,
+  so the allocations of the whole call are counted, not only the read.
+
+Every result is kept alive until the measurement ends, so a string built on
+read counts as an allocation, while a precomputed one doesn't.
+
+Usage:
+    python scripts/bench_alloc.py --repeat 1000
+"""
+
+import argparse
+import sys
+import tracemalloc
+from collections.abc import Sequence
+from typing import Callable, Dict, List
+
+import attrs
+
+from shared.classifier import get_classifier
+from shared.model import Gitmoji
+from shared.registry import get_registry
+
+MESSAGES = [
+    "feat: a feature",
+    "✨ feat(scope): a feature",
+    "🐛  fix!: a breaking fix\n\nwith a body",
+    "docs: some docs",
+]
+
+
+@attrs.define(frozen=True)
+class LegacyGitmoji:
+    """The previous model, building the derived strings on every read."""
+
+    type: str
+    icon: str
+    code: str
+    desc: str
+
+    @property
+    def value(self) -> str:
+        """The value property."""
+        return f"{self.icon} {self.type}"
+
+    @property
+    def name(self) -> str:
+        """The name property."""
+        return f"{self.value}: {self.desc}"
+
+
+def _allocations(func: Callable[[], List[object]]) -> Dict[str, int]:
+    """Return the blocks and bytes allocated by the function and still alive."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        results = func()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    del results
+    return {
+        "blocks": sum(stat.count_diff for stat in stats),
+        "bytes": sum(stat.size_diff for stat in stats),
+    }
+
+
+def measure(repeat: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Measure the allocations per operation of both models.
+
+    Args:
+        repeat: The number of times each workload is run.
+
+    Returns:
+        The blocks and bytes per operation, by workload and model.
+    """
+    registry = get_registry()
+    legacy = [
+        LegacyGitmoji(moji.type, moji.icon, moji.code, moji.desc) for moji in registry
+    ]
+    models: Dict[str, Sequence[object]] = {"current": list(registry), "legacy": legacy}
+    classifier = get_classifier()
+    legacy_by_type = {moji.type: moji for moji in legacy}
+
+    def questions(gitmojis: Sequence[object]) -> Callable[[], List[object]]:
+        def run() -> List[object]:
+            return [
+                (moji.value, moji.name)  # type: ignore[attr-defined]
+                for _ in range(repeat)
+                for moji in gitmojis
+            ]
+
+        return run
+
+    def classify(lookup: Callable[[Gitmoji], object]) -> Callable[[], List[object]]:
+        def run() -> List[object]:
+            results: List[object] = []
+            for _ in range(repeat):
+                for message in MESSAGES:
+                    parsed = classifier.classify(message)
+                    assert parsed is not None
+                    results.append(parsed)
+                    results.append(lookup(parsed.gitmoji))
+            return results
+
+        return run
+
+    workloads = {
+        "questions": (
+            {name: questions(gitmojis) for name, gitmojis in models.items()},
+            repeat * len(registry),
+        ),
+        "classify": (
+            {
+                "current": classify(lambda moji: moji.value),
+                "legacy": classify(lambda moji: legacy_by_type[moji.type].value),
+            },
+            repeat * len(MESSAGES),
+        ),
+    }
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for workload, (funcs, operations) in workloads.items():
+        results[workload] = {}
+        for model, func in funcs.items():
+            allocations = _allocations(func)
+            results[workload][model] = {
+                key: value / operations for key, value in allocations.items()
+            }
+    return results
+
+
+def _get_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=1000, help="runs per workload"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    args = _get_args()
+    for workload, models in measure(args.repeat).items():
+        for model, result in models.items():
+            sys.stdout.write(
+                f"{workload:<10} {model:<8} {result['blocks']:6.2f} blocks/op "
+                f"{result['bytes']:8.1f} bytes/op\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Benchmark the hot paths over synthetic commit messages.
+
+Every benchmark runs a single operation over each message of a synthetic
+corpus, mixing types, icons, scopes, breaking markers, long bodies and invalid
+messages. The operations are:
+
+- `gitmojify`: `gitmojify.mojify.gitmojify`, as run by the hook,
+- `process_commit`: `CommitizenGitmojiCz.process_commit`,
+- `schema_pattern`: matching `schema_pattern()`, as in `cz check`,
+- `commit_parser`: matching `commit_parser`, as in `cz changelog`,
+- `bump_pattern`: searching each line with `bump_pattern`, as in `cz bump`,
+- `changelog_pattern`: matching `changelog_pattern`, as in `cz changelog`.
+
+The results are reported in messages per second and can be written as JSON to
+compare releases.
+
+Usage:
+    python scripts/bench_hotpaths.py --sizes 10000 100000 --output results.json
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# commitizen has to be imported before the plugin, see bench_import.py
+import commitizen.cz  # noqa: F401
+from commitizen.config import BaseConfig
+
+from cz_gitmoji.main import CommitizenGitmojiCz
+from gitmojify.mojify import gitmojify
+from shared.utils import get_gitmojis
+
+DEFAULT_SIZES = [10_000, 100_000]
+WORDS = [
+    "add",
+    "update",
+    "remove",
+    "handle",
+    "parse",
+    "render",
+    "cache",
+    "config",
+    "the",
+    "a",
+    "of",
+    "to",
+    "for",
+    "with",
+    "user",
+    "message",
+    "release",
+    "settings",
+]
+INVALID_MESSAGES = [
+    "unknown: not a type",
+    "feat missing the colon",
+    "feat:missing the space",
+    "✨feat: no space after the icon",
+    "🐛 feat: icon of another type",
+    "",
+    "WIP",
+]
+ALLOWED_PREFIXES = ["Merge", "Revert", "Pull request", "fixup!", "squash!", "amend!"]
+CONVERT_PREFIXES = ["Merge", "Revert", "Squash"]
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    """Return random words."""
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def make_corpus(size: int, seed: int = 0) -> List[str]:
+    """Return synthetic commit messages.
+
+    About 5% of the messages are invalid, 5% start with an allowed prefix and
+    the rest are valid conventional messages, with or without an icon.
+
+    Args:
+        size: The number of messages.
+        seed: The seed of the random number generator.
+
+    Examples:
+        >>> corpus = make_corpus(1000)
+        >>> len(corpus)
+        1000
+        >>> corpus == make_corpus(1000)
+        True
+    """
+    rng = random.Random(seed)
+    gitmojis = get_gitmojis()
+    messages = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.05:
+            messages.append(rng.choice(INVALID_MESSAGES))
+            continue
+        if kind < 0.1:
+            messages.append(f"Merge branch '{rng.choice(WORDS)}' into main")
+            continue
+        moji = rng.choice(gitmojis)
+        icon = rng.choice(["", f"{moji.icon} ", f"{moji.icon}  "])
+        scope = rng.choice(["", "", f"({rng.choice(WORDS)})"])
+        breaking = "!" if rng.random() < 0.05 else ""
+        header = f"{icon}{moji.type}{scope}{breaking}: {_sentence(rng, 6)}"
+        paragraphs = rng.choice([0, 0, 1, 3, 10])
+        body = "".join(
+            f"\n\n{_sentence(rng, rng.randint(10, 60))}" for _ in range(paragraphs)
+        )
+        if breaking and rng.random() < 0.5:
+            body += "\n\nBREAKING CHANGE: it breaks"
+        messages.append(header + body)
+    return messages
+
+
+def _gitmojify(message: str) -> None:
+    """Gitmojify the message like the hook does, ignoring invalid messages."""
+    try:
+        gitmojify(message, ALLOWED_PREFIXES, CONVERT_PREFIXES)
+    except ValueError:
+        pass
+
+
+def _benchmarks(cz: CommitizenGitmojiCz) -> Dict[str, Callable[[str], object]]:
+    """Return the operations to benchmark, compiled like commitizen does."""
+    schema_pattern = re.compile(cz.schema_pattern())
+    commit_parser = re.compile(cz.commit_parser, re.MULTILINE)
+    bump_pattern = re.compile(cz.bump_pattern)
+    changelog_pattern = re.compile(cz.changelog_pattern)
+
+    def bump(message: str) -> None:
+        # commitizen searches every line of the message
+        for line in message.split("\n"):
+            bump_pattern.search(line)
+
+    return {
+        "gitmojify": _gitmojify,
+        "process_commit": cz.process_commit,
+        "schema_pattern": schema_pattern.match,
+        "commit_parser": commit_parser.match,
+        "bump_pattern": bump,
+        "changelog_pattern": changelog_pattern.match,
+    }
+
+
+def _time(func: Callable[[str], object], messages: List[str], repeat: int) -> float:
+    """Return the best time of running the function over all messages."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            func(message)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(
+    sizes: List[int], repeat: int = 3, seed: int = 0
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Run all benchmarks over corpora of the given sizes.
+
+    Args:
+        sizes: The number of messages of each corpus.
+        repeat: The number of runs per benchmark, the best one is reported.
+        seed: The seed of the corpora.
+
+    Returns:
+        The seconds and messages per second, by size and benchmark.
+    """
+    config = BaseConfig()
+    config.settings.update({"name": "cz_gitmoji"})
+    benchmarks = _benchmarks(CommitizenGitmojiCz(config))
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for size in sizes:
+        corpus = make_corpus(size, seed)
+        results[str(size)] = {}
+        for name, func in benchmarks.items():
+            seconds = _time(func, corpus, repeat)
+            results[str(size)][name] = {
+                "seconds": seconds,
+                "messages_per_second": size / seconds,
+            }
+    return results
+
+
+def _get_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="number of messages of each corpus",
+    )
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=3, help="runs per benchmark"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpora")
+    parser.add_argument("-o", "--output", help="write the results to this file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    args = _get_args()
+    results = run_benchmarks(args.sizes, args.repeat, args.seed)
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            sys.stdout.write(
+                f"{size:>8} {name:<20} {result['messages_per_second']:12,.0f} msg/s\n"
+            )
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps(
+                {
+                    "python": sys.version,
+                    "seed": args.seed,
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Benchmark the startup cost of the entry points.
+
+Measures, for the commitizen plugin and the gitmojify hook:
+
+- the cold import time, without any bytecode cache,
+- the warm import time, with the bytecode cache populated,
+- the hook latency, i.e. the wall time of validating or gitmojifying a single
+  message in a fresh process, minus the startup time of a bare interpreter.
+
+Import times are taken from `python -X importtime`, every measurement is the
+median of several runs in fresh processes. The results can be written as JSON
+and checked against the thresholds in `bench_import.json` or a previous run.
+
+Usage:
+    python scripts/bench_import.py --check
+    python scripts/bench_import.py --output new.json --baseline old.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import attrs
+
+HERE = Path(__file__).parent
+DEFAULT_THRESHOLDS = HERE / "bench_import.json"
+MESSAGE = "feat(bench): a message to validate"
+
+
+@attrs.define(frozen=True)
+class EntryPoint:
+    """An entry point whose startup cost is measured."""
+
+    name: str
+    module: str
+    hook_args: List[str]
+    # run before the module is imported, without being measured
+    setup_code: str = ""
+
+    @property
+    def import_code(self) -> str:
+        """Code importing the module."""
+        return f"{self.setup_code}\nimport {self.module}"
+
+
+ENTRY_POINTS = [
+    EntryPoint(
+        name="cz_gitmoji",
+        module="cz_gitmoji.main",
+        hook_args=["-m", "commitizen", "check", "--message", f"✨ {MESSAGE}"],
+        # the plugin can only be imported after commitizen, whose plugin
+        # discovery loads it with importlib, which `-X importtime` doesn't
+        # report. Unload it again to measure a plain import of the plugin.
+        setup_code=(
+            "import sys, commitizen.cz\n"
+            "for name in list(sys.modules):\n"
+            "    if name.partition('.')[0] in ('cz_gitmoji', 'shared'):\n"
+            "        del sys.modules[name]"
+        ),
+    ),
+    EntryPoint(
+        name="gitmojify",
+        module="gitmojify.mojify",
+        hook_args=[
+            "-c",
+            "from gitmojify.mojify import run; run()",
+            "--message",
+            MESSAGE,
+        ],
+    ),
+]
+
+
+def _get_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=10, help="runs per measurement"
+    )
+    parser.add_argument("-o", "--output", help="write the results to this file")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="fail if a result exceeds its threshold",
+    )
+    parser.add_argument(
+        "--thresholds",
+        default=str(DEFAULT_THRESHOLDS),
+        help="JSON file with the maximum milliseconds per result",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="JSON results of a previous run to compare against",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative slowdown compared to the baseline",
+    )
+    return parser.parse_args()
+
+
+def _run(
+    args: List[str], cwd: Path, env: Dict[str, str]
+) -> "subprocess.CompletedProcess[str]":
+    """Run the interpreter with the arguments and fail loudly on errors."""
+    proc = subprocess.run(
+        [sys.executable, *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        msg = f"{args} failed:\n{proc.stdout}{proc.stderr}"
+        raise RuntimeError(msg)
+    return proc
+
+
+def _import_time(stderr: str, module: str) -> float:
+    """Return the cumulative import time of the module in milliseconds."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    msg = f"{module} was not imported"
+    raise LookupError(msg)
+
+
+def _median_import(
+    entry_point: EntryPoint, cwd: Path, env: Dict[str, str], repeat: int
+) -> float:
+    """Return the median import time of the entry point in milliseconds."""
+    return statistics.median(
+        _import_time(
+            _run(["-X", "importtime", "-c", entry_point.import_code], cwd, env).stderr,
+            entry_point.module,
+        )
+        for _ in range(repeat)
+    )
+
+
+def _median_wall(args: List[str], cwd: Path, env: Dict[str, str], repeat: int) -> float:
+    """Return the median wall time of running the interpreter in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(args, cwd, env)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Measure the startup cost of all entry points.
+
+    Args:
+        repeat: The number of runs per measurement.
+
+    Returns:
+        The results in milliseconds, by entry point and measurement.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # run in an empty project, so that the results don't depend on the
+        # config of the working directory
+        project = Path(tmp, "project")
+        project.mkdir()
+        project.joinpath("pyproject.toml").write_text(
+            '[tool.commitizen]\nname = "cz_gitmoji"\n'
+        )
+        warm_env = {**os.environ}
+        # the settings cache would hide the cost of reading them
+        warm_env.pop("GITMOJIFY_CACHE", None)
+        # an empty bytecode cache that is never written to
+        cold_env = {
+            **warm_env,
+            "PYTHONPYCACHEPREFIX": str(Path(tmp, "pycache")),
+            "PYTHONDONTWRITEBYTECODE": "1",
+        }
+        bare = _median_wall(["-c", "pass"], project, warm_env, repeat)
+        for entry_point in ENTRY_POINTS:
+            # populate the bytecode cache
+            _run(["-c", entry_point.import_code], project, warm_env)
+            results[entry_point.name] = {
+                "cold_import_ms": _median_import(
+                    entry_point, project, cold_env, repeat
+                ),
+                "warm_import_ms": _median_import(
+                    entry_point, project, warm_env, repeat
+                ),
+                "hook_ms": _median_wall(
+                    entry_point.hook_args, project, warm_env, repeat
+                )
+                - bare,
+            }
+    return results
+
+
+def _flatten(results: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """Flatten the results to `entry_point.measurement` keys."""
+    return {
+        f"{name}.{key}": value
+        for name, measurements in results.items()
+        for key, value in measurements.items()
+    }
+
+
+def check(
+    results: Dict[str, Dict[str, float]],
+    thresholds: Optional[Dict[str, float]] = None,
+    baseline: Optional[Dict[str, Dict[str, float]]] = None,
+    tolerance: float = 0.25,
+) -> List[str]:
+    """Compare the results with the thresholds and the baseline.
+
+    Args:
+        results: The results of `measure`.
+        thresholds: The maximum milliseconds, by `entry_point.measurement`.
+        baseline: The results of a previous run.
+        tolerance: The allowed relative slowdown compared to the baseline.
+
+    Returns:
+        A description of every regression.
+
+    Examples:
+        >>> check({"gitmojify": {"hook_ms": 90.0}}, {"gitmojify.hook_ms": 80})
+        ['gitmojify.hook_ms: 90.0 ms exceeds the threshold of 80 ms']
+        >>> check({"gitmojify": {"hook_ms": 90.0}}, baseline={"gitmojify": {"hook_ms": 80.0}})
+        []
+    """
+    regressions = []
+    flat = _flatten(results)
+    for key, limit in (thresholds or {}).items():
+        if key in flat and flat[key] > limit:
+            regressions.append(
+                f"{key}: {flat[key]:.1f} ms exceeds the threshold of {limit} ms"
+            )
+    for key, previous in _flatten(baseline or {}).items():
+        if key in flat and flat[key] > previous * (1 + tolerance):
+            regressions.append(
+                f"{key}: {flat[key]:.1f} ms is more than {tolerance:.0%} "
+                f"slower than {previous:.1f} ms"
+            )
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmark."""
+    args = _get_args()
+    results = measure(args.repeat)
+    for key, value in _flatten(results).items():
+        sys.stdout.write(f"{key:<30} {value:8.1f} ms\n")
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({"python": sys.version, "results": results}, indent=2) + "\n"
+        )
+
+    thresholds = None
+    if args.check:
+        thresholds = json.loads(Path(args.thresholds).read_text())
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+    regressions = check(results, thresholds, baseline, args.tolerance)
+    for regression in regressions:
+        sys.stderr.write(f"regression: {regression}\n")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,806 @@
+"""Changelog generation with a persisted per-commit parse cache."""
+
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+import attrs
+from commitizen import changelog, config, factory, git
+from commitizen.changelog_formats import get_changelog_format
+from commitizen.cz.base import BaseCommitizen
+from commitizen.exceptions import GitCommandError
+from commitizen.git import GitCommit, GitTag
+from commitizen.tags import TagRules
+from commitizen.version_schemes import get_version_scheme
+
+from shared import __version__, gitlog
+
+CACHE_FILE_NAME = "cz-gitmoji-changelog.sqlite3"
+# the fields of a changelog entry taken from the commit instead of the cache
+COMMIT_FIELDS = ("sha1", "parents", "author", "author_email")
+# the format of a commit in `git log`, as read by `GitCommit.from_rev_and_commit`
+LOG_FORMAT = "%H%n%P%n%s%n%an%n%ae%n%b"
+# the number of commits parsed and looked up in the cache at once
+PARSE_BATCH_SIZE = 1000
+# an entry of the changelog, as passed to the template
+Entry = Dict[str, Any]
+
+T = TypeVar("T")
+
+
+class CommitParser:
+    """Parse commits into changelog entries the way commitizen does.
+
+    Args:
+        cz: The commitizen rules.
+        change_type_map: Maps change types to changelog sections, the map of
+            the rules if not given.
+    """
+
+    def __init__(
+        self,
+        cz: BaseCommitizen,
+        change_type_map: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        if not cz.commit_parser or not cz.changelog_pattern:
+            msg = f"{type(cz).__name__} does not support changelog"
+            raise ValueError(msg)
+        self._pattern = re.compile(cz.changelog_pattern)
+        self._subject = re.compile(cz.commit_parser, re.MULTILINE)
+        self._body = re.compile(cz.commit_parser, re.MULTILINE | re.DOTALL)
+        self._hook = cz.changelog_message_builder_hook
+        self._change_type_map = change_type_map or cz.change_type_map or {}
+        self.fingerprint = hashlib.sha256(
+            json.dumps(
+                [
+                    __version__,
+                    type(cz).__qualname__,
+                    cz.commit_parser,
+                    cz.changelog_pattern,
+                    sorted(self._change_type_map.items()),
+                ]
+            ).encode()
+        ).hexdigest()
+
+    def parse(self, commit: GitCommit) -> List[Entry]:
+        """Return the changelog entries of a commit.
+
+        The fields taken from the commit, such as the SHA and the author, are
+        left out, so that the entries only depend on the message.
+        """
+        if not self._pattern.match(commit.message):
+            return []
+        entries = []
+        for match in itertools.chain(
+            [self._subject.match(commit.message)],
+            (self._body.match(block) for block in commit.body.split("\n\n")),
+        ):
+            if match is None:
+                continue
+            message: Entry = {**_commit_fields(commit), **match.groupdict()}
+            processed = self._hook(message, commit) if self._hook else message
+            if not processed:
+                continue
+            for entry in [processed] if isinstance(processed, dict) else processed:
+                change_type = entry.get("change_type")
+                if change_type:
+                    entry["change_type"] = self._change_type_map.get(
+                        change_type, change_type
+                    )
+                entries.append(
+                    {k: v for k, v in entry.items() if k not in COMMIT_FIELDS}
+                )
+        return entries
+
+
+def _commit_fields(commit: GitCommit) -> Entry:
+    """Return the fields of an entry taken from the commit."""
+    return {
+        "sha1": commit.rev,
+        "parents": commit.parents,
+        "author": commit.author,
+        "author_email": commit.author_email,
+    }
+
+
+def iter_commits(
+    start: Optional[str] = None,
+    end: str = "HEAD",
+    args: Sequence[str] = (),
+    chunk_size: int = 1 << 16,
+) -> Generator[GitCommit, None, None]:
+    """Generate the commits between two revisions, like `git.get_commits`.
+
+    The log is read while git writes it, so the history is never held in
+    memory at once.
+
+    Args:
+        start: The revision to start after, the whole history if not given.
+        end: The revision to end with.
+        args: Extra arguments of `git log`.
+        chunk_size: The number of bytes read at once.
+
+    Raises:
+        GitCommandError: If git fails.
+    """
+    log_args = [
+        f"--pretty=format:{LOG_FORMAT}",
+        *args,
+        f"{start}..{end}" if start else end,
+    ]
+    records = gitlog.iter_git_log(log_args, chunk_size=chunk_size, errors="replace")
+    # closed at once if the caller stops early, which stops git
+    try:
+        with contextlib.closing(records):
+            for record in records:
+                yield GitCommit.from_rev_and_commit(record)
+    except subprocess.CalledProcessError as exc:
+        raise GitCommandError(exc.stderr.decode(errors="replace")) from exc
+
+
+def _batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Generate lists of consecutive items of at most the given size."""
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+@attrs.define(frozen=True)
+class CachedRelease:
+    """A rendered release of the changelog."""
+
+    tag: str
+    rev: str
+    text: str
+
+
+class ReleaseLog:
+    """The rendered releases of a changelog, stored in a changelog cache.
+
+    New releases are added newest first while they are rendered, and replace
+    or extend the cached ones once saved. Until then, they are kept in a
+    temporary table, so a failed run never leaves partial releases behind.
+
+    Args:
+        connection: The database of the cache.
+        fingerprint: The fingerprint of the rules, template, extras and tag
+            settings.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, fingerprint: str) -> None:
+        self._connection = connection
+        self._fingerprint = fingerprint
+        row = connection.execute(
+            "SELECT tags FROM release_tags WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        # name to rev and date of the version tags the releases were built from
+        self.tags: Optional[Dict[str, List[str]]] = json.loads(row[0]) if row else None
+        (top,) = connection.execute(
+            "SELECT MAX(position) FROM releases WHERE fingerprint = ?",
+            (fingerprint,),
+        ).fetchone()
+        self._top: int = -1 if top is None else top
+        self._cleared = False
+        self._added = 0
+        connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS new_releases ("
+            "position INTEGER NOT NULL, tag TEXT NOT NULL, rev TEXT NOT NULL, "
+            "text TEXT NOT NULL)"
+        )
+        connection.execute("DELETE FROM temp.new_releases")
+
+    @property
+    def latest(self) -> Optional[CachedRelease]:
+        """The newest cached release."""
+        row = self._connection.execute(
+            "SELECT tag, rev, text FROM releases "
+            "WHERE fingerprint = ? AND position = ?",
+            (self._fingerprint, self._top),
+        ).fetchone()
+        return CachedRelease(*row) if row else None
+
+    def __iter__(self) -> Iterator[CachedRelease]:
+        """Iterate over the cached releases, newest first."""
+        rows = self._connection.execute(
+            "SELECT tag, rev, text FROM releases "
+            "WHERE fingerprint = ? AND position <= ? ORDER BY position DESC",
+            (self._fingerprint, self._top),
+        )
+        for row in rows:
+            yield CachedRelease(*row)
+
+    def clear(self) -> None:
+        """Drop the cached releases, once saved."""
+        self.tags = None
+        self._top = -1
+        self._cleared = True
+
+    def add(self, release: CachedRelease) -> None:
+        """Add a release older than the ones added before."""
+        self._connection.execute(
+            "INSERT INTO temp.new_releases VALUES (?, ?, ?, ?)",
+            (self._added, release.tag, release.rev, release.text),
+        )
+        self._added += 1
+
+    def save(self, tags: Mapping[str, List[str]]) -> None:
+        """Store the added releases, built from the given version tags."""
+        with self._connection:
+            if self._cleared:
+                self._connection.execute(
+                    "DELETE FROM releases WHERE fingerprint = ?", (self._fingerprint,)
+                )
+            self._connection.execute(
+                "INSERT INTO releases "
+                "SELECT ?, ? - position, tag, rev, text FROM temp.new_releases",
+                (self._fingerprint, self._top + self._added),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO release_tags VALUES (?, ?)",
+                (self._fingerprint, json.dumps(tags)),
+            )
+            self._connection.execute("DELETE FROM temp.new_releases")
+
+
+class ChangelogCache:
+    """Changelog entries by commit and rendered releases, persisted in SQLite.
+
+    The entries of a commit are stored per fingerprint of the parsing rules, and
+    the rendered releases per fingerprint of the rules, the template, its
+    extras and the tag settings, so that changing any of them never serves
+    stale results.
+
+    Args:
+        path: The database file, created if missing.
+        fingerprint: The fingerprint of the parsing rules.
+    """
+
+    # stay below the number of parameters SQLite allows per statement
+    _BATCH_SIZE = 500
+    # bumped whenever the tables change, older databases are rebuilt
+    _SCHEMA_VERSION = 1
+
+    def __init__(self, path: Union[str, Path], fingerprint: str) -> None:
+        self._fingerprint = fingerprint
+        self._connection = sqlite3.connect(str(path))
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version == self._SCHEMA_VERSION:
+            return
+        with self._connection:
+            for table in ("entries", "releases", "release_tags"):
+                self._connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self._connection.execute(
+                "CREATE TABLE entries ("
+                "fingerprint TEXT NOT NULL, sha TEXT NOT NULL, entries TEXT NOT NULL, "
+                "PRIMARY KEY (fingerprint, sha))"
+            )
+            self._connection.execute(
+                "CREATE TABLE releases ("
+                "fingerprint TEXT NOT NULL, position INTEGER NOT NULL, "
+                "tag TEXT NOT NULL, rev TEXT NOT NULL, text TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX releases_position ON releases (fingerprint, position)"
+            )
+            self._connection.execute(
+                "CREATE TABLE release_tags ("
+                "fingerprint TEXT PRIMARY KEY, tags TEXT NOT NULL)"
+            )
+            self._connection.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def get_entries(self, shas: Sequence[str]) -> Dict[str, List[Entry]]:
+        """Return the cached entries of the commits, by SHA."""
+        found: Dict[str, List[Entry]] = {}
+        for batch in _batched(shas, self._BATCH_SIZE):
+            rows = self._connection.execute(
+                "SELECT sha, entries FROM entries WHERE fingerprint = ? "
+                f"AND sha IN ({', '.join('?' * len(batch))})",
+                (self._fingerprint, *batch),
+            )
+            found.update((sha, json.loads(entries)) for sha, entries in rows)
+        return found
+
+    def put_entries(self, entries: Mapping[str, List[Entry]]) -> None:
+        """Store the entries of the commits, by SHA.
+
+        Commits whose entries can't be stored as JSON, e.g. because a message
+        builder hook added arbitrary objects, are not cached.
+        """
+        rows = []
+        for sha, commit_entries in entries.items():
+            try:
+                rows.append((self._fingerprint, sha, json.dumps(commit_entries)))
+            except (TypeError, ValueError):
+                continue
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", rows
+            )
+
+    def get_release_log(self, fingerprint: str) -> ReleaseLog:
+        """Return the rendered releases stored for the fingerprint."""
+        return ReleaseLog(self._connection, fingerprint)
+
+
+def parse_commits(
+    commits: Sequence[GitCommit],
+    parser: CommitParser,
+    cache: Optional[ChangelogCache] = None,
+) -> Dict[str, List[Entry]]:
+    """Return the changelog entries of the commits, by SHA.
+
+    Only the commits missing from the cache are parsed, and then cached.
+    """
+    parsed = cache.get_entries([commit.rev for commit in commits]) if cache else {}
+    new = {
+        commit.rev: parser.parse(commit)
+        for commit in commits
+        if commit.rev not in parsed
+    }
+    if cache is not None and new:
+        cache.put_entries(new)
+    parsed.update(new)
+    return parsed
+
+
+def _iter_releases(
+    commits: Iterable[GitCommit],
+    tags: Sequence[GitTag],
+    parser: CommitParser,
+    cache: Optional[ChangelogCache] = None,
+    unreleased_version: Optional[str] = None,
+    rules: Optional[TagRules] = None,
+    release_hook: Optional[Any] = None,
+    end_tag: Optional[GitTag] = None,
+) -> Iterator[Tuple[Optional[GitTag], Dict[str, Any]]]:
+    """Generate the releases with the tags they were released with.
+
+    The arguments are those of `generate_tree`. The commits are parsed in
+    batches, so only the entries of the current release are held in memory.
+    When the commits end right before a release, `end_tag` is its tag, which
+    the release hook gets for the last release, as if the history went on.
+    """
+    rules = rules or TagRules()
+    tags_by_rev: Dict[str, GitTag] = {}
+    for tag in tags:
+        tags_by_rev.setdefault(tag.rev, tag)
+
+    current_tag: Optional[GitTag] = None
+    current_tag_name = unreleased_version or "Unreleased"
+    current_tag_date = date.today().isoformat() if unreleased_version else ""
+    used_tags = set()
+    commit_tag: Optional[GitTag] = None
+    changes: Dict[Optional[str], List[Entry]] = defaultdict(list)
+    first = True
+    for batch in _batched(commits, PARSE_BATCH_SIZE):
+        parsed = parse_commits(batch, parser, cache)
+        for commit in batch:
+            commit_tag = tags_by_rev.get(commit.rev)
+            if first:
+                first = False
+                current_tag = commit_tag
+                if current_tag:
+                    used_tags.add(current_tag)
+                    if current_tag.name:
+                        current_tag_name = current_tag.name
+                        current_tag_date = current_tag.date
+            elif (
+                commit_tag
+                and commit_tag not in used_tags
+                and rules.include_in_changelog(commit_tag)
+            ):
+                used_tags.add(commit_tag)
+                release = {
+                    "version": current_tag_name,
+                    "date": current_tag_date,
+                    "changes": changes,
+                }
+                if release_hook:
+                    release = release_hook(release, commit_tag)
+                yield current_tag, release
+                current_tag = commit_tag
+                current_tag_name = commit_tag.name
+                current_tag_date = commit_tag.date
+                changes = defaultdict(list)
+
+            fields = _commit_fields(commit)
+            for entry in parsed[commit.rev]:
+                entry = {**fields, **entry}
+                changes[entry.pop("change_type", None)].append(entry)
+
+    release = {
+        "version": current_tag_name,
+        "date": current_tag_date,
+        "changes": changes,
+    }
+    if release_hook:
+        release = release_hook(release, end_tag or commit_tag)
+    yield current_tag, release
+
+
+def generate_tree(
+    commits: Iterable[GitCommit],
+    tags: Sequence[GitTag],
+    parser: CommitParser,
+    cache: Optional[ChangelogCache] = None,
+    unreleased_version: Optional[str] = None,
+    rules: Optional[TagRules] = None,
+    release_hook: Optional[Any] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Generate the changelog tree, like `commitizen.changelog`.
+
+    Args:
+        commits: The commits, newest first.
+        tags: The version tags.
+        parser: Parses commits into changelog entries.
+        cache: Cache of the entries of previously parsed commits.
+        unreleased_version: The version of the unreleased commits.
+        rules: Decide which tags are part of the changelog.
+        release_hook: The changelog release hook of the rules.
+
+    Yields:
+        The releases, newest first.
+    """
+    for _, release in _iter_releases(
+        commits, tags, parser, cache, unreleased_version, rules, release_hook
+    ):
+        yield release
+
+
+def default_cache_path() -> Path:
+    """Return the cache file inside the git directory of the current project."""
+    return Path(_git("rev-parse", "--git-common-dir").strip(), CACHE_FILE_NAME)
+
+
+def _git(*args: str) -> str:
+    """Return the output of a git command."""
+    return subprocess.run(
+        ["git", *args], capture_output=True, text=True, check=True
+    ).stdout
+
+
+def _is_ancestor(rev: str, of: str = "HEAD") -> bool:
+    """Whether the commit is an ancestor of another one."""
+    return (
+        subprocess.run(
+            ["git", "merge-base", "--is-ancestor", rev, of],
+            capture_output=True,
+            check=False,
+        ).returncode
+        == 0
+    )
+
+
+def _lstrip_newlines(chunks: Iterable[str]) -> Iterator[str]:
+    """Strip the leading newlines of text split into chunks."""
+    leading = True
+    for chunk in chunks:
+        if leading:
+            chunk = chunk.lstrip("\n")
+            leading = not chunk
+        if chunk:
+            yield chunk
+
+
+class ChangelogRenderer:
+    """Render the changelog of the current project, like `cz changelog`.
+
+    Tagged releases never change as long as the tags and the commits they point
+    to stay the same. With a cache, they are rendered once and reused, and only
+    the commits since the newest cached release are read, parsed and rendered.
+    Otherwise, and whenever the tags changed in a way that could affect cached
+    releases, the whole history is rendered.
+
+    Args:
+        cfg: The commitizen config.
+        file_name: The file name of the changelog, which decides its format.
+    """
+
+    def __init__(self, cfg: config.BaseConfig, file_name: Optional[str] = None) -> None:
+        settings = cfg.settings
+        self.cz = factory.committer_factory(cfg)
+        self.parser = CommitParser(self.cz, settings.get("change_type_map"))
+        self.rules = TagRules(
+            scheme=get_version_scheme(settings),
+            tag_format=settings["tag_format"],
+            legacy_tag_formats=settings["legacy_tag_formats"],
+            ignored_tag_formats=settings["ignored_tag_formats"],
+            merge_prereleases=settings["changelog_merge_prerelease"],
+        )
+        self.change_type_order = cast(
+            Optional[List[str]],
+            settings.get("change_type_order") or self.cz.change_type_order,
+        )
+        template_name = (
+            settings.get("template")
+            or get_changelog_format(
+                cfg, file_name or settings["changelog_file"]
+            ).template
+        )
+        self.template = changelog.get_changelog_template(
+            self.cz.template_loader, template_name
+        )
+        self.extras = {
+            "incremental": False,
+            **self.cz.template_extras,
+            **settings["extras"],
+        }
+        template_source = (
+            Path(self.template.filename).read_text(encoding="utf-8")
+            if self.template.filename
+            else template_name
+        )
+        self.releases_fingerprint = hashlib.sha256(
+            json.dumps(
+                [
+                    self.parser.fingerprint,
+                    template_source,
+                    self.extras,
+                    self.change_type_order,
+                    [
+                        settings["tag_format"],
+                        settings["legacy_tag_formats"],
+                        settings["ignored_tag_formats"],
+                        settings["changelog_merge_prerelease"],
+                        settings.get("version_scheme"),
+                    ],
+                ],
+                default=repr,
+            ).encode()
+        ).hexdigest()
+
+    def _render_release(self, release: Dict[str, Any]) -> str:
+        """Render a single release."""
+        tree: Iterable[Dict[str, Any]] = [release]
+        if self.change_type_order:
+            tree = changelog.generate_ordered_changelog_tree(
+                tree, self.change_type_order
+            )
+        return self.template.render(tree=tree, **self.extras)
+
+    def _releases_are_separable(self) -> bool:
+        """Whether the template renders each release on its own.
+
+        Releases can only be cached if the template renders nothing but the
+        releases, as the built-in templates do.
+        """
+        return not self.template.render(tree=[], **self.extras).strip()
+
+    def _cached_releases_are_valid(
+        self, log: ReleaseLog, tags: Mapping[str, List[str]]
+    ) -> bool:
+        """Whether the cached releases are still those of the history."""
+        latest = log.latest
+        if log.tags is None or latest is None:
+            return False
+        # tags of cached releases must not have been removed or moved
+        if any(tags.get(name) != value for name, value in log.tags.items()):
+            return False
+        if not _is_ancestor(latest.rev):
+            return False
+        # tags added since must be on new commits, or they split cached releases
+        new = set(tags) - set(log.tags)
+        return not new or not new.intersection(
+            _git("tag", "--merged", latest.rev).splitlines()
+        )
+
+    def _iter_commits(self, start: Optional[str], stream: bool) -> Iterator[GitCommit]:
+        """Generate the commits since the start, filtered by the rules."""
+        commits = iter_commits(start, args=["--topo-order"])
+        if not stream:
+            return iter(self.cz.filter_commits_before_changelog(list(commits)))
+        return itertools.chain.from_iterable(
+            self.cz.filter_commits_before_changelog(batch)
+            for batch in _batched(commits, PARSE_BATCH_SIZE)
+        )
+
+    def iter_render(
+        self,
+        unreleased_version: Optional[str] = None,
+        cache: Optional[ChangelogCache] = None,
+        stream: bool = False,
+    ) -> Iterator[str]:
+        """Render the changelog, one release at a time.
+
+        Each release is generated as soon as it is complete. If the rules have
+        a changelog hook, it needs the whole changelog, which is then
+        generated at once.
+
+        Args:
+            unreleased_version: The version of the unreleased commits.
+            cache: The cache of parsed commits and rendered releases.
+            stream: Read the history while rendering it, so that only one
+                release is held in memory. The commits are then filtered in
+                batches rather than all at once.
+        """
+        chunks = _lstrip_newlines(self._iter_render(unreleased_version, cache, stream))
+        if self.cz.changelog_hook:
+            yield self.cz.changelog_hook("".join(chunks), None)
+        else:
+            yield from chunks
+
+    def _iter_render(
+        self,
+        unreleased_version: Optional[str],
+        cache: Optional[ChangelogCache],
+        stream: bool,
+    ) -> Iterator[str]:
+        """Render the releases, the new ones first, then the cached ones."""
+        tags = self.rules.get_version_tags(git.get_tags(), warn=True)
+        tag_state = {tag.name: [tag.rev, tag.date] for tag in tags}
+        log = None
+        if cache is not None and self._releases_are_separable():
+            log = cache.get_release_log(self.releases_fingerprint)
+            if not self._cached_releases_are_valid(log, tag_state):
+                log.clear()
+        latest = log.latest if log else None
+        end_tag = (
+            next((tag for tag in tags if tag.name == latest.tag), None)
+            if latest
+            else None
+        )
+
+        commits = self._iter_commits(latest.rev if latest else None, stream)
+        first = next(commits, None)
+        if first is not None or latest is None:
+            for tag, release in _iter_releases(
+                itertools.chain([first] if first else [], commits),
+                tags,
+                self.parser,
+                cache,
+                unreleased_version,
+                self.rules,
+                self.cz.changelog_release_hook,
+                end_tag,
+            ):
+                text = self._render_release(release)
+                if log is not None and tag is not None:
+                    log.add(CachedRelease(tag.name, tag.rev, text))
+                yield text
+        if log is not None:
+            log.save(tag_state)
+            yield from (release.text for release in log)
+
+    def render(
+        self,
+        unreleased_version: Optional[str] = None,
+        cache: Optional[ChangelogCache] = None,
+        stream: bool = False,
+    ) -> str:
+        """Render the changelog.
+
+        Args:
+            unreleased_version: The version of the unreleased commits.
+            cache: The cache of parsed commits and rendered releases.
+            stream: Read the history while rendering it.
+        """
+        return "".join(self.iter_render(unreleased_version, cache, stream))
+
+
+def _write(path: Path, chunks: Iterable[str], encoding: str) -> None:
+    """Write the chunks to the file, replacing it only once complete."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as file:
+            file.writelines(chunks)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _get_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="generate the changelog, reusing previously parsed commits"
+    )
+    parser.add_argument("--file-name", help="file name of the changelog")
+    parser.add_argument(
+        "--unreleased-version", help="version of the unreleased commits"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the changelog instead of writing it",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read the history while rendering it, to bound memory on large "
+        "repositories",
+    )
+    parser.add_argument(
+        "--cache-file", help=f"cache file, .git/{CACHE_FILE_NAME} by default"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="parse all commits again"
+    )
+    return parser.parse_args(argv)
+
+
+def generate_changelog(
+    cfg: config.BaseConfig,
+    file_name: Optional[str] = None,
+    unreleased_version: Optional[str] = None,
+    cache_path: Optional[Path] = None,
+    stream: bool = False,
+    dry_run: bool = False,
+) -> Optional[Path]:
+    """Generate the changelog of the current project.
+
+    Args:
+        cfg: The commitizen config.
+        file_name: The changelog file, the configured one if not given.
+        unreleased_version: The version of the unreleased commits.
+        cache_path: The cache of parsed commits and rendered releases, none is
+            used if not given.
+        stream: Read the history while rendering it.
+        dry_run: Print the changelog instead of writing it.
+
+    Returns:
+        The changelog file written, if any.
+    """
+    file_name = file_name or cfg.settings["changelog_file"]
+    renderer = ChangelogRenderer(cfg, file_name)
+    cache = (
+        ChangelogCache(cache_path, renderer.parser.fingerprint) if cache_path else None
+    )
+    try:
+        chunks = renderer.iter_render(unreleased_version, cache, stream)
+        if dry_run:
+            sys.stdout.writelines(chunks)
+            return None
+        path = Path(file_name)
+        if cfg.path is not None:
+            path = Path(cfg.path).parent / path
+        _write(path, chunks, cfg.settings["encoding"])
+        return path
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Generate the changelog, only parsing commits not seen before."""
+    args = _get_args(argv)
+    cache_path = None
+    if not args.no_cache:
+        cache_path = Path(args.cache_file) if args.cache_file else default_cache_path()
+    generate_changelog(
+        config.read_cfg(),
+        args.file_name,
+        args.unreleased_version,
+        cache_path,
+        args.stream,
+        args.dry_run,
+    )
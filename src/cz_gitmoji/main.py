@@ -3,19 +3,38 @@
 __all__ = ("CommitizenGitmojiCz",)
 
 
-import re
 from collections import OrderedDict
 from collections.abc import Mapping
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Dict, List, Optional, Tuple, cast
 
+from commitizen.config import BaseConfig
 from commitizen.cz.base import BaseCommitizen
 from commitizen.cz.utils import multiple_line_breaker, required_validator
 from commitizen.defaults import MAJOR, MINOR, PATCH
+from commitizen.git import GitCommit
 from commitizen.question import CzQuestion
 
+from cz_gitmoji import bump, sections
 from shared import utils
+from shared.classifier import get_classifier
 from shared.gitmojis import GitmojiEnum as GJ  # noqa: N814
+from shared.registry import get_registry
+from shared.settings import CONVENTIONAL_TYPES
+from shared.shortcodes import get_translator
+
+
+def _icon(member: GJ) -> str:
+    """Return the pattern of the optional icon of a gitmoji, or its shortcode."""
+    return f"(?:{member}?|{get_registry().from_enum(member).code})"
+
+
+def _commit_parser(types: Optional[Tuple[str, ...]] = None) -> str:
+    """Return the pattern parsing the messages of a gitmoji set for the changelog."""
+    return (
+        rf"^(?P<change_type>{get_classifier(types).spelling_pattern}|BREAKING CHANGE)"
+        r"(?:\((?P<scope>[^()\r\n]*)\)|\()?(?P<breaking>!)?:\s(?P<message>.*)?"
+    )
 
 
 def parse_scope(text: str) -> str:
@@ -40,12 +59,12 @@ class CommitizenGitmojiCz(BaseCommitizen):
     # if none of these match, version will not be bumped (unless manually specified)
     bump_pattern = (
         rf"^((BREAKING[\-\ ]CHANGE"
-        rf"|{GJ.BOOM}? ?boom"
-        rf"|{GJ.FEAT}? ?feat"
-        rf"|{GJ.FIX}? ?fix"
-        rf"|{GJ.HOTFIX}? ?hotfix"
-        rf"|{GJ.REFACTOR}? +refactor"
-        rf"|{GJ.PERF}? ?perf)"
+        rf"|{_icon(GJ.BOOM)} ?boom"
+        rf"|{_icon(GJ.FEAT)} ?feat"
+        rf"|{_icon(GJ.FIX)} ?fix"
+        rf"|{_icon(GJ.HOTFIX)} ?hotfix"
+        rf"|{_icon(GJ.REFACTOR)} +refactor"
+        rf"|{_icon(GJ.PERF)} ?perf)"
         r"(\(.+\))?"  # scope
         r"!?):"  # breaking
     )
@@ -54,34 +73,33 @@ class CommitizenGitmojiCz(BaseCommitizen):
         (
             (r"^.+!$", MAJOR),
             (r"^BREAKING[\-\ ]CHANGE", MAJOR),
-            (rf"^{GJ.BOOM}? ?boom", MAJOR),
-            (rf"^{GJ.FEAT}? ?feat", MINOR),
-            (rf"^{GJ.FIX}? ?fix", PATCH),
-            (rf"^{GJ.HOTFIX}? ?hotfix", PATCH),
-            (rf"^{GJ.REFACTOR}? ?refactor", PATCH),
-            (rf"^{GJ.PERF}? ?perf", PATCH),
+            (rf"^{_icon(GJ.BOOM)} ?boom", MAJOR),
+            (rf"^{_icon(GJ.FEAT)} ?feat", MINOR),
+            (rf"^{_icon(GJ.FIX)} ?fix", PATCH),
+            (rf"^{_icon(GJ.HOTFIX)} ?hotfix", PATCH),
+            (rf"^{_icon(GJ.REFACTOR)} ?refactor", PATCH),
+            (rf"^{_icon(GJ.PERF)} ?perf", PATCH),
         )
     )
     bump_map_major_version_zero = OrderedDict(
         (
             (r"^.+!$", MINOR),
             (r"^BREAKING[\-\ ]CHANGE", MINOR),
-            (rf"^{GJ.BOOM}? ?boom", MINOR),
-            (rf"^{GJ.FEAT}? ?feat", MINOR),
-            (rf"^{GJ.FIX}? ?fix", PATCH),
-            (rf"^{GJ.HOTFIX}? ?hotfix", PATCH),
-            (rf"^{GJ.REFACTOR}? ?refactor", PATCH),
-            (rf"^{GJ.PERF}? ?perf", PATCH),
+            (rf"^{_icon(GJ.BOOM)} ?boom", MINOR),
+            (rf"^{_icon(GJ.FEAT)} ?feat", MINOR),
+            (rf"^{_icon(GJ.FIX)} ?fix", PATCH),
+            (rf"^{_icon(GJ.HOTFIX)} ?hotfix", PATCH),
+            (rf"^{_icon(GJ.REFACTOR)} ?refactor", PATCH),
+            (rf"^{_icon(GJ.PERF)} ?perf", PATCH),
         )
     )
     # parse information for generating the change log
-    commit_parser = (
-        rf"^(?P<change_type>{utils.get_type_group_pattern()}|BREAKING CHANGE)"
-        r"(?:\((?P<scope>[^()\r\n]*)\)|\()?(?P<breaking>!)?:\s(?P<message>.*)?"
-    )
+    commit_parser = _commit_parser()
     # exclude from changelog
     changelog_pattern = (
-        rf"^(?!{GJ.INIT}? ?init)(?!{GJ.MERGE}? ?merge)(?!{GJ.BUMP}? ?bump).*"
+        rf"^(?!{_icon(GJ.INIT)} ?init)"
+        rf"(?!{_icon(GJ.MERGE)} ?merge)"
+        rf"(?!{_icon(GJ.BUMP)} ?bump).*"
     )
     # map types to changelog sections
     change_type_map = {
@@ -183,9 +201,9 @@ class CommitizenGitmojiCz(BaseCommitizen):
         f"{GJ.BEER} beer": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
         f"{GJ.TEXT} text": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
         f"{GJ.EGG} egg": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
-        f"{GJ.SEED} egg": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
-        f"{GJ.FLAG} egg": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
-        f"{GJ.CATCH} egg": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
+        f"{GJ.SEED} seed": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
+        f"{GJ.FLAG} flag": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
+        f"{GJ.CATCH} catch": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
         f"{GJ.HEALTH} health": f"{GJ.SECRET}{GJ.WIP}{GJ.ANALYTICS}{GJ.TYPO}{GJ.POOP}{GJ.EXTERNAL}{GJ.BEER}{GJ.TEXT}{GJ.EGG}{GJ.SEED}{GJ.FLAG}{GJ.CATCH}{GJ.HEALTH} Others",
         # None: init, bump, merge
     }
@@ -199,6 +217,20 @@ class CommitizenGitmojiCz(BaseCommitizen):
         f"{GJ.PERF} Performance",
     ]
 
+    def __init__(self, config: BaseConfig) -> None:
+        super().__init__(config)
+        settings = self.config.settings
+        # the reduced gitmoji set and the tables built for it are cached per set
+        self._types = (
+            CONVENTIONAL_TYPES if settings.get("conventional_types_only") else None
+        )
+        self._conventional_messages = bool(settings.get("conventional_messages"))
+        if self._types is not None:
+            self.commit_parser = _commit_parser(self._types)
+        self._sections = sections.get_section_table(
+            self.config.settings.get("change_type_map") or self.change_type_map
+        )
+
     def questions(self) -> List[CzQuestion]:
         """Return the questions to ask the user."""
         return [
@@ -211,7 +243,7 @@ class CommitizenGitmojiCz(BaseCommitizen):
                         "value": moji.value,
                         "name": moji.name,
                     }
-                    for moji in utils.get_gitmojis()
+                    for moji in get_registry(self._types)
                 ],
             },
             {
@@ -281,13 +313,20 @@ class CommitizenGitmojiCz(BaseCommitizen):
         if time:
             time = f" >>> {time}"
 
+        if self._conventional_messages:
+            # the gitmoji starts the subject, e.g. `feat: ✨ add x`
+            icon, _, prefix = prefix.rpartition(" ")
+            if icon:
+                subject = f"{icon} {subject}"
+
         prefix_scope = f"{prefix}{scope}"
         if is_breaking_change:
             prefix_scope = f"{prefix_scope}!"
 
         message = f"{prefix_scope}: {subject}{time}{body}{footer}"
 
-        return message
+        gitmoji_format = cast(Optional[str], self.config.settings.get("gitmoji_format"))
+        return get_translator().normalize(message, gitmoji_format)
 
     def example(self) -> str:
         """Return an example commit message."""
@@ -312,7 +351,7 @@ class CommitizenGitmojiCz(BaseCommitizen):
     # pattern to validate commits
     def schema_pattern(self) -> str:
         """Return the schema validation pattern."""
-        return utils.get_pattern()
+        return utils.get_pattern(self._types, self._conventional_messages)
 
     def info(self) -> str:
         """Return information about the commit message style."""
@@ -323,10 +362,51 @@ class CommitizenGitmojiCz(BaseCommitizen):
             content = f.read()
         return content
 
+    def filter_commits_before_bump(self, commits: List[GitCommit]) -> List[GitCommit]:
+        """Select the commits that decide the version increment.
+
+        Commitizen matches every commit against the bump pattern and each rule
+        of the bump map. Instead, the commits are classified in a single pass,
+        stopping at the first one with the highest increment, and only that one
+        is left for commitizen to evaluate. Commitizen calls this hook from
+        version 4.19 on. Earlier versions evaluate every commit, which gives
+        the same increment without the speedup.
+        """
+        # the hook of the base class is missing before commitizen 4.19
+        parent = getattr(super(), "filter_commits_before_bump", None)
+        if parent is not None:
+            commits = parent(commits)
+        return bump.select_decisive_commits(
+            commits,
+            self.bump_pattern,
+            (self.bump_map, self.bump_map_major_version_zero),
+        )
+
+    def filter_commits_before_changelog(
+        self, commits: List[GitCommit]
+    ) -> List[GitCommit]:
+        """Select the commits of the changelog, all of them before commitizen 4.19."""
+        parent = getattr(super(), "filter_commits_before_changelog", None)
+        return commits if parent is None else parent(commits)
+
+    def changelog_message_builder_hook(
+        self, message: Dict[str, Any], commit: GitCommit
+    ) -> Dict[str, Any]:
+        """Normalize the change type of a parsed message.
+
+        Every spelling of a type group is mapped to the key of its gitmoji in
+        the change type map, so all of them land in the same section.
+        """
+        change_type = message.get("change_type")
+        if change_type:
+            message["change_type"] = self._sections.normalize(change_type)
+        return message
+
     def process_commit(self, commit: str) -> str:
         """Process a commit."""
-        pat = self.schema_pattern()
-        m = re.match(pat, commit)
-        if m is None:
+        parsed = get_classifier(self._types, self._conventional_messages).classify(
+            commit
+        )
+        if parsed is None:
             return ""
-        return m.group("subject").strip()
+        return parsed.subject.strip()
@@ -0,0 +1,272 @@
+"""Changelog and bump reports over many repositories."""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Sequence, Union, cast
+
+import attrs
+from commitizen import config, git
+from commitizen.changelog import generate_ordered_changelog_tree
+from commitizen.providers import get_provider
+from commitizen.tags import TagRules
+from commitizen.version_schemes import Increment, get_version_scheme
+
+from cz_gitmoji import bump, changelog
+from cz_gitmoji.main import CommitizenGitmojiCz
+from shared.utils import non_negative_int
+
+
+@attrs.define(frozen=True)
+class InvalidCommit:
+    """A commit whose message doesn't follow the convention."""
+
+    sha: str
+    title: str
+
+
+@attrs.define(frozen=True)
+class RepositoryReport:
+    """The upcoming release of a repository."""
+
+    path: str
+    current_version: Optional[str] = None
+    increment: Optional[str] = None
+    next_version: Optional[str] = None
+    # the entries of the upcoming release, by changelog section
+    sections: Dict[str, List[Dict[str, Any]]] = attrs.field(factory=dict)
+    invalid_commits: List[InvalidCommit] = attrs.field(factory=list)
+    # the changelog file written, if any
+    changelog: Optional[str] = None
+    error: Optional[str] = None
+
+
+@contextlib.contextmanager
+def _chdir(path: Union[str, Path]) -> Iterator[None]:
+    """Change the working directory for the duration of the context."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _sections(
+    cz: CommitizenGitmojiCz,
+    commits: Sequence[git.GitCommit],
+    cfg: config.BaseConfig,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Return the changelog entries of the commits, by section."""
+    parser = changelog.CommitParser(cz, cfg.settings.get("change_type_map"))
+    tree = changelog.generate_tree(commits, [], parser)
+    order = cfg.settings.get("change_type_order") or cz.change_type_order
+    if order:
+        tree = generate_ordered_changelog_tree(tree, cast(List[str], order))
+    (release,) = tree
+    return {
+        section: [
+            {
+                "sha": entry["sha1"],
+                "scope": entry.get("scope"),
+                "message": entry.get("message"),
+                "breaking": bool(entry.get("breaking")),
+            }
+            for entry in entries
+        ]
+        for section, entries in release["changes"].items()
+        if section
+    }
+
+
+def _invalid_commits(
+    cz: CommitizenGitmojiCz,
+    commits: Sequence[git.GitCommit],
+    cfg: config.BaseConfig,
+) -> List[InvalidCommit]:
+    """Return the commits `cz check` would reject."""
+    # compiled as `cz check` does, for the gitmoji set and mode of the project
+    pattern = re.compile(cz.schema_pattern())
+    return [
+        InvalidCommit(commit.rev, commit.title)
+        for commit in commits
+        if not _is_valid(cz, commit, pattern, cfg)
+    ]
+
+
+def _is_valid(
+    cz: CommitizenGitmojiCz,
+    commit: git.GitCommit,
+    pattern: Pattern[str],
+    cfg: config.BaseConfig,
+) -> bool:
+    """Return whether `cz check` accepts the message of the commit."""
+    allowed_prefixes = cfg.settings["allowed_prefixes"]
+    if not hasattr(cz, "validate_commit_message"):
+        # commitizen before 4.11 validates in `cz check` itself
+        if not commit.message:
+            return bool(cfg.settings["allow_abort"])
+        if any(map(commit.message.startswith, allowed_prefixes)):
+            return True
+        return bool(pattern.match(commit.message))
+    return cz.validate_commit_message(
+        commit_msg=commit.message,
+        pattern=pattern,
+        allow_abort=cfg.settings["allow_abort"],
+        allowed_prefixes=allowed_prefixes,
+        max_msg_length=None,
+        commit_hash=commit.rev,
+    ).is_valid
+
+
+def report_repository(
+    path: Union[str, Path],
+    write_changelog: bool = False,
+    stream: bool = False,
+) -> RepositoryReport:
+    """Report the upcoming release of a repository.
+
+    The commits since the tag of the current version are classified with the
+    rules of `CommitizenGitmojiCz`, as `cz bump` and `cz changelog` would.
+
+    Args:
+        path: The root of the repository.
+        write_changelog: Also regenerate the changelog file of the repository,
+            reusing its changelog cache.
+        stream: Read the history while rendering the changelog.
+
+    Returns:
+        The report. Errors don't raise but are reported.
+    """
+    try:
+        # commitizen prints warnings to stdout, which is where the report goes
+        with _chdir(path), contextlib.redirect_stdout(sys.stderr):
+            return _report(str(path), write_changelog, stream)
+    except Exception as exc:  # noqa: BLE001
+        return RepositoryReport(str(path), error=f"{type(exc).__name__}: {exc}")
+
+
+def _report(path: str, write_changelog: bool, stream: bool) -> RepositoryReport:
+    """Report the upcoming release of the repository in the working directory."""
+    cfg = config.read_cfg()
+    settings = cfg.settings
+    cz = CommitizenGitmojiCz(cfg)
+    scheme = get_version_scheme(settings)
+    current = scheme(get_provider(cfg).get_version())
+    rules = TagRules.from_settings(settings)
+    current_tag = rules.find_tag_for(git.get_tags(), current)
+    commits = list(changelog.iter_commits(current_tag.name if current_tag else None))
+
+    major_version_zero = settings["major_version_zero"] and current.major == 0
+    bump_map = cz.bump_map_major_version_zero if major_version_zero else cz.bump_map
+    increment = bump.find_increment(
+        (commit.message for commit in cz.filter_commits_before_bump(commits)),
+        cz.bump_pattern,
+        bump_map,
+    )
+    changelog_file = None
+    if write_changelog:
+        changelog_file = changelog.generate_changelog(
+            cfg, cache_path=changelog.default_cache_path(), stream=stream
+        )
+    return RepositoryReport(
+        path,
+        current_version=str(current),
+        increment=increment,
+        next_version=(
+            str(current.bump(cast(Increment, increment))) if increment else None
+        ),
+        sections=_sections(cz, cz.filter_commits_before_changelog(commits), cfg),
+        invalid_commits=_invalid_commits(cz, commits, cfg),
+        changelog=str(changelog_file.resolve()) if changelog_file else None,
+    )
+
+
+def report_repositories(
+    paths: Sequence[Union[str, Path]],
+    jobs: Optional[int] = None,
+    write_changelog: bool = False,
+    stream: bool = False,
+) -> List[RepositoryReport]:
+    """Report the upcoming release of many repositories in a pool of processes.
+
+    Args:
+        paths: The roots of the repositories.
+        jobs: The number of processes, one per CPU if not given. With a single
+            job, the repositories are processed in the current process.
+        write_changelog: Also regenerate the changelog file of each repository.
+        stream: Read the history while rendering the changelogs.
+
+    Returns:
+        A report per repository, in the order the paths were given.
+    """
+    jobs = min(jobs or os.cpu_count() or 1, len(paths) or 1)
+    if jobs == 1:
+        return [report_repository(path, write_changelog, stream) for path in paths]
+    # imported here to keep it off the single-job path
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(
+                report_repository,
+                paths,
+                [write_changelog] * len(paths),
+                [stream] * len(paths),
+            )
+        )
+
+
+def _get_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="report the next version, changelog sections and invalid "
+        "commits of many repositories"
+    )
+    parser.add_argument("paths", nargs="+", help="roots of the repositories")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=non_negative_int,
+        default=0,
+        help="number of processes, 0 for one per CPU",
+    )
+    parser.add_argument(
+        "-o", "--output", help="file the JSON report is written to, stdout if not given"
+    )
+    parser.add_argument(
+        "--write-changelog",
+        action="store_true",
+        help="also regenerate the changelog file of each repository",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read the history while rendering the changelogs",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Write the JSON report of the repositories.
+
+    Exits with 1 if any repository could not be processed.
+    """
+    args = _get_args(argv)
+    paths = [os.path.abspath(path) for path in args.paths]
+    reports = report_repositories(paths, args.jobs, args.write_changelog, args.stream)
+    content = json.dumps(
+        {"repositories": [attrs.asdict(report) for report in reports]},
+        ensure_ascii=False,
+        indent=2,
+    )
+    if args.output:
+        Path(args.output).write_text(content + "\n", encoding="utf-8")
+    else:
+        sys.stdout.write(content + "\n")
+    if any(report.error for report in reports):
+        sys.exit(1)
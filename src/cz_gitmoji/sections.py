@@ -0,0 +1,78 @@
+"""Changelog section lookup."""
+
+import functools
+from typing import Dict, Mapping, Tuple
+
+from shared.registry import GitmojiRegistry, get_registry
+
+
+class SectionTable:
+    """Map every spelling of a change type to its changelog section.
+
+    The keys of a change type map are exact spellings, e.g. `♻️ refactor`,
+    while commit messages may spell the same type group with an icon variant,
+    with two spaces after the icon or without icon. The table maps every
+    spelling to the key of its gitmoji once, so normalizing a parsed change
+    type is a dictionary lookup.
+
+    Args:
+        change_type_map: Maps change types to changelog sections.
+        registry: The gitmojis whose spellings are recognized.
+
+    Examples:
+        >>> table = SectionTable({"✨ feat": "Features"}, get_registry())
+        >>> table.normalize("feat")
+        '✨ feat'
+        >>> table.section("✨  feat")
+        'Features'
+        >>> table.normalize("BREAKING CHANGE")
+        'BREAKING CHANGE'
+    """
+
+    def __init__(
+        self, change_type_map: Mapping[str, str], registry: GitmojiRegistry
+    ) -> None:
+        spellings = registry.spellings
+        # the first key of each gitmoji wins, as with an exact lookup
+        keys: Dict[str, str] = {}
+        for key in change_type_map:
+            moji = spellings.get(key)
+            if moji is not None:
+                keys.setdefault(moji.type, key)
+        # gitmojis without key are normalized to their value
+        self._keys = {
+            spelling: keys.get(moji.type, moji.value)
+            for spelling, moji in spellings.items()
+        }
+        self._sections = {
+            spelling: change_type_map.get(key, key)
+            for spelling, key in self._keys.items()
+        }
+        # keys that aren't type groups, e.g. `BREAKING CHANGE`
+        for key, section in change_type_map.items():
+            self._sections.setdefault(key, section)
+
+    def normalize(self, change_type: str) -> str:
+        """Return the key of the change type map for a spelling of a change type.
+
+        Unknown change types are returned as is.
+        """
+        return self._keys.get(change_type, change_type)
+
+    def section(self, change_type: str) -> str:
+        """Return the changelog section of any spelling of a change type.
+
+        Change types without section are their own section, as in commitizen.
+        """
+        return self._sections.get(change_type, change_type)
+
+
+@functools.cache
+def _get_section_table(items: Tuple[Tuple[str, str], ...]) -> SectionTable:
+    """Return the section table of a change type map, built once."""
+    return SectionTable(dict(items), get_registry())
+
+
+def get_section_table(change_type_map: Mapping[str, str]) -> SectionTable:
+    """Return the section table of a change type map, built once per process."""
+    return _get_section_table(tuple(change_type_map.items()))
@@ -0,0 +1,407 @@
+"""Rewrite legacy commit messages into the conventional gitmoji format."""
+
+import argparse
+import functools
+import re
+import sys
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
+
+import attrs
+
+from gitmojify.mojify import get_run_settings
+from shared.classifier import TypeClassifier, get_classifier
+from shared.gitlog import read_messages
+from shared.model import Gitmoji
+from shared.registry import GitmojiRegistry, get_registry, icon_variants
+
+# words standing for a type, replaced by the type
+ALIASES = {
+    "bug": "fix",
+    "bugfix": "fix",
+    "feature": "feat",
+    "doc": "docs",
+    "documentation": "docs",
+    "tests": "test",
+    "performance": "perf",
+    "format": "style",
+    "formatting": "style",
+    "lint": "fix-lint",
+    "cleanup": "chore",
+    "release": "bump",
+    "version": "bump",
+    "configuration": "config",
+    "i18n": "lang",
+    "deps": "dep-bump",
+}
+# verbs hinting at a type, kept as the first word of the subject
+VERBS = {
+    "add": "feat",
+    "create": "feat",
+    "implement": "feat",
+    "introduce": "feat",
+    "support": "feat",
+    "correct": "fix",
+    "repair": "fix",
+    "resolve": "fix",
+    "remove": "dump",
+    "delete": "dump",
+    "drop": "dump",
+    "move": "resource",
+    "rename": "resource",
+    "optimize": "perf",
+    "upgrade": "dep-bump",
+    "downgrade": "dep-drop",
+    "document": "docs",
+}
+# suffixes of inflected words, e.g. `fixes` or `added`
+SUFFIXES = ("s", "es", "d", "ed", "ing")
+# the shortest unambiguous prefix of a type or alias that is recognized
+MIN_PREFIX_LENGTH = 3
+
+# rules, from the most to the least confident
+VALID = "valid"
+ALLOWED = "allowed"
+TYPE = "type"
+ICON = "icon"
+ALIAS = "alias"
+INFLECTION = "inflection"
+PREFIX = "prefix"
+VERB = "verb"
+CONFLICT = "conflict"
+
+CONFIDENCE = {
+    VALID: 1.0,
+    ALLOWED: 1.0,
+    TYPE: 0.9,
+    ICON: 0.9,
+    ALIAS: 0.8,
+    INFLECTION: 0.7,
+    PREFIX: 0.6,
+    VERB: 0.5,
+    CONFLICT: 0.4,
+}
+
+_HEADER = re.compile(
+    r"\s*(?P<icon>:[\w+-]+:|[^\w\s:(\[-]+)?\s*"
+    r"(?P<token>\[(?P<bracketed>[^\]\s]+)\]|(?P<word>[^\W\d_][\w-]*))?"
+    r"(?:\((?P<scope>[^()\s]+)\))?(?P<bang>!)?"
+    r"\s*(?P<sep>[:|>–—-]+|\s)?\s*(?P<subject>.*)"
+)
+
+
+@attrs.define(frozen=True)
+class Rule:
+    """A rule of the dispatch table."""
+
+    gitmoji: Gitmoji
+    name: str
+    # whether the word is replaced by the type, rather than kept in the subject
+    consumes: bool = True
+
+    @property
+    def confidence(self) -> float:
+        """How likely the rewrite by this rule is correct."""
+        return CONFIDENCE[self.name]
+
+
+@attrs.define(frozen=True)
+class Rewrite:
+    """The result of rewriting a single message."""
+
+    message: str
+    rewritten: Optional[str] = None
+    rule: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the message was rewritten into a valid message."""
+        return self.rewritten is not None
+
+    @property
+    def confidence(self) -> float:
+        """How likely the rewrite is correct, 0 if there is none."""
+        return CONFIDENCE[self.rule] if self.rule is not None else 0.0
+
+
+def _inflections(word: str) -> Iterator[str]:
+    """Generate the inflected forms of a word."""
+    for suffix in SUFFIXES:
+        yield word + suffix
+        if word.endswith("e"):
+            yield word[:-1] + suffix
+
+
+def build_dispatch_table(
+    registry: GitmojiRegistry,
+    aliases: Mapping[str, str] = ALIASES,
+    verbs: Mapping[str, str] = VERBS,
+) -> Dict[str, Rule]:
+    """Compile the rules into a table keyed by the lowercase word or the icon.
+
+    Every spelling a rule recognizes, i.e. types, icons, shortcodes, aliases,
+    verbs, their inflections and the unambiguous prefixes of types and aliases,
+    is a key of the table, so finding the rule of a word is a single lookup.
+    When several rules recognize a word, the most confident one wins.
+
+    Args:
+        registry: The gitmojis messages are rewritten to.
+        aliases: Maps words to the type they stand for.
+        verbs: Maps verbs to the type they hint at.
+    """
+    words = {moji.type: moji for moji in registry}
+    words.update(
+        (alias, registry.by_type[gtype])
+        for alias, gtype in aliases.items()
+        if gtype in registry.by_type
+    )
+    hints = {
+        verb: registry.by_type[gtype]
+        for verb, gtype in verbs.items()
+        if gtype in registry.by_type
+    }
+    table: Dict[str, Rule] = {}
+    for moji in registry:
+        table[moji.type] = Rule(moji, TYPE)
+        table.setdefault(moji.code, Rule(moji, ICON))
+        for icon in icon_variants(moji.icon):
+            table.setdefault(icon, Rule(moji, ICON))
+    for alias, moji in words.items():
+        table.setdefault(alias, Rule(moji, ALIAS))
+    for word, moji in words.items():
+        for inflection in _inflections(word):
+            table.setdefault(inflection, Rule(moji, INFLECTION))
+    prefixes: Dict[str, Gitmoji] = {}
+    ambiguous: Set[str] = set()
+    for word, moji in words.items():
+        for end in range(MIN_PREFIX_LENGTH, len(word)):
+            prefix = word[:end]
+            if prefixes.setdefault(prefix, moji) != moji:
+                ambiguous.add(prefix)
+    for prefix, moji in prefixes.items():
+        if prefix not in ambiguous:
+            table.setdefault(prefix, Rule(moji, PREFIX))
+    for verb, moji in hints.items():
+        for spelling in (verb, *_inflections(verb)):
+            table.setdefault(spelling, Rule(moji, VERB, consumes=False))
+    return table
+
+
+class Autofixer:
+    """Rewrite legacy commit messages with a compiled dispatch table.
+
+    The header of a message is split by a single regular expression into an
+    optional icon or shortcode, the first word, the scope and the subject, and
+    the icon and the word are looked up in the dispatch table. The rewritten
+    message is validated, so a rewrite is always a valid message.
+
+    Args:
+        registry: The gitmojis messages are rewritten to.
+        classifier: The classifier of the same gitmojis.
+        table: The dispatch table, built from the registry if not given.
+        conventional_messages: Put the gitmoji at the start of the subject,
+            e.g. `feat: ✨ add x`.
+
+    Examples:
+        >>> fixer = get_autofixer()
+        >>> fixer.fix("Fix crash on startup").rewritten
+        '🐛 fix: crash on startup'
+        >>> rewrite = fixer.fix(":sparkles: add dark mode")
+        >>> rewrite.rewritten, rewrite.confidence
+        ('✨ feat: add dark mode', 0.9)
+    """
+
+    def __init__(
+        self,
+        registry: GitmojiRegistry,
+        classifier: TypeClassifier,
+        table: Optional[Mapping[str, Rule]] = None,
+        conventional_messages: bool = False,
+    ) -> None:
+        self._classifier = classifier
+        self._conventional_messages = conventional_messages
+        self._table = build_dispatch_table(registry) if table is None else table
+
+    def _resolve(
+        self, icon: Optional[str], word: Optional[str]
+    ) -> Optional[Tuple[Rule, bool]]:
+        """Return the rule of the icon and the word, and whether the word is consumed.
+
+        An icon wins over anything but the exact type, which only leaves the
+        word in the subject if the word doesn't restate the type.
+        """
+        icon_rule = self._table.get(icon) if icon else None
+        if icon_rule is not None and icon_rule.name != ICON:
+            icon_rule = None
+        word_rule = self._table.get(word.lower()) if word else None
+        if word_rule is not None and word_rule.name == ICON:
+            word_rule = None
+        if icon_rule is None:
+            return None if word_rule is None else (word_rule, word_rule.consumes)
+        if word_rule is None:
+            return icon_rule, False
+        if icon_rule.gitmoji == word_rule.gitmoji:
+            best = max(icon_rule, word_rule, key=lambda rule: rule.confidence)
+            return best, word_rule.consumes
+        if word_rule.name == TYPE:
+            return Rule(word_rule.gitmoji, CONFLICT), True
+        return icon_rule, False
+
+    def fix(self, message: str, allowed_prefixes: Tuple[str, ...] = ()) -> Rewrite:
+        """Rewrite a single message.
+
+        Args:
+            message: The complete commit message.
+            allowed_prefixes: Messages starting with these are kept as is.
+
+        Returns:
+            The rewrite, without rewritten message if no rule applies.
+        """
+        if allowed_prefixes and message.startswith(allowed_prefixes):
+            return Rewrite(message, message, ALLOWED)
+        parsed = self._classifier.classify(message)
+        if parsed is not None:
+            if self._conventional_messages:
+                registry = get_registry()
+                word = parsed.subject[1:].split(" ", 1)[0]
+                if word in registry.by_icon or word in registry.by_code:
+                    return Rewrite(message, message, VALID)
+                head = len(parsed.type_group) + len(parsed.scope)
+                rewritten = f"{message[:head]} {parsed.gitmoji.icon}{message[head:]}"
+                return Rewrite(message, rewritten, VALID)
+            if parsed.has_icon:
+                return Rewrite(message, message, VALID)
+            return Rewrite(message, f"{parsed.gitmoji.icon} {message}", VALID)
+        header, _, body = message.partition("\n")
+        match = cast("re.Match[str]", _HEADER.match(header))
+        word = match.group("bracketed") or match.group("word")
+        resolved = self._resolve(match.group("icon"), word)
+        if resolved is None:
+            return Rewrite(message)
+        rule, consumes = resolved
+        gitmoji = rule.gitmoji
+        # the gitmoji starts either the type group or the subject
+        type_group = gitmoji.type if self._conventional_messages else gitmoji.value
+        if consumes or word is None:
+            scope = f"({match.group('scope')})" if match.group("scope") else ""
+            type_group = f"{type_group}{scope}{match.group('bang') or ''}"
+            subject = match.group("subject").strip()
+        else:
+            # the word and everything after it is the subject
+            subject = header[match.start("token") :].strip()
+        if self._conventional_messages:
+            subject = f"{gitmoji.icon} {subject}"
+        rewritten = f"{type_group}: {subject}"
+        body = body.strip("\n")
+        if body:
+            rewritten = f"{rewritten}\n\n{body}"
+        if self._classifier.classify(rewritten) is None:
+            return Rewrite(message)
+        return Rewrite(message, rewritten, rule.name)
+
+
+@functools.cache
+def get_autofixer(
+    types: Optional[Tuple[str, ...]] = None, conventional_messages: bool = False
+) -> Autofixer:
+    """Return the autofixer for a gitmoji set, built once per process.
+
+    Args:
+        types: The types of the active gitmoji set. All gitmojis are active if
+            not given.
+        conventional_messages: Whether the gitmoji starts the subject instead
+            of the type group.
+    """
+    return Autofixer(
+        get_registry(types),
+        get_classifier(types, conventional_messages),
+        conventional_messages=conventional_messages,
+    )
+
+
+def autofix_many(
+    messages: Iterable[str],
+    allowed_prefixes: Optional[List[str]] = None,
+    fixer: Optional[Autofixer] = None,
+) -> Iterator[Rewrite]:
+    """Rewrite messages lazily, as they are read.
+
+    Args:
+        messages: The complete commit messages.
+        allowed_prefixes: Messages starting with these are kept as is.
+        fixer: The autofixer, that of all gitmojis if not given.
+    """
+    fixer = fixer or get_autofixer()
+    prefixes = tuple(allowed_prefixes or ())
+    for message in messages:
+        yield fixer.fix(message, prefixes)
+
+
+def _get_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="rewrite NUL-separated commit messages from stdin into the "
+        "conventional gitmoji format and write them to stdout"
+    )
+    parser.add_argument("--config", help="path to the configuration file")
+    parser.add_argument(
+        "--allowed-prefixes",
+        nargs="*",
+        help="prefixes of messages that are kept as is",
+    )
+    parser.add_argument(
+        "--min-confidence",
+        type=float,
+        default=0.0,
+        help="keep messages whose rewrite is less confident than this as is",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Rewrite NUL-separated messages from stdin and stream them to stdout.
+
+    Each rewrite is reported on stderr with its rule and confidence. Messages
+    without rewrite, or whose rewrite is not confident enough, are written
+    back unchanged, and the command exits with 1 if there are any.
+    """
+    args = _get_args(argv)
+    settings = get_run_settings(args.config)
+    allowed_prefixes = (
+        settings.allowed_prefixes
+        if args.allowed_prefixes is None
+        else args.allowed_prefixes
+    )
+    messages = read_messages(sys.stdin.buffer, settings.encoding)
+    unchanged = 0
+    fixer = get_autofixer(settings.types, settings.conventional_messages)
+    rewrites = autofix_many(messages, allowed_prefixes, fixer)
+    for index, rewrite in enumerate(rewrites):
+        output = rewrite.message
+        if not rewrite.ok:
+            unchanged += 1
+            sys.stderr.write(f"message {index}: no rule applies\n")
+        elif rewrite.confidence < args.min_confidence:
+            unchanged += 1
+            sys.stderr.write(
+                f"message {index}: {rewrite.rule} rule not confident enough "
+                f"({rewrite.confidence:.2f})\n"
+            )
+        else:
+            output = cast(str, rewrite.rewritten)
+            if output != rewrite.message:
+                sys.stderr.write(
+                    f"message {index}: {rewrite.rule} rule ({rewrite.confidence:.2f})\n"
+                )
+        sys.stdout.buffer.write(output.encode(settings.encoding) + b"\0")
+    if unchanged:
+        sys.exit(1)
@@ -0,0 +1,121 @@
+"""Gitmojify commit messages with the daemon, or in process if it isn't running.
+
+The client only imports the few standard modules it needs, so that it starts
+about as fast as the interpreter does. Settings, patterns and tables are kept
+warm by the daemon, see `gitmojify.daemon`.
+
+A request is the working directory of the client followed by the arguments of
+`gitmojify`, and a response is a status followed by its fields, each field
+terminated by a NUL byte. Arguments and paths can't contain NUL bytes, and the
+message is the last field of a response, so none of them needs escaping.
+"""
+
+import os
+import socket
+import sys
+import zlib
+from typing import List, Optional
+
+# seconds to wait for the daemon before gitmojifying in process
+TIMEOUT = 5.0
+# response statuses, followed by the encoding, the path or an empty field for
+# stdout, and the message for `OK`, by the error for `ERROR`, and by nothing
+# for `FALLBACK`, if the command line must be run in process
+OK = "ok"
+ERROR = "error"
+FALLBACK = "fallback"
+
+
+def get_socket_path(cwd: Optional[str] = None) -> str:
+    """Return the socket of the daemon serving a project directory.
+
+    The socket is in `$XDG_RUNTIME_DIR`, or in the cache directory if it isn't
+    set, and named after the project directory, as the settings depend on it.
+
+    Args:
+        cwd: The project directory, the working directory if not given.
+    """
+    directory = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get(
+        "XDG_CACHE_HOME", os.path.expanduser("~/.cache")
+    )
+    checksum = zlib.crc32(os.fsencode(cwd or os.getcwd()))
+    return os.path.join(
+        directory, "cz-conventional-gitmoji", f"gitmojify-{checksum:08x}.sock"
+    )
+
+
+def encode(fields: List[str]) -> bytes:
+    """Encode the fields of a request or a response."""
+    return "".join(f"{field}\0" for field in fields).encode()
+
+
+def decode(data: bytes, count: int = -1) -> List[str]:
+    """Decode the fields of a request or a response.
+
+    Args:
+        data: The request or response.
+        count: Split off at most this number of fields, the rest is the last
+            field.
+    """
+    return data.decode().removesuffix("\0").split("\0", count)
+
+
+def request(argv: List[str], timeout: float = TIMEOUT) -> List[str]:
+    """Gitmojify the message of a command line with the daemon.
+
+    Args:
+        argv: The arguments of `gitmojify`.
+        timeout: Seconds to wait for the daemon.
+
+    Returns:
+        The status of the response and its fields.
+
+    Raises:
+        OSError: If the daemon isn't running or doesn't respond in time.
+    """
+    family = getattr(socket, "AF_UNIX", None)
+    if family is None:
+        msg = "unix sockets are not supported"
+        raise OSError(msg)
+    cwd = os.getcwd()
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(get_socket_path(cwd))
+        sock.sendall(encode([cwd, *argv]))
+        sock.shutdown(socket.SHUT_WR)
+        data = b"".join(iter(lambda: sock.recv(65536), b""))
+    try:
+        return decode(data, 3)
+    except UnicodeDecodeError as exc:
+        msg = "invalid response from the daemon"
+        raise OSError(msg) from exc
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """The commit hook gitmojifying with the daemon, with the arguments of `gitmojify`.
+
+    The message is gitmojified in process if the daemon isn't running, and so
+    are the messages read with `--stdin`.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    status, *fields = [FALLBACK]
+    if "--stdin" not in argv:
+        try:
+            status, *fields = request(argv)
+        except OSError:
+            pass
+    if status == OK and len(fields) == 3:
+        encoding, path, message = fields
+        if not path:
+            sys.stdout.write(message)
+            return
+        with open(path, "w", encoding=encoding) as f:
+            f.write(message)
+    elif status == ERROR and fields:
+        sys.stderr.write(f"{fields[0]}\n")
+        sys.exit(1)
+    else:
+        # imported here, as it is what the daemon saves the hook from
+        from gitmojify import mojify
+
+        mojify.run(argv)
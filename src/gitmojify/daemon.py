@@ -0,0 +1,178 @@
+"""Resident server gitmojifying the commit messages of a project.
+
+The daemon keeps the settings and the compiled patterns and tables of a
+project in memory, so that commit hooks using `gitmojify-client` don't pay for
+starting the interpreter, finding the config files and building the tables on
+every commit. The config files are checked on every request and the settings
+are reloaded when any of them changes.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from gitmojify import client, mojify
+from shared.cache import get_fingerprint
+from shared.settings import MojiSettings, find_config_files
+
+# seconds a client may take to send its request, as requests are served one
+# at a time and a stalled client must not hold up the other commit hooks
+REQUEST_TIMEOUT = 1.0
+
+
+class GitmojifyServer(socketserver.UnixStreamServer):
+    """Serve the gitmojify requests of a project over a unix socket.
+
+    Args:
+        path: The socket to listen on.
+        cwd: The project directory, whose config files are used.
+    """
+
+    def __init__(self, path: str, cwd: str) -> None:
+        super().__init__(path, _Handler)
+        self.cwd = cwd
+        # the settings of each config file option, with the state of the files
+        self._settings: Dict[Optional[str], Tuple[Any, MojiSettings]] = {}
+
+    def get_settings(self, config: Optional[str]) -> MojiSettings:
+        """Get the settings, reloaded if a config file changed."""
+        paths = [Path(config)] if config is not None else find_config_files()
+        fingerprint = get_fingerprint(paths)
+        cached = self._settings.get(config)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        settings = mojify.get_run_settings(config)
+        self._settings[config] = (fingerprint, settings)
+        return settings
+
+    def respond(self, cwd: str, argv: List[str]) -> List[str]:
+        """Gitmojify the message of a client command line.
+
+        Args:
+            cwd: The working directory of the client.
+            argv: The arguments of `gitmojify`.
+
+        Returns:
+            The status and the fields of the response. Command lines the daemon
+            doesn't handle, e.g. from another project or with `--help`, are
+            left to the client.
+        """
+        if cwd != self.cwd:
+            return [client.FALLBACK]
+        try:
+            # the client reports the usage when it runs the command line itself
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+                args = mojify.get_args(argv)
+        except SystemExit:
+            return [client.FALLBACK]
+        if not args.commit_msg_file and args.message is None:
+            return [client.FALLBACK]
+        try:
+            settings = self.get_settings(args.config)
+            filepath, message = mojify.gitmojify_command(args, settings)
+        except (OSError, ValueError) as exc:
+            return [client.ERROR, str(exc)]
+        path = "" if filepath is None else str(filepath.absolute())
+        return [client.OK, settings.encoding, path, message]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handle a single request, read until the client stops sending."""
+
+    server: GitmojifyServer
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self) -> None:
+        try:
+            data = self.rfile.read()
+        except OSError:
+            # the client stalled or went away, it falls back to run in process
+            return
+        if not data:
+            # a connection without request, e.g. checking the daemon is running
+            return
+        try:
+            cwd, *argv = client.decode(data)
+        except UnicodeDecodeError:
+            response = [client.ERROR, "invalid request"]
+        else:
+            response = self.server.respond(cwd, argv)
+        with contextlib.suppress(OSError):
+            self.wfile.write(client.encode(response))
+
+
+def _is_running(path: str) -> bool:
+    """Whether a daemon listens on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(path: str, cwd: str) -> None:
+    """Serve requests on the socket until interrupted or terminated.
+
+    A socket left behind by a daemon that didn't exit cleanly is replaced.
+
+    Args:
+        path: The socket to listen on.
+        cwd: The project directory, whose config files are used.
+
+    Raises:
+        RuntimeError: If a daemon already listens on the socket.
+    """
+    socket_file = Path(path)
+    if socket_file.exists():
+        if _is_running(path):
+            msg = f"a daemon is already running on {path}"
+            raise RuntimeError(msg)
+        socket_file.unlink()
+    socket_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # only the user may connect, the daemon reads any file it is sent
+    umask = os.umask(0o177)
+    try:
+        server = GitmojifyServer(path, cwd)
+    finally:
+        os.umask(umask)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        socket_file.unlink(missing_ok=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the daemon of the project in the working directory."""
+    parser = argparse.ArgumentParser(
+        description="keep gitmojify warm for the commit hooks of this project"
+    )
+    parser.add_argument(
+        "--socket",
+        action="store_true",
+        help="print the socket the daemon listens on and exit",
+    )
+    args = parser.parse_args(argv)
+    cwd = os.getcwd()
+    path = client.get_socket_path(cwd)
+    if args.socket:
+        sys.stdout.write(f"{path}\n")
+        return
+    try:
+        serve(path, cwd)
+    except RuntimeError as exc:
+        sys.stderr.write(f"{exc}\n")
+        sys.exit(1)
@@ -0,0 +1,218 @@
+"""Lint the commit messages of a range of the history."""
+
+import argparse
+import contextlib
+import subprocess
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import attrs
+
+from gitmojify.mojify import get_run_settings
+from shared.diagnostics import Diagnostic, Failure
+from shared.gitlog import iter_git_log
+from shared.matcher import BACKENDS, Matcher, get_matcher
+
+# the hash, the title and the body of each commit, as commitizen reads them
+LOG_FORMAT = "%H%n%s%n%b"
+
+
+@attrs.define(frozen=True)
+class LintFailure:
+    """A commit whose message doesn't follow the convention."""
+
+    sha: str
+    diagnostic: Diagnostic
+    title: str
+
+
+@attrs.define
+class LintSummary:
+    """The outcome of linting a range of commits."""
+
+    checked: int = 0
+    skipped: int = 0
+    failures: List[LintFailure] = attrs.field(factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every commit follows the convention."""
+        return not self.failures
+
+    def counts(self) -> Dict[Failure, int]:
+        """Return the number of failures by reason."""
+        counts: Dict[Failure, int] = {}
+        for failure in self.failures:
+            reason = failure.diagnostic.failure
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+
+def iter_log(
+    rev_range: Sequence[str] = ("HEAD",), encoding: str = "utf-8"
+) -> Iterator[Tuple[str, str]]:
+    """Stream the hash and message of the commits of a range, newest first.
+
+    The messages are joined from the title and the body as in commitizen, so a
+    message is valid here if and only if `cz check` accepts it.
+
+    Args:
+        rev_range: The arguments selecting the commits, as for `git log`.
+        encoding: The encoding of the commit messages.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails, e.g. on an unknown revision.
+    """
+    args = [f"--format={LOG_FORMAT}", *rev_range, "--"]
+    # closed at once if the caller stops early, which stops git
+    with contextlib.closing(iter_git_log(args, encoding)) as records:
+        for record in records:
+            sha, _, message = record.partition("\n")
+            title, _, body = message.partition("\n")
+            yield sha, f"{title.strip()}\n\n{body.strip()}".strip()
+
+
+def lint_message(
+    message: str, matcher: Matcher, require_icon: bool = False
+) -> Optional[Diagnostic]:
+    """Lint a single commit message.
+
+    Args:
+        message: The complete commit message.
+        matcher: The matcher of the active gitmojis.
+        require_icon: Also reject messages without gitmoji.
+
+    Returns:
+        Where and why the message is invalid, or `None` if it is valid.
+    """
+    parsed = matcher.validate(message)
+    if isinstance(parsed, Diagnostic):
+        return parsed
+    if require_icon and not parsed.has_icon:
+        return Diagnostic(Failure.MISSING_ICON, 0)
+    return None
+
+
+def lint_range(
+    rev_range: Sequence[str] = ("HEAD",),
+    allowed_prefixes: Sequence[str] = (),
+    require_icon: bool = False,
+    encoding: str = "utf-8",
+    matcher: Optional[Matcher] = None,
+) -> LintSummary:
+    """Lint the commit messages of a range of the history.
+
+    The history is read from a single `git log` process and every message is
+    validated by the precompiled classifier, so the cost per commit is that
+    of a few dictionary lookups and a match of the message tail. The reason of
+    a failure is found in the same pass.
+
+    Args:
+        rev_range: The arguments selecting the commits, as for `git log`.
+        allowed_prefixes: Messages starting with these are not linted.
+        require_icon: Also reject messages without gitmoji.
+        encoding: The encoding of the commit messages.
+        matcher: The matcher validating the messages, the parser if not given.
+
+    Returns:
+        The failures, newest first, and the number of commits.
+    """
+    matcher = matcher or get_matcher()
+    prefixes = tuple(allowed_prefixes)
+    summary = LintSummary()
+    for sha, message in iter_log(rev_range, encoding):
+        summary.checked += 1
+        if prefixes and message.startswith(prefixes):
+            summary.skipped += 1
+            continue
+        diagnostic = lint_message(message, matcher, require_icon)
+        if diagnostic is not None:
+            title = message.partition("\n")[0]
+            summary.failures.append(LintFailure(sha, diagnostic, title))
+    return summary
+
+
+def _get_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="validate the commit messages of a range of the history"
+    )
+    parser.add_argument(
+        "rev_range",
+        nargs="*",
+        default=["HEAD"],
+        help="revisions selecting the commits, as for git log, e.g. main..HEAD",
+    )
+    parser.add_argument("--config", help="path to the configuration file")
+    parser.add_argument(
+        "--allowed-prefixes",
+        nargs="*",
+        help="prefixes of messages that are not linted",
+    )
+    parser.add_argument(
+        "--require-icon",
+        action="store_true",
+        help="also reject messages without gitmoji",
+    )
+    parser.add_argument(
+        "--matcher",
+        choices=BACKENDS,
+        help="the engine validating the messages, the parser by default",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="only print the summary",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Report the commits of a range whose message doesn't follow the convention.
+
+    Exits with 1 if any message is invalid and with 2 if git fails or the matcher
+    isn't available.
+    """
+    args = _get_args(argv)
+    settings = get_run_settings(args.config)
+    allowed_prefixes = (
+        settings.allowed_prefixes
+        if args.allowed_prefixes is None
+        else args.allowed_prefixes
+    )
+    try:
+        matcher = get_matcher(
+            args.matcher or settings.matcher,
+            settings.types,
+            settings.conventional_messages,
+        )
+    except ValueError as exc:
+        sys.stderr.write(f"{exc}\n")
+        sys.exit(2)
+    try:
+        summary = lint_range(
+            args.rev_range,
+            allowed_prefixes,
+            args.require_icon,
+            settings.encoding,
+            matcher,
+        )
+    except subprocess.CalledProcessError as exc:
+        sys.stderr.write(exc.stderr.decode(errors="replace"))
+        sys.exit(2)
+    if not args.quiet:
+        for failure in summary.failures:
+            sys.stdout.write(f"{failure.sha} {failure.diagnostic}: {failure.title}\n")
+    reasons = ", ".join(
+        f"{count} {reason}"
+        for reason, count in sorted(
+            summary.counts().items(), key=lambda item: item[0].value
+        )
+    )
+    sys.stderr.write(
+        f"{summary.checked} commits checked, {summary.skipped} skipped, "
+        f"{len(summary.failures)} invalid" + (f" ({reasons})" if reasons else "") + "\n"
+    )
+    if not summary.ok:
+        sys.exit(1)
@@ -1,16 +1,50 @@
 import argparse
-import re
+import collections
+import itertools
+import os
+import subprocess
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
+import attrs
+
+from shared import cache
+from shared.classifier import get_classifier
+from shared.diagnostics import Diagnostic, InvalidMessageError
+from shared.gitlog import read_messages
 from shared.model import Gitmoji
-from shared.settings import get_settings
-from shared.utils import get_gitmojis, get_pattern
+from shared.registry import get_registry
+from shared.settings import MojiSettings, get_settings
+from shared.shortcodes import FORMATS, get_translator
+from shared.utils import non_negative_int, positive_int
+
+if TYPE_CHECKING:
+    from concurrent import futures
+
+DEFAULT_CHUNK_SIZE = 256
+# the line `git commit --verbose` cuts the message at, after the comment string
+CUT_LINE = "------------------------ >8 ------------------------"
+# the comment string of `core.commentChar = auto`, git picks a character of
+# `AUTO_COMMENT_CHARS` no line of the message starts with
+AUTO_COMMENT = "auto"
+AUTO_COMMENT_CHARS = "#;@!$%^&|:"
 
+# the gitmojified message or the error for a single message
+_Outcome = Tuple[Optional[str], Optional[str]]
 
-def _get_args() -> argparse.Namespace:
-    """Parse command line arguments."""
+
+def get_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line arguments of `gitmojify`."""
     parser = argparse.ArgumentParser()
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument(
@@ -19,7 +53,25 @@ def _get_args() -> argparse.Namespace:
         help="path to the commit message file",
     )
     group.add_argument("-m", "--message", help="the commit message")
+    group.add_argument(
+        "--stdin",
+        action="store_true",
+        help="read NUL-separated commit messages from stdin and write them to stdout",
+    )
     parser.add_argument("--config", help="path to the configuration file")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=non_negative_int,
+        default=1,
+        help="number of processes used with --stdin, 0 for one per CPU",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="number of messages sent to a process at once with --jobs",
+    )
     parser.add_argument(
         "--allowed-prefixes",
         nargs="*",
@@ -30,55 +82,132 @@ def _get_args() -> argparse.Namespace:
         nargs="*",
         help="prefixes to convert to gitmoji format",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--gitmoji-format",
+        choices=FORMATS,
+        help="write all gitmojis of the message as icons or as shortcodes",
+    )
+    return parser.parse_args(argv)
 
 
-def _grouped_gitmojis() -> Dict[str, Gitmoji]:
+@attrs.define(frozen=True)
+class MojifyResult:
+    """The result of gitmojifying a single message."""
+
+    message: str
+    gitmojified: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the message was gitmojified successfully."""
+        return self.error is None
+
+
+def _grouped_gitmojis() -> Mapping[str, Gitmoji]:
     """Return the gitmojis grouped by type."""
-    return {moji.type: moji for moji in get_gitmojis()}
+    return get_registry().by_type
+
+
+def _starts_with_gitmoji(subject: str) -> bool:
+    """Whether the subject starts with the icon or the shortcode of a gitmoji."""
+    registry = get_registry()
+    word = subject.split(" ", 1)[0]
+    return word in registry.by_icon or word in registry.by_code
 
 
 def gitmojify(
     message: str,
     allowed_prefixes: Optional[List[str]] = None,
     convert_prefixes: Optional[List[str]] = None,
+    gitmoji_format: Optional[str] = None,
+    types: Optional[Tuple[str, ...]] = None,
+    conventional_messages: bool = False,
 ) -> str:
     """
     Gitmojify the commit message.
 
-    If a gitmoji is already present in the message, the message is returned
-    as is. Otherwise, the gitmoji is looked up by type and is prepended to
-    the message.
+    If a gitmoji is already present in the message, either as icon or as
+    shortcode, the message is returned as is. Otherwise, the gitmoji is looked
+    up by type and is prepended to the message, or to the subject with
+    conventional messages.
 
     Args:
         message: The complete commit message.
         allowed_prefixes: Prefixes that should not raise an error, even though
             they're not following conventional standard.
         convert_prefixes: Prefixes that should be converted to gitmoji format.
+        gitmoji_format: Write all gitmojis of the message as `icon` or as
+            `code`. They are kept as written if not given.
+        types: The types of the active gitmoji set. All gitmojis are active if
+            not given.
+        conventional_messages: Put the gitmoji at the start of the subject,
+            e.g. `feat: ✨ add x`, keeping the message valid conventional
+            commits.
 
     Returns:
         The gitmojified message.
+
+    Raises:
+        InvalidMessageError: If the message doesn't follow the convention, with
+            the diagnostic of the failure.
     """
     convert_prefixes = convert_prefixes or []
-    if any(map(message.startswith, convert_prefixes)):
+    if message.startswith(tuple(convert_prefixes)):
         first_word, *rest = message.split(" ", maxsplit=1)
         if first_word.endswith(":"):
             first_word = first_word[:-1]
         if first_word in convert_prefixes:
             message = f"{first_word.lower()}: {''.join(rest)}"
-    if any(map(message.startswith, allowed_prefixes or [])):
+    if message.startswith(tuple(allowed_prefixes or [])):
         return message
 
-    pat = get_pattern()
-    match = re.match(pat, message)
-    if match is None:
-        msg = "invalid commit message"
-        raise ValueError(msg)
-    gtype = match.group("type_group")
-    if " " in gtype:  # maybe do a better check?
+    parsed = get_classifier(types, conventional_messages).validate(message)
+    if isinstance(parsed, Diagnostic):
+        raise InvalidMessageError(parsed)
+    if conventional_messages:
+        if not _starts_with_gitmoji(parsed.subject[1:]):
+            head = len(parsed.type_group) + len(parsed.scope)
+            message = f"{message[:head]} {parsed.gitmoji.icon}{message[head:]}"
+    elif not parsed.has_icon:
+        message = f"{parsed.gitmoji.icon} {message}"
+    if gitmoji_format is None:
         return message
-    icon = _grouped_gitmojis()[gtype].icon
-    return f"{icon} {message}"
+    return get_translator().normalize(message, gitmoji_format)
+
+
+def gitmojify_many(
+    messages: Iterable[str],
+    allowed_prefixes: Optional[List[str]] = None,
+    convert_prefixes: Optional[List[str]] = None,
+    gitmoji_format: Optional[str] = None,
+    types: Optional[Tuple[str, ...]] = None,
+    conventional_messages: bool = False,
+) -> Iterator[str]:
+    """
+    Gitmojify many commit messages lazily.
+
+    Args:
+        messages: The complete commit messages.
+        allowed_prefixes: Prefixes that should not raise an error, even though
+            they're not following conventional standard.
+        convert_prefixes: Prefixes that should be converted to gitmoji format.
+        gitmoji_format: Write all gitmojis as `icon` or as `code`.
+        types: The types of the active gitmoji set.
+        conventional_messages: Put the gitmoji at the start of the subject.
+
+    Yields:
+        The gitmojified messages, in the order they were given.
+    """
+    for message in messages:
+        yield gitmojify(
+            message,
+            allowed_prefixes,
+            convert_prefixes,
+            gitmoji_format,
+            types,
+            conventional_messages,
+        )
 
 
 def _write(filepath: Optional[Path], message: str, encoding: str) -> None:
@@ -90,6 +219,191 @@ def _write(filepath: Optional[Path], message: str, encoding: str) -> None:
         f.write(message)
 
 
+def _gitmojify_chunk(
+    messages: List[str],
+    allowed_prefixes: Optional[List[str]],
+    convert_prefixes: Optional[List[str]],
+    gitmoji_format: Optional[str] = None,
+    types: Optional[Tuple[str, ...]] = None,
+    conventional_messages: bool = False,
+) -> List[_Outcome]:
+    """Gitmojify a chunk of messages, capturing errors per message.
+
+    Only the gitmojified message or the error is returned for each message, to
+    keep the data sent back from worker processes small.
+    """
+    outcomes: List[_Outcome] = []
+    for message in messages:
+        try:
+            gitmojified = gitmojify(
+                message,
+                allowed_prefixes,
+                convert_prefixes,
+                gitmoji_format,
+                types,
+                conventional_messages,
+            )
+        except ValueError as exc:
+            outcomes.append((None, str(exc)))
+        else:
+            outcomes.append((gitmojified, None))
+    return outcomes
+
+
+def _to_results(
+    messages: List[str], outcomes: List[_Outcome]
+) -> Iterator[MojifyResult]:
+    """Combine messages with the outcomes of gitmojifying them."""
+    for message, (gitmojified, error) in zip(messages, outcomes):
+        yield MojifyResult(message, gitmojified, error)
+
+
+def gitmojify_parallel(
+    messages: Iterable[str],
+    allowed_prefixes: Optional[List[str]] = None,
+    convert_prefixes: Optional[List[str]] = None,
+    jobs: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    gitmoji_format: Optional[str] = None,
+    types: Optional[Tuple[str, ...]] = None,
+    conventional_messages: bool = False,
+) -> Iterator[MojifyResult]:
+    """
+    Gitmojify many commit messages in a pool of processes.
+
+    Messages are sent to the processes in chunks. Only a bounded number of
+    chunks is in flight at any time, so arbitrarily long streams can be
+    converted with constant memory.
+
+    Args:
+        messages: The complete commit messages.
+        allowed_prefixes: Prefixes that should not raise an error, even though
+            they're not following conventional standard.
+        convert_prefixes: Prefixes that should be converted to gitmoji format.
+        jobs: The number of processes, one per CPU if not given. With a single
+            job, the messages are converted in the current process.
+        chunk_size: The number of messages sent to a process at once.
+        gitmoji_format: Write all gitmojis as `icon` or as `code`.
+        types: The types of the active gitmoji set.
+        conventional_messages: Put the gitmoji at the start of the subject.
+
+    Returns:
+        A result per message, in the order the messages were given. Invalid
+        messages don't stop the conversion, their result holds the error.
+
+    Raises:
+        ValueError: If `jobs` is negative or `chunk_size` is less than 1.
+    """
+    if jobs is not None and jobs < 0:
+        msg = f"jobs must be at least 0, not {jobs}"
+        raise ValueError(msg)
+    if chunk_size < 1:
+        msg = f"chunk_size must be at least 1, not {chunk_size}"
+        raise ValueError(msg)
+    return _gitmojify_parallel(
+        messages,
+        allowed_prefixes,
+        convert_prefixes,
+        jobs or os.cpu_count() or 1,
+        chunk_size,
+        gitmoji_format,
+        types,
+        conventional_messages,
+    )
+
+
+def _gitmojify_parallel(
+    messages: Iterable[str],
+    allowed_prefixes: Optional[List[str]],
+    convert_prefixes: Optional[List[str]],
+    jobs: int,
+    chunk_size: int,
+    gitmoji_format: Optional[str],
+    types: Optional[Tuple[str, ...]],
+    conventional_messages: bool,
+) -> Iterator[MojifyResult]:
+    """Gitmojify many commit messages in chunks, see `gitmojify_parallel`."""
+    it = iter(messages)
+    chunks = iter(lambda: list(itertools.islice(it, chunk_size)), [])
+    if jobs == 1:
+        for chunk in chunks:
+            outcomes = _gitmojify_chunk(
+                chunk,
+                allowed_prefixes,
+                convert_prefixes,
+                gitmoji_format,
+                types,
+                conventional_messages,
+            )
+            yield from _to_results(chunk, outcomes)
+        return
+    # imported here to keep it off the startup path of the commit hook
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: Deque[Tuple[List[str], futures.Future[List[_Outcome]]]]
+        pending = collections.deque()
+        for chunk in chunks:
+            future = executor.submit(
+                _gitmojify_chunk,
+                chunk,
+                allowed_prefixes,
+                convert_prefixes,
+                gitmoji_format,
+                types,
+                conventional_messages,
+            )
+            pending.append((chunk, future))
+            if len(pending) >= 2 * jobs:
+                chunk, future = pending.popleft()
+                yield from _to_results(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from _to_results(chunk, future.result())
+
+
+def _run_stdin(
+    allowed_prefixes: Optional[List[str]],
+    convert_prefixes: Optional[List[str]],
+    encoding: str,
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    gitmoji_format: Optional[str] = None,
+    types: Optional[Tuple[str, ...]] = None,
+    conventional_messages: bool = False,
+) -> None:
+    """Gitmojify NUL-separated messages from stdin and stream them to stdout.
+
+    Invalid messages are written back unchanged and reported on stderr.
+    """
+    messages = read_messages(sys.stdin.buffer, encoding)
+    if jobs == 1:
+        # convert messages as they arrive so the command can be used as a coprocess
+        chunk_size = 1
+    invalid = 0
+    for index, result in enumerate(
+        gitmojify_parallel(
+            messages,
+            allowed_prefixes,
+            convert_prefixes,
+            jobs,
+            chunk_size,
+            gitmoji_format,
+            types,
+            conventional_messages,
+        )
+    ):
+        if not result.ok:
+            invalid += 1
+            sys.stderr.write(f"message {index}: {result.error}\n")
+        output = result.message if result.gitmojified is None else result.gitmojified
+        sys.stdout.buffer.write(output.encode(encoding) + b"\0")
+        if jobs == 1:
+            sys.stdout.buffer.flush()
+    if invalid:
+        sys.exit(1)
+
+
 def _filter_comments(message: str) -> str:
     """Filter out comments from the message.
 
@@ -104,22 +418,127 @@ def _filter_comments(message: str) -> str:
     return "\n".join(lines)
 
 
-def run() -> None:
-    """The pre-commit hook that modifies the commit message."""
-    args = _get_args()
-    settings = get_settings(args.config)
+def get_comment_string() -> str:
+    """Get the comment string git uses in commit message files.
+
+    Returns:
+        The value of `core.commentString` or `core.commentChar`, whichever is
+        set last, or `#` if neither is set or git isn't available.
+    """
+    try:
+        output = subprocess.run(
+            ["git", "config", "--get-regexp", r"^core\.comment(char|string)$"],
+            capture_output=True,
+            text=True,
+            check=False,
+        ).stdout
+    except OSError:
+        return "#"
+    values = [line.partition(" ")[2] for line in output.splitlines()]
+    return values[-1] if values and values[-1] else "#"
+
+
+def _is_instruction(line: str) -> bool:
+    """Return whether the line is the one of git instructions naming the comment.
+
+    Git writes e.g. `; with ';' will be ignored, and an empty message aborts`.
+    """
+    char = line[:1]
+    return char in AUTO_COMMENT_CHARS and line.startswith(
+        f"{char} with '{char}' will be "
+    )
+
+
+def read_commit_msg_file(path: Path, encoding: str, comment: str = "#") -> str:
+    """Read a commit message file without its comments.
+
+    The file is read line by line and reading stops at the scissors line, so
+    the diff `git commit --verbose` appends below it is never loaded.
+
+    With `auto`, the comment character is the one of the scissors line, else
+    the one of the instructions git adds to the message, else `#`. A message
+    written without them, e.g. with `git commit -m`, keeps all its lines.
+
+    Args:
+        path: The commit message file.
+        encoding: The encoding of the file.
+        comment: The comment string, as returned by `get_comment_string`.
+    """
+    lines = []
+    cut = False
+    instructions = None
+    with path.open(encoding=encoding) as f:
+        for line in f:
+            if comment == AUTO_COMMENT:
+                index = line.find(f" {CUT_LINE}")
+                if index > 0 and line[index - 1] in AUTO_COMMENT_CHARS:
+                    comment = line[index - 1]
+                    cut = True
+                    break
+                if instructions is None and _is_instruction(line):
+                    instructions = line[0]
+            elif f"{comment} {CUT_LINE}" in line:
+                cut = True
+                break
+            lines.append(line)
+    if comment == AUTO_COMMENT:
+        comment = instructions or "#"
+    message = [
+        line.removesuffix("\n") for line in lines if not line.startswith(comment)
+    ]
+    # like splitting the whole file, a final newline leaves an empty line
+    if not cut and (not lines or lines[-1].endswith("\n")):
+        message.append("")
+    return "\n".join(message)
+
+
+def get_run_settings(config: Optional[str]) -> MojiSettings:
+    """Get the settings, from the cache if it is enabled."""
+    if cache.is_enabled():
+        return cache.get_cached_settings(config)
+    return get_settings(config)
+
+
+def gitmojify_command(
+    args: argparse.Namespace, settings: MojiSettings
+) -> Tuple[Optional[Path], str]:
+    """Gitmojify the message of a command line given with a file or as option.
+
+    Returns:
+        The file to write the message to, `None` for stdout, and the
+        gitmojified message.
+    """
     if args.commit_msg_file:
         filepath = Path(args.commit_msg_file)
-        msg = filepath.read_text(encoding=settings.encoding)
+        msg = read_commit_msg_file(filepath, settings.encoding, get_comment_string())
     else:
         filepath = None
-        msg = args.message
-    _write(
-        filepath,
-        gitmojify(
-            _filter_comments(msg),
+        msg = _filter_comments(args.message)
+    return filepath, gitmojify(
+        msg,
+        args.allowed_prefixes or settings.allowed_prefixes,
+        args.convert_prefixes or settings.convert_prefixes,
+        args.gitmoji_format or settings.gitmoji_format,
+        settings.types,
+        settings.conventional_messages,
+    )
+
+
+def run(argv: Optional[List[str]] = None) -> None:
+    """The pre-commit hook that modifies the commit message."""
+    args = get_args(argv)
+    settings = get_run_settings(args.config)
+    if not args.commit_msg_file and args.message is None:
+        _run_stdin(
             args.allowed_prefixes or settings.allowed_prefixes,
             args.convert_prefixes or settings.convert_prefixes,
-        ),
-        settings.encoding,
-    )
+            settings.encoding,
+            args.jobs,
+            args.chunk_size,
+            args.gitmoji_format or settings.gitmoji_format,
+            settings.types,
+            settings.conventional_messages,
+        )
+        return
+    filepath, message = gitmojify_command(args, settings)
+    _write(filepath, message, settings.encoding)
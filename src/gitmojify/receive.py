@@ -0,0 +1,382 @@
+"""Validate the commit messages of a push in a server-side `pre-receive` hook.
+
+The commits new to the repository are listed by a single `git rev-list` and
+their messages read by a single `git cat-file --batch`, whatever the number of
+updated refs. Commits whose message was found valid are remembered in a SQLite
+store in the git directory, so that commits pushed again, e.g. to another
+branch after the one they were on was deleted, or after a rejected push, are
+not validated twice.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+import attrs
+
+from gitmojify.lint import LintFailure, LintSummary, lint_message
+from gitmojify.mojify import get_run_settings
+from shared import __version__
+from shared.gitlog import git_output
+from shared.matcher import BACKENDS, Matcher, get_matcher
+from shared.settings import MojiSettings
+
+# seconds to wait for a concurrent push holding the store
+STORE_TIMEOUT = 10.0
+# the number of hashes looked up per query, below the oldest SQLite limit
+STORE_BATCH_SIZE = 500
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rulesets (id INTEGER PRIMARY KEY, key TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS validated (
+    ruleset INTEGER, sha BLOB, PRIMARY KEY (ruleset, sha)
+) WITHOUT ROWID;
+"""
+# the end of the first paragraph of a message, which is the title in git
+_PARAGRAPH_END = re.compile(r"\n\s*\n")
+
+
+@attrs.define(frozen=True)
+class RefUpdate:
+    """A ref update of a push, as given to the `pre-receive` hook."""
+
+    old: str
+    new: str
+    ref: str
+
+    @property
+    def deleted(self) -> bool:
+        """Whether the ref is deleted, which brings no commits."""
+        return not self.new.strip("0")
+
+
+def parse_updates(lines: Iterable[str]) -> List[RefUpdate]:
+    """Parse the `old new ref` lines of the `pre-receive` hook."""
+    updates = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) == 3:
+            updates.append(RefUpdate(*fields))
+    return updates
+
+
+class ValidatedStore:
+    """The commits whose message was found valid, stored in SQLite.
+
+    Hashes are stored as blobs and keyed by ruleset, so that commits are
+    validated again when the rules change.
+
+    Args:
+        path: The database file, created if missing.
+        ruleset: What identifies the rules the commits were validated with.
+    """
+
+    def __init__(self, path: Path, ruleset: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=STORE_TIMEOUT)
+        try:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            with self._connection:
+                self._connection.executescript(STORE_SCHEMA)
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO rulesets (key) VALUES (?)", (ruleset,)
+                )
+            (self._ruleset,) = self._connection.execute(
+                "SELECT id FROM rulesets WHERE key = ?", (ruleset,)
+            ).fetchone()
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def unknown(self, shas: Sequence[str]) -> List[str]:
+        """Return the commits that aren't in the store, in the given order."""
+        blobs = [bytes.fromhex(sha) for sha in shas]
+        known: Set[bytes] = set()
+        for start in range(0, len(blobs), STORE_BATCH_SIZE):
+            batch = blobs[start : start + STORE_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            rows = self._connection.execute(
+                "SELECT sha FROM validated "
+                f"WHERE ruleset = ? AND sha IN ({placeholders})",
+                (self._ruleset, *batch),
+            )
+            known.update(sha for (sha,) in rows)
+        return [sha for sha, blob in zip(shas, blobs) if blob not in known]
+
+    def add(self, shas: Iterable[str]) -> None:
+        """Add validated commits to the store."""
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO validated (ruleset, sha) VALUES (?, ?)",
+                ((self._ruleset, bytes.fromhex(sha)) for sha in shas),
+            )
+
+
+def get_ruleset(
+    settings: MojiSettings, allowed_prefixes: Sequence[str], require_icon: bool
+) -> str:
+    """Return what identifies the rules commits are validated with."""
+    key = [
+        __version__,
+        settings.types,
+        settings.conventional_messages,
+        sorted(allowed_prefixes),
+        require_icon,
+    ]
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+def get_store_path() -> Path:
+    """Return the default store, in the git directory of the repository.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails, e.g. outside a repository.
+    """
+    git_dir = os.environ.get("GIT_DIR") or os.fsdecode(
+        subprocess.run(
+            ["git", "rev-parse", "--git-dir"], capture_output=True, check=True
+        ).stdout.rstrip(b"\n")
+    )
+    return Path(git_dir, "cz-conventional-gitmoji", "validated.sqlite")
+
+
+def rev_list(updates: Sequence[RefUpdate]) -> List[str]:
+    """List the commits a push brings to the repository, newest first.
+
+    Commits reachable from any ref are already in the repository, as the refs
+    aren't updated before the `pre-receive` hook accepts the push.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails.
+    """
+    news = list(dict.fromkeys(update.new for update in updates if not update.deleted))
+    if not news:
+        return []
+    return (
+        subprocess.run(
+            ["git", "rev-list", *news, "--not", "--all"],
+            capture_output=True,
+            check=True,
+        )
+        .stdout.decode()
+        .split()
+    )
+
+
+def _log_message(raw: str) -> str:
+    """Join the title and the body of a raw message as `lint.iter_log` reads them."""
+    message = raw.lstrip()
+    match = _PARAGRAPH_END.search(message)
+    title, body = (
+        (message[: match.start()], message[match.end() :]) if match else (message, "")
+    )
+    title = " ".join(line.strip() for line in title.split("\n"))
+    return f"{title.strip()}\n\n{body.strip()}".strip()
+
+
+def _decode_commit(content: bytes, encoding: str) -> str:
+    """Decode the message of a raw commit object, in its declared encoding."""
+    headers, _, raw = content.partition(b"\n\n")
+    for header in headers.split(b"\n"):
+        if header.startswith(b"encoding "):
+            encoding = header[len(b"encoding ") :].decode("ascii", "replace")
+    try:
+        return raw.decode(encoding, "replace")
+    except LookupError:
+        return raw.decode("utf-8", "replace")
+
+
+def iter_messages(
+    shas: Sequence[str], encoding: str = "utf-8"
+) -> Iterator[Tuple[str, str]]:
+    """Read the messages of commits with a single `git cat-file --batch`.
+
+    Args:
+        shas: The commits.
+        encoding: The encoding of messages that don't declare one.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails.
+    """
+    if not shas:
+        return
+    # git gets its input from a file, so it never waits on an unread pipe
+    with tempfile.TemporaryFile() as requests:
+        requests.write("".join(f"{sha}\n" for sha in shas).encode())
+        requests.seek(0)
+        with git_output(["cat-file", "--batch"], stdin=requests) as stdout:
+            for header in iter(stdout.readline, b""):
+                sha, _, info = header.decode().rstrip("\n").partition(" ")
+                kind, _, size = info.partition(" ")
+                if kind == "missing":
+                    continue
+                content = stdout.read(int(size))
+                stdout.read(1)
+                if kind == "commit":
+                    yield sha, _log_message(_decode_commit(content, encoding))
+
+
+def check_push(
+    updates: Sequence[RefUpdate],
+    matcher: Matcher,
+    allowed_prefixes: Sequence[str] = (),
+    require_icon: bool = False,
+    encoding: str = "utf-8",
+    store: Optional[ValidatedStore] = None,
+) -> LintSummary:
+    """Lint the commit messages a push brings to the repository.
+
+    The valid commits are added to the store. The store is an optimization
+    only, failing to read or write it is never an error.
+
+    Args:
+        updates: The ref updates of the push.
+        matcher: The matcher of the active gitmojis.
+        allowed_prefixes: Messages starting with these are not linted.
+        require_icon: Also reject messages without gitmoji.
+        encoding: The encoding of messages that don't declare one.
+        store: The commits already validated.
+
+    Returns:
+        The failures, newest first. Commits with an allowed prefix and commits
+        already in the store count as skipped.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails.
+    """
+    prefixes = tuple(allowed_prefixes)
+    shas = rev_list(updates)
+    summary = LintSummary(checked=len(shas))
+    if store is not None:
+        try:
+            shas = store.unknown(shas)
+        except sqlite3.Error:
+            store = None
+    summary.skipped = summary.checked - len(shas)
+    validated = []
+    for sha, message in iter_messages(shas, encoding):
+        if prefixes and message.startswith(prefixes):
+            summary.skipped += 1
+        else:
+            diagnostic = lint_message(message, matcher, require_icon)
+            if diagnostic is not None:
+                title = message.partition("\n")[0]
+                summary.failures.append(LintFailure(sha, diagnostic, title))
+                continue
+        validated.append(sha)
+    if store is not None:
+        try:
+            store.add(validated)
+        except sqlite3.Error:
+            pass
+    return summary
+
+
+def _get_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="reject pushes bringing commit messages that don't follow "
+        "the convention, reading the ref updates from stdin"
+    )
+    parser.add_argument("--config", help="path to the configuration file")
+    parser.add_argument(
+        "--allowed-prefixes",
+        nargs="*",
+        help="prefixes of messages that are not linted",
+    )
+    parser.add_argument(
+        "--require-icon",
+        action="store_true",
+        help="also reject messages without gitmoji",
+    )
+    parser.add_argument(
+        "--matcher",
+        choices=BACKENDS,
+        help="the engine validating the messages, the parser by default",
+    )
+    parser.add_argument(
+        "--store",
+        help="the database of validated commits, in the git directory by default",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="validate every new commit, without reading or writing the store",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None, stdin: Optional[TextIO] = None) -> None:
+    """The `pre-receive` hook rejecting pushes with invalid commit messages.
+
+    Exits with 1 if any message is invalid and with 2 if git fails or the matcher
+    isn't available.
+    """
+    args = _get_args(argv)
+    settings = get_run_settings(args.config)
+    allowed_prefixes = (
+        settings.allowed_prefixes
+        if args.allowed_prefixes is None
+        else args.allowed_prefixes
+    )
+    try:
+        matcher = get_matcher(
+            args.matcher or settings.matcher,
+            settings.types,
+            settings.conventional_messages,
+        )
+    except ValueError as exc:
+        sys.stderr.write(f"{exc}\n")
+        sys.exit(2)
+    updates = parse_updates(sys.stdin if stdin is None else stdin)
+    store = None
+    try:
+        if not args.no_store:
+            path = Path(args.store) if args.store else get_store_path()
+            ruleset = get_ruleset(settings, allowed_prefixes, args.require_icon)
+            try:
+                store = ValidatedStore(path, ruleset)
+            except (OSError, sqlite3.Error):
+                pass
+        summary = check_push(
+            updates,
+            matcher,
+            allowed_prefixes,
+            args.require_icon,
+            settings.encoding,
+            store,
+        )
+    except subprocess.CalledProcessError as exc:
+        sys.stderr.write(exc.stderr.decode(errors="replace"))
+        sys.exit(2)
+    finally:
+        if store is not None:
+            store.close()
+    for failure in summary.failures:
+        sys.stdout.write(f"{failure.sha} {failure.diagnostic}: {failure.title}\n")
+    if not summary.ok:
+        sys.stderr.write(
+            f"{len(summary.failures)} of {summary.checked} new commits have "
+            "invalid messages\n"
+        )
+        sys.exit(1)
@@ -1 +1,3 @@
 """Shared code for the project."""
+
+__version__ = "0.7.0"
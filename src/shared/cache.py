@@ -0,0 +1,95 @@
+"""Persistent cache of resolved settings."""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import attrs
+
+from shared import __version__
+from shared.settings import MojiSettings, find_config_files, get_settings
+
+# opt in to the cache by setting this environment variable to a non-empty value
+CACHE_ENV_VAR = "GITMOJIFY_CACHE"
+
+
+def is_enabled() -> bool:
+    """Whether the cache is enabled."""
+    return bool(os.environ.get(CACHE_ENV_VAR))
+
+
+def get_cache_dir() -> Path:
+    """Return the directory the cache files are stored in."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home, "cz-conventional-gitmoji")
+
+
+def get_fingerprint(paths: List[Path]) -> List[Dict[str, Any]]:
+    """Return what identifies the current state of the config files."""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            content = path.read_bytes()
+        except OSError:
+            continue
+        fingerprint.append(
+            {
+                "path": str(path.resolve()),
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": hashlib.sha256(content).hexdigest(),
+            }
+        )
+    return fingerprint
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    """Write the file so that readers only ever see complete contents."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def get_cached_settings(filepath: Optional[str] = None) -> MojiSettings:
+    """Get the settings, cached on disk.
+
+    The cache is keyed on the path, mtime and hash of the config files and on
+    the package version, and rebuilt when any of them changes. A hit still
+    finds, reads and hashes the config files, it only saves parsing them and
+    resolving the settings. Failing to read or write the cache is never an
+    error, the settings are resolved as usual.
+
+    Args:
+        filepath: Path to the configuration file.
+
+    Returns:
+        The settings.
+    """
+    paths = [Path(filepath)] if filepath is not None else find_config_files()
+    key = {"version": __version__, "files": get_fingerprint(paths)}
+    # one cache file per lookup, so that projects don't evict each other
+    lookup = hashlib.sha256(f"{Path.cwd()}\0{filepath}".encode()).hexdigest()
+    cache_file = get_cache_dir() / f"settings-{lookup[:32]}.json"
+    try:
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        if cached["key"] == key:
+            return MojiSettings(**cached["settings"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    settings = get_settings(filepath)
+    content = json.dumps({"key": key, "settings": attrs.asdict(settings)})
+    try:
+        _write_atomic(cache_file, content)
+    except OSError:
+        pass
+    return settings
@@ -0,0 +1,215 @@
+"""Commit type classification."""
+
+import functools
+import re
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import attrs
+
+from shared.diagnostics import Diagnostic, Failure, diagnose_tail
+from shared.model import Gitmoji
+from shared.registry import GitmojiRegistry, get_registry
+from shared.utils import SCOPE_PATTERN, SUBJECT_PATTERN
+
+# the type token runs until the scope, the breaking marker or the colon
+TYPE_TOKEN_PATTERN = re.compile(r"[^\s(!:]*")
+# the rest of the header, from the end of the type group to the end of the line
+HEADER_TAIL_PATTERN = re.compile(
+    f"(?P<scope>{SCOPE_PATTERN})(?P<subject>{SUBJECT_PATTERN})"
+)
+# without a blank line after the header, only whitespace may follow it
+BLANK_PATTERN = re.compile(r"\s*\Z")
+
+
+@attrs.define(frozen=True)
+class ParsedMessage:
+    """A commit message split into the groups of the validation pattern.
+
+    The body is not copied out of the message when parsing, it is only sliced
+    from the message when it is accessed.
+    """
+
+    gitmoji: Gitmoji
+    type_group: str
+    scope: str
+    subject: str
+    message: str = attrs.field(repr=False)
+    # the offset of the body in the message, i.e. the end of the header
+    body_start: int
+
+    @property
+    def body(self) -> str:
+        """The body, including the blank line separating it from the header."""
+        return self.message[self.body_start :]
+
+    @property
+    def has_icon(self) -> bool:
+        """Whether the type group contains the icon."""
+        return self.type_group != self.gitmoji.type
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Return a pattern matching any of the words, factored by common prefixes.
+
+    Unlike a plain alternation, the regex engine never has to try more than one
+    branch at each position of the resulting pattern.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: Dict[str, Any]) -> str:
+    """Return the pattern for a node of the trie."""
+    branches = [
+        re.escape(char) + _node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    optional = "" in node
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    pattern = f"(?:{'|'.join(branches)})"
+    return f"{pattern}?" if optional else pattern
+
+
+class TypeClassifier:
+    """Classify commit messages by their type in a single pass.
+
+    The type group is found by dictionary lookups of the icon and the type
+    token instead of trying every `(icon {1,2})?type` alternative in turn, so
+    classifying a message costs the same regardless of its type.
+
+    Messages are decided on their header alone. The body is valid as soon as
+    it starts with a blank line, so it is never scanned and validating a
+    message costs the same however large its body is.
+
+    Args:
+        registry: The active gitmojis.
+        conventional_messages: Whether the gitmoji starts the subject instead
+            of the type group, e.g. `feat: ✨ add x`. The type group is then
+            the bare type.
+    """
+
+    def __init__(
+        self, registry: GitmojiRegistry, conventional_messages: bool = False
+    ) -> None:
+        self._registry = registry
+        self._by_type = registry.by_type
+        self._conventional_messages = conventional_messages
+        # shortcodes are spellings of the icon, e.g. `:sparkles:` for `✨`
+        self._by_icon = (
+            {} if conventional_messages else {**registry.by_icon, **registry.by_code}
+        )
+        self._max_icon_length = max(map(len, self._by_icon), default=0)
+
+    @functools.cached_property
+    def type_group_pattern(self) -> str:
+        """Pattern matching any type group, factored as a trie."""
+        if self._conventional_messages:
+            return trie_pattern(self._by_type)
+        return trie_pattern(
+            type_group
+            for moji in self._by_type.values()
+            for type_group in (
+                moji.type,
+                f"{moji.icon} {moji.type}",
+                f"{moji.icon}  {moji.type}",
+                f"{moji.code} {moji.type}",
+                f"{moji.code}  {moji.type}",
+            )
+        )
+
+    @functools.cached_property
+    def spelling_pattern(self) -> str:
+        """Pattern matching any spelling of a type group, factored as a trie.
+
+        Unlike `type_group_pattern`, icons also match without or with an extra
+        variation selector, as found in histories written by other tools.
+        """
+        return trie_pattern(self._registry.spellings)
+
+    def _match_type_group(self, message: str) -> Union[Tuple[Gitmoji, int], Diagnostic]:
+        """Return the gitmoji and the end of the type group, or the failure."""
+        pos = 0
+        icon = None
+        space = message.find(" ", 0, self._max_icon_length + 1)
+        if space > 0:
+            icon = self._by_icon.get(message[:space])
+            if icon is not None:
+                pos = space + 2 if message.startswith("  ", space) else space + 1
+        end = TYPE_TOKEN_PATTERN.match(message, pos).end()  # type: ignore[union-attr]
+        moji = self._by_type.get(message[pos:end])
+        if moji is None:
+            failure = Failure.UNKNOWN_TYPE if message else Failure.EMPTY_MESSAGE
+            return Diagnostic(failure, pos)
+        if icon is not None and icon is not moji:
+            return Diagnostic(Failure.WRONG_ICON, 0)
+        return moji, end
+
+    def validate(self, message: str) -> Union[ParsedMessage, Diagnostic]:
+        """Parse a commit message or find why it is invalid, in a single pass.
+
+        Args:
+            message: The complete commit message.
+
+        Returns:
+            The parsed message, or the failure and the offset at which the
+            message stops matching the validation pattern.
+        """
+        type_group = self._match_type_group(message)
+        if isinstance(type_group, Diagnostic):
+            return type_group
+        moji, end = type_group
+        tail = HEADER_TAIL_PATTERN.match(message, end)
+        if tail is None:
+            return diagnose_tail(message, end)
+        body_start = tail.end()
+        # same as the body group of the validation pattern, `((\n\n.*)|(\s*))?$`,
+        # without going past the blank line or the leading whitespace
+        if not (
+            message.startswith("\n\n", body_start)
+            or BLANK_PATTERN.match(message, body_start)
+        ):
+            return diagnose_tail(message, end)
+        return ParsedMessage(
+            gitmoji=moji,
+            type_group=message[:end],
+            scope=tail.group("scope"),
+            subject=tail.group("subject"),
+            message=message,
+            body_start=body_start,
+        )
+
+    def classify(self, message: str) -> Optional[ParsedMessage]:
+        """Parse a commit message.
+
+        Args:
+            message: The complete commit message.
+
+        Returns:
+            The parsed message or `None` if the message is invalid.
+        """
+        parsed = self.validate(message)
+        return parsed if isinstance(parsed, ParsedMessage) else None
+
+
+@functools.cache
+def get_classifier(
+    types: Optional[Tuple[str, ...]] = None, conventional_messages: bool = False
+) -> TypeClassifier:
+    """Return the classifier for a gitmoji set, built once per process.
+
+    Args:
+        types: The types of the active gitmoji set. All gitmojis are active if
+            not given.
+        conventional_messages: Whether the gitmoji starts the subject instead
+            of the type group.
+    """
+    return TypeClassifier(get_registry(types), conventional_messages)
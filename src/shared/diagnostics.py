@@ -0,0 +1,85 @@
+"""Structured validation failures."""
+
+import enum
+import re
+
+import attrs
+
+from shared.utils import SCOPE_PATTERN, SUBJECT_PATTERN
+
+_SCOPE = re.compile(SCOPE_PATTERN)
+# the scope and breaking marker without the colon, to find where it is missing
+_SCOPE_PREFIX = re.compile(SCOPE_PATTERN[:-1])
+_SUBJECT = re.compile(SUBJECT_PATTERN)
+
+
+class Failure(enum.Enum):
+    """Why a commit message doesn't follow the convention."""
+
+    EMPTY_MESSAGE = "empty message"
+    UNKNOWN_TYPE = "unknown type"
+    WRONG_ICON = "wrong icon"
+    MISSING_ICON = "missing icon"
+    BAD_SCOPE = "bad scope"
+    MISSING_COLON = "missing colon"
+    MISSING_SUBJECT = "missing subject"
+    BAD_BODY = "missing blank line before body"
+
+    def __str__(self) -> str:
+        """Return the description of the failure."""
+        return self.value
+
+
+@attrs.define(frozen=True)
+class Diagnostic:
+    """Where and why a commit message doesn't follow the convention.
+
+    Examples:
+        >>> str(Diagnostic(Failure.MISSING_SUBJECT, 5))
+        'missing subject at offset 5'
+    """
+
+    failure: Failure
+    # the offset of the first character of the message that doesn't match
+    offset: int
+
+    def __str__(self) -> str:
+        """Return the failure and its offset."""
+        return f"{self.failure} at offset {self.offset}"
+
+
+class InvalidMessageError(ValueError):
+    """A commit message doesn't follow the convention."""
+
+    def __init__(self, diagnostic: Diagnostic) -> None:
+        super().__init__(f"invalid commit message: {diagnostic}")
+        self.diagnostic = diagnostic
+
+
+def diagnose_tail(message: str, pos: int) -> Diagnostic:
+    """Return why the tail of a message doesn't match the validation pattern.
+
+    The parts of the tail are matched in turn, so the diagnostic is that of the
+    first part the message doesn't match.
+
+    Args:
+        message: The complete commit message.
+        pos: The end of the type group.
+
+    Examples:
+        >>> diagnose_tail("feat(core) a feature", 4)
+        Diagnostic(failure=<Failure.MISSING_COLON: 'missing colon'>, offset=10)
+        >>> diagnose_tail("feat:a feature", 4)
+        Diagnostic(failure=<Failure.MISSING_SUBJECT: 'missing subject'>, offset=5)
+    """
+    scope = _SCOPE.match(message, pos)
+    if scope is None:
+        end = _SCOPE_PREFIX.match(message, pos).end()  # type: ignore[union-attr]
+        if end == pos and message.startswith("(", pos):
+            return Diagnostic(Failure.BAD_SCOPE, pos)
+        return Diagnostic(Failure.MISSING_COLON, end)
+    subject = _SUBJECT.match(message, scope.end())
+    if subject is None:
+        return Diagnostic(Failure.MISSING_SUBJECT, scope.end())
+    # the tail didn't match, so the body doesn't either
+    return Diagnostic(Failure.BAD_BODY, subject.end())
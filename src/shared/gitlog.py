@@ -0,0 +1,91 @@
+"""Stream the output of git."""
+
+import contextlib
+import subprocess
+from typing import IO, BinaryIO, Generator, Iterator, Optional, Sequence, cast
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def read_messages(
+    stream: BinaryIO,
+    encoding: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    errors: str = "strict",
+) -> Iterator[str]:
+    """Read NUL-separated messages from the stream as they arrive.
+
+    Args:
+        stream: The binary stream, e.g. stdin or the output of git.
+        encoding: The encoding of the messages.
+        chunk_size: The number of bytes read at once.
+        errors: How undecodable bytes are handled, as for `bytes.decode`.
+    """
+    read = getattr(stream, "read1", stream.read)
+    pending = b""
+    for chunk in iter(lambda: read(chunk_size), b""):
+        *messages, pending = (pending + chunk).split(b"\0")
+        for message in messages:
+            yield message.decode(encoding, errors)
+    if pending:
+        yield pending.decode(encoding, errors)
+
+
+@contextlib.contextmanager
+def git_output(
+    args: Sequence[str], stdin: Optional[IO[bytes]] = None
+) -> Iterator[BinaryIO]:
+    """Run git and provide its output while it is written.
+
+    Leaving the block before the output is read to the end, e.g. when the
+    caller stops early, kills git, so it is never left blocked on the pipe.
+
+    Args:
+        args: The arguments of git.
+        stdin: The input of git, nothing if not given.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails.
+    """
+    cmd = ["git", *args]
+    process = subprocess.Popen(
+        cmd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    stdout = cast(BinaryIO, process.stdout)
+    stderr = cast(BinaryIO, process.stderr)
+    try:
+        yield stdout
+        # the caller stopped early, git is killed below
+        if stdout.read(1):
+            return
+        error = stderr.read()
+    finally:
+        if process.poll() is None:
+            process.kill()
+        stdout.close()
+        stderr.close()
+        process.wait()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stderr=error)
+
+
+def iter_git_log(
+    args: Sequence[str],
+    encoding: str = "utf-8",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    errors: str = "strict",
+) -> Generator[str, None, None]:
+    """Stream the records of `git log -z`, e.g. one per commit.
+
+    Args:
+        args: The arguments of `git log`, e.g. the format and the revisions.
+        encoding: The encoding of the records.
+        chunk_size: The number of bytes read at once.
+        errors: How undecodable bytes are handled, as for `bytes.decode`.
+
+    Raises:
+        subprocess.CalledProcessError: If git fails.
+    """
+    log_args = ["-c", "log.showSignature=False", "log", "-z", *args]
+    with git_output(log_args) as stdout:
+        yield from read_messages(stdout, encoding, chunk_size, errors)
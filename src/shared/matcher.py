@@ -0,0 +1,126 @@
+"""Matcher backends validating commit messages."""
+
+import functools
+import re
+from typing import Optional, Tuple, Union, cast
+
+from shared.classifier import ParsedMessage, TypeClassifier, get_classifier
+from shared.diagnostics import Diagnostic
+from shared.registry import GitmojiRegistry, get_registry
+from shared.utils import LINEAR_PATTERN, get_compiled_pattern, get_type_group_pattern
+
+try:
+    import re2
+except ImportError:  # pragma: no cover
+    re2 = None
+
+# the hand-written parser of the classifier, linear in the header length
+PARSER = "parser"
+# the validation pattern, as used by `cz check`
+RE = "re"
+# the validation pattern compiled by `google-re2`, which runs in linear time
+RE2 = "re2"
+BACKENDS = (PARSER, RE, RE2)
+
+
+class PatternMatcher:
+    """Validate commit messages with a compiled validation pattern.
+
+    The diagnostic of an invalid message is found by the classifier, which
+    agrees with the pattern on which messages are valid.
+
+    Args:
+        pattern: The compiled validation pattern.
+        registry: The active gitmojis.
+        classifier: The classifier of the active gitmojis.
+    """
+
+    def __init__(
+        self,
+        pattern: "re.Pattern[str]",
+        registry: GitmojiRegistry,
+        classifier: TypeClassifier,
+    ) -> None:
+        self._pattern = pattern
+        self._spellings = registry.spellings
+        self._classifier = classifier
+
+    def validate(self, message: str) -> Union[ParsedMessage, Diagnostic]:
+        """Parse a commit message or find why it is invalid.
+
+        Args:
+            message: The complete commit message.
+
+        Returns:
+            The parsed message, or the failure and the offset at which the
+            message stops matching the validation pattern.
+        """
+        match = self._pattern.match(message)
+        if match is None:
+            return self._classifier.validate(message)
+        type_group, scope, subject = match.group("type_group", "scope", "subject")
+        return ParsedMessage(
+            gitmoji=self._spellings[type_group],
+            type_group=type_group,
+            scope=scope,
+            subject=subject,
+            message=message,
+            body_start=len(type_group) + len(scope) + len(subject),
+        )
+
+    def classify(self, message: str) -> Optional[ParsedMessage]:
+        """Parse a commit message.
+
+        Args:
+            message: The complete commit message.
+
+        Returns:
+            The parsed message or `None` if the message is invalid.
+        """
+        parsed = self.validate(message)
+        return parsed if isinstance(parsed, ParsedMessage) else None
+
+
+Matcher = Union[TypeClassifier, PatternMatcher]
+
+
+@functools.cache
+def get_matcher(
+    backend: Optional[str] = None,
+    types: Optional[Tuple[str, ...]] = None,
+    conventional_messages: bool = False,
+) -> Matcher:
+    """Return the matcher of a backend for a gitmoji set, built once per process.
+
+    All backends accept the same messages. The parser and `re2` take linear
+    time on any input, `re` is the engine `cz check` matches the schema
+    pattern with.
+
+    Args:
+        backend: `parser`, `re` or `re2`, the parser if not given.
+        types: The types of the active gitmoji set. All gitmojis are active if
+            not given.
+        conventional_messages: Whether the gitmoji starts the subject instead
+            of the type group.
+
+    Raises:
+        ValueError: If the backend is unknown or `google-re2` isn't installed
+            for the `re2` backend.
+    """
+    classifier = get_classifier(types, conventional_messages)
+    if backend is None or backend == PARSER:
+        return classifier
+    if backend == RE:
+        pattern = get_compiled_pattern(types, conventional_messages)
+    elif backend == RE2:
+        if re2 is None:
+            msg = "the re2 matcher needs the google-re2 package"
+            raise ValueError(msg)
+        type_group = get_type_group_pattern(types, conventional_messages)
+        pattern = cast(
+            "re.Pattern[str]", re2.compile(LINEAR_PATTERN.format(type_group=type_group))
+        )
+    else:
+        msg = f"unknown matcher: {backend}"
+        raise ValueError(msg)
+    return PatternMatcher(pattern, get_registry(types), classifier)
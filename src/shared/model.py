@@ -1,21 +1,35 @@
+import sys
+
 import attrs
 
 
 @attrs.define(frozen=True)
 class Gitmoji:
-    """Class that represents a gitmoji."""
-
-    type: str
-    icon: str
-    code: str
-    desc: str
-
-    @property
-    def value(self) -> str:
-        """The value property."""
-        return f"{self.icon} {self.type}"
-
-    @property
-    def name(self) -> str:
-        """The name property."""
-        return f"{self.value}: {self.desc}"
+    """Class that represents a gitmoji.
+
+    The derived strings are computed once when the gitmoji is created, and all
+    strings are interned, so reading them never allocates.
+    """
+
+    type: str = attrs.field(converter=sys.intern)
+    icon: str = attrs.field(converter=sys.intern)
+    code: str = attrs.field(converter=sys.intern)
+    desc: str = attrs.field(converter=sys.intern)
+    # the value property
+    value: str = attrs.field(init=False, eq=False, repr=False)
+    # the name property
+    name: str = attrs.field(init=False, eq=False, repr=False)
+    # the fragment of the validation pattern matching the type group
+    pattern: str = attrs.field(init=False, eq=False, repr=False)
+
+    @value.default
+    def _value(self) -> str:
+        return sys.intern(f"{self.icon} {self.type}")
+
+    @name.default
+    def _name(self) -> str:
+        return sys.intern(f"{self.value}: {self.desc}")
+
+    @pattern.default
+    def _pattern(self) -> str:
+        return sys.intern(f"((?:{self.icon}|{self.code}) {{1,2}})?{self.type}")
@@ -0,0 +1,131 @@
+"""Indexed gitmoji registry."""
+
+import functools
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+from shared.gitmojis import GitmojiEnum
+from shared.model import Gitmoji
+from shared.spec import mojis
+
+# the variation selector requesting the emoji presentation of a character
+VARIATION_SELECTOR = "\ufe0f"
+
+
+def icon_variants(icon: str) -> Tuple[str, ...]:
+    r"""Return the spellings of an icon, with and without variation selector.
+
+    Editors and tools don't agree on whether to keep the variation selector,
+    so both spellings are found in commit messages.
+
+    Examples:
+        >>> icon_variants("\u26a1\ufe0f") == ("\u26a1\ufe0f", "\u26a1")
+        True
+        >>> icon_variants("\u2728") == ("\u2728", "\u2728\ufe0f")
+        True
+    """
+    bare = icon.replace(VARIATION_SELECTOR, "")
+    variants = [icon, bare]
+    if len(bare) == 1:
+        variants.append(bare + VARIATION_SELECTOR)
+    return tuple(dict.fromkeys(variants))
+
+
+class GitmojiRegistry:
+    """The gitmojis, indexed by type, icon, shortcode and enum name.
+
+    The indexes are built once, so every lookup is a dictionary lookup.
+
+    Examples:
+        >>> registry = get_registry()
+        >>> registry.by_type["feat"].icon
+        '✨'
+        >>> registry.by_code[":bug:"].type
+        'fix'
+        >>> registry.from_enum(GitmojiEnum.DOCS).type
+        'docs'
+    """
+
+    def __init__(self, gitmojis: Iterable[Gitmoji]) -> None:
+        self._gitmojis = tuple(gitmojis)
+        self._by_type = {moji.type: moji for moji in self._gitmojis}
+        self._by_icon = {moji.icon: moji for moji in self._gitmojis}
+        self._by_code = {moji.code: moji for moji in self._gitmojis}
+        self._by_name = {
+            member.name: self._by_icon[member.value]
+            for member in GitmojiEnum
+            if member.value in self._by_icon
+        }
+
+    def __iter__(self) -> Iterator[Gitmoji]:
+        """Iterate over the gitmojis, in registry order."""
+        return iter(self._gitmojis)
+
+    def __len__(self) -> int:
+        """Return the number of gitmojis."""
+        return len(self._gitmojis)
+
+    @property
+    def types(self) -> Tuple[str, ...]:
+        """The types, in registry order."""
+        return tuple(self._by_type)
+
+    @property
+    def by_type(self) -> Mapping[str, Gitmoji]:
+        """The gitmojis by type, e.g. `feat`."""
+        return self._by_type
+
+    @property
+    def by_icon(self) -> Mapping[str, Gitmoji]:
+        """The gitmojis by icon, e.g. `✨`."""
+        return self._by_icon
+
+    @property
+    def by_code(self) -> Mapping[str, Gitmoji]:
+        """The gitmojis by shortcode, e.g. `:sparkles:`."""
+        return self._by_code
+
+    @property
+    def by_name(self) -> Mapping[str, Gitmoji]:
+        """The gitmojis by the name of their `GitmojiEnum` member, e.g. `FEAT`."""
+        return self._by_name
+
+    @functools.cached_property
+    def spellings(self) -> Mapping[str, Gitmoji]:
+        """The gitmojis by every spelling of their type group.
+
+        The spellings are the bare type, e.g. `perf`, and any variant of the
+        icon or the shortcode followed by one or two spaces and the type, e.g.
+        `⚡️ perf`, `⚡  perf` or `:zap: perf`.
+        """
+        spellings: Dict[str, Gitmoji] = {}
+        for moji in self._gitmojis:
+            spellings[moji.type] = moji
+            for icon in (*icon_variants(moji.icon), moji.code):
+                spellings[f"{icon} {moji.type}"] = moji
+                spellings[f"{icon}  {moji.type}"] = moji
+        return spellings
+
+    def from_enum(self, member: GitmojiEnum) -> Gitmoji:
+        """Return the gitmoji of an enum member.
+
+        Raises:
+            KeyError: If the gitmoji is not in the registry.
+        """
+        return self._by_icon[member.value]
+
+
+@functools.cache
+def get_registry(types: Optional[Tuple[str, ...]] = None) -> GitmojiRegistry:
+    """Return the registry of a gitmoji set, built once per process.
+
+    Args:
+        types: Only include the gitmojis with these types, in this order. All
+            gitmojis are included if not given.
+
+    Raises:
+        KeyError: If one of the types is unknown.
+    """
+    if types is None:
+        return GitmojiRegistry(Gitmoji(**moji) for moji in mojis)
+    by_type = get_registry().by_type
+    return GitmojiRegistry(by_type[gtype] for gtype in types)
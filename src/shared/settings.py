@@ -1,26 +1,180 @@
 """Settings."""
 
-from typing import List, Optional
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import attrs
-from commitizen import config
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover
+    try:
+        import tomli as tomllib  # type: ignore[no-redef]
+    except ImportError:
+        tomllib = None  # type: ignore[assignment]
 
 DEFAULT_CONVERT_PREFIXES = ["Merge", "Revert", "Squash"]
+# mirror the commitizen defaults of the settings we use, so they can be
+# resolved without importing commitizen
+DEFAULT_ALLOWED_PREFIXES = [
+    "Merge",
+    "Revert",
+    "Pull request",
+    "fixup!",
+    "squash!",
+    "amend!",
+]
+DEFAULT_ENCODING = "utf-8"
+# the types of `cz_conventional_commits`, used with `conventional_types_only`
+CONVENTIONAL_TYPES = (
+    "feat",
+    "fix",
+    "docs",
+    "style",
+    "refactor",
+    "perf",
+    "test",
+    "build",
+    "ci",
+    "chore",
+    "revert",
+)
+# config files in the order commitizen looks them up
+CONFIG_FILES = (
+    ".cz.toml",
+    "cz.toml",
+    ".cz.json",
+    "cz.json",
+    ".cz.yaml",
+    "cz.yaml",
+    "pyproject.toml",
+)
+
+
+def _to_list(value: Iterable[str]) -> List[str]:
+    """Convert config values, e.g. TOML arrays, to plain lists."""
+    return list(value)
 
 
 @attrs.define(kw_only=True)
 class MojiSettings:
     """Settings."""
 
-    allowed_prefixes: List[str]
-    convert_prefixes: List[str] = attrs.field(factory=lambda: DEFAULT_CONVERT_PREFIXES)
+    allowed_prefixes: List[str] = attrs.field(converter=_to_list)
+    convert_prefixes: List[str] = attrs.field(
+        factory=lambda: DEFAULT_CONVERT_PREFIXES, converter=_to_list
+    )
+    # only allow the types of `cz_conventional_commits`
     conventional_types_only: bool = False
+    # put the gitmoji at the start of the subject, e.g. `feat: ✨ add x`
     conventional_messages: bool = False
+    # write gitmojis as `icon` or `code`, keep them as written if not set
+    gitmoji_format: Optional[str] = None
+    # the engine validating messages: `parser`, `re` or `re2`
+    matcher: Optional[str] = None
     encoding: str
 
+    @property
+    def types(self) -> Optional[Tuple[str, ...]]:
+        """The types of the active gitmoji set, all gitmojis are active if `None`."""
+        return CONVENTIONAL_TYPES if self.conventional_types_only else None
 
-def get_settings(filepath: Optional[str] = None) -> MojiSettings:
-    """Get settings."""
-    cfg = config.read_cfg(filepath)
+
+def _from_mapping(settings: Dict[str, Any]) -> MojiSettings:
+    """Create the settings from a mapping, ignoring unknown keys."""
     fields_used = {field.name for field in attrs.fields(MojiSettings)}
-    return MojiSettings(**{k: v for k, v in cfg.settings.items() if k in fields_used})  # type: ignore[arg-type]
+    return MojiSettings(**{k: v for k, v in settings.items() if k in fields_used})
+
+
+def _find_git_root(path: Path) -> Optional[Path]:
+    """Return the root of the git project containing the path, if any."""
+    for directory in (path, *path.parents):
+        if directory.joinpath(".git").exists():
+            return directory
+    return None
+
+
+def find_config_files() -> List[Path]:
+    """Return the existing config files, in the order commitizen checks them."""
+    cwd = Path.cwd()
+    search_paths = [cwd]
+    git_root = _find_git_root(cwd)
+    if git_root is not None and git_root != cwd:
+        search_paths.append(git_root)
+    return [
+        path
+        for directory in search_paths
+        for path in (directory / filename for filename in CONFIG_FILES)
+        if path.is_file()
+    ]
+
+
+def _read_section(path: Path) -> Optional[Dict[str, Any]]:
+    """Read the commitizen section of a config file.
+
+    Raises:
+        LookupError: If the file can't be read without commitizen.
+    """
+    if "json" in path.suffix:
+        try:
+            section = json.loads(path.read_bytes()).get("commitizen")
+        except (json.JSONDecodeError, AttributeError) as exc:
+            raise LookupError(path) from exc
+        return section
+    if "toml" in path.suffix and tomllib is not None:
+        try:
+            with path.open("rb") as f:
+                doc = tomllib.load(f)
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as exc:
+            raise LookupError(path) from exc
+        return doc.get("tool", {}).get("commitizen")
+    raise LookupError(path)
+
+
+def _read_settings(filepath: Optional[str]) -> Dict[str, Any]:
+    """Read the settings without importing commitizen.
+
+    Raises:
+        LookupError: If the settings can't be resolved without commitizen, e.g.
+            for YAML files or missing or invalid config files.
+    """
+    settings: Dict[str, Any] = {
+        "allowed_prefixes": DEFAULT_ALLOWED_PREFIXES,
+        "encoding": DEFAULT_ENCODING,
+    }
+    if filepath is not None:
+        path = Path(filepath)
+        section = _read_section(path) if path.is_file() else None
+        if section is None:
+            raise LookupError(path)
+        settings.update(section)
+        return settings
+    for path in find_config_files():
+        section = _read_section(path)
+        if section is not None:
+            settings.update(section)
+            break
+    return settings
+
+
+def _read_commitizen_settings(filepath: Optional[str]) -> Dict[str, Any]:
+    """Read the settings with commitizen."""
+    from commitizen import config
+
+    return dict(config.read_cfg(filepath).settings)
+
+
+def get_settings(filepath: Optional[str] = None) -> MojiSettings:
+    """Get settings.
+
+    The commitizen section of TOML and JSON config files is read directly, so
+    that the commit hook doesn't pay for importing commitizen. Commitizen is
+    only used for the config files it can't handle itself, and to report
+    missing or invalid config files.
+    """
+    try:
+        settings = _read_settings(filepath)
+    except LookupError:
+        settings = _read_commitizen_settings(filepath)
+    return _from_mapping(settings)
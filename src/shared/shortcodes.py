@@ -0,0 +1,87 @@
+"""Translation between gitmoji icons and shortcodes."""
+
+import functools
+import re
+from typing import Optional, Tuple
+
+from shared.classifier import trie_pattern
+from shared.registry import GitmojiRegistry, get_registry, icon_variants
+
+# the formats gitmojis can be normalized to
+ICON = "icon"
+CODE = "code"
+FORMATS = (ICON, CODE)
+
+
+class ShortcodeTranslator:
+    """Translate between the icons and the shortcodes of gitmojis.
+
+    The shortcodes and the icon variants are each compiled once into a single
+    pattern factored as a trie, so translating a text is one linear scan,
+    however many gitmojis there are.
+
+    Args:
+        registry: The gitmojis to translate.
+
+    Examples:
+        >>> translator = get_translator()
+        >>> translator.to_icons(":sparkles: feat: add :bug: hunting")
+        '✨ feat: add 🐛 hunting'
+        >>> translator.to_codes("✨ feat: a feature")
+        ':sparkles: feat: a feature'
+    """
+
+    def __init__(self, registry: GitmojiRegistry) -> None:
+        self._icons = {moji.code: moji.icon for moji in registry}
+        self._codes = {
+            variant: moji.code
+            for moji in registry
+            for variant in icon_variants(moji.icon)
+        }
+        self._code_pattern = re.compile(trie_pattern(self._icons))
+        self._icon_pattern = re.compile(trie_pattern(self._codes))
+
+    def to_icons(self, text: str) -> str:
+        """Replace the shortcodes in the text with their icon."""
+        if ":" not in text:
+            return text
+        icons = self._icons
+        return self._code_pattern.sub(lambda match: icons[match.group()], text)
+
+    def to_codes(self, text: str) -> str:
+        """Replace the icons in the text, in any variant, with their shortcode."""
+        if text.isascii():
+            return text
+        codes = self._codes
+        return self._icon_pattern.sub(lambda match: codes[match.group()], text)
+
+    def normalize(self, text: str, gitmoji_format: Optional[str]) -> str:
+        """Write the gitmojis of the text in a format.
+
+        Args:
+            text: The text to normalize.
+            gitmoji_format: `icon` or `code`. The text is returned as is if not
+                given.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if gitmoji_format is None:
+            return text
+        if gitmoji_format == ICON:
+            return self.to_icons(text)
+        if gitmoji_format == CODE:
+            return self.to_codes(text)
+        msg = f"unknown gitmoji format: {gitmoji_format}"
+        raise ValueError(msg)
+
+
+@functools.cache
+def get_translator(types: Optional[Tuple[str, ...]] = None) -> ShortcodeTranslator:
+    """Return the translator of a gitmoji set, built once per process.
+
+    Args:
+        types: The types of the active gitmoji set. All gitmojis are active if
+            not given.
+    """
+    return ShortcodeTranslator(get_registry(types))
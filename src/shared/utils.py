@@ -1,29 +1,100 @@
-from typing import List
+import argparse
+import functools
+import re
+from typing import List, Optional, Tuple
 
 from shared.model import Gitmoji
-from shared.spec import mojis
+from shared.registry import get_registry
 
-# global pattern to validate commit messages
-PATTERN = (
-    r"(?s)"
-    r"(?P<type_group>{type_group})"
-    r"(?P<scope>(\(\S+\))?!?:)"
-    r"(?P<subject>( [^\n\r]+))"
-    r"(?P<body>((\n\n.*)|(\s*))?$)"
+# the parts of a commit message following the type group
+SCOPE_PATTERN = r"(\(\S+\))?!?:"
+SUBJECT_PATTERN = r"( [^\n\r]+)"
+BODY_PATTERN = r"((\n\n.*)|(\s*))?$"
+# pattern for everything following the type group of a commit message, for
+# engines that run in linear time
+LINEAR_TAIL_PATTERN = (
+    f"(?P<scope>{SCOPE_PATTERN})(?P<subject>{SUBJECT_PATTERN})(?P<body>{BODY_PATTERN})"
+)
+# the same for backtracking engines. When the body doesn't match, `re` would
+# retry every shorter subject, which takes quadratic time, e.g. for a subject
+# ending in a long run of spaces. A shorter subject can't be followed by a
+# valid body, so the subject is matched atomically, emulated by a lookahead and
+# a backreference as atomic groups need Python 3.11
+TAIL_PATTERN = (
+    f"(?P<scope>{SCOPE_PATTERN})"
+    f"(?P<subject>(?=(?P<atomic_subject>{SUBJECT_PATTERN}))(?P=atomic_subject))"
+    f"(?P<body>{BODY_PATTERN})"
 )
+# global pattern to validate commit messages
+PATTERN = r"(?s)" r"(?P<type_group>{type_group})" + TAIL_PATTERN
+# the same for linear time engines, which support neither lookaheads nor
+# backreferences
+LINEAR_PATTERN = r"(?s)" r"(?P<type_group>{type_group})" + LINEAR_TAIL_PATTERN
+
+
+def positive_int(value: str) -> int:
+    """Parse a command line count that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        msg = f"must be at least 1, not {number}"
+        raise argparse.ArgumentTypeError(msg)
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    """Parse a command line count that must be at least 0."""
+    number = int(value)
+    if number < 0:
+        msg = f"must be at least 0, not {number}"
+        raise argparse.ArgumentTypeError(msg)
+    return number
 
 
-def get_gitmojis() -> List[Gitmoji]:
-    """Return the list of Gitmoji objects."""
-    return [Gitmoji(**moji) for moji in mojis]
+def get_gitmojis(types: Optional[Tuple[str, ...]] = None) -> List[Gitmoji]:
+    """Return the list of Gitmoji objects.
 
+    Args:
+        types: Only return the gitmojis with these types, in this order. All
+            gitmojis are returned if not given.
+    """
+    return list(get_registry(types))
 
-def get_type_group_pattern() -> str:
-    """Return the type group pattern."""
-    return "|".join([f"({moji.icon} {{1,2}})?{moji.type}" for moji in get_gitmojis()])
 
+def get_type_group_pattern(
+    types: Optional[Tuple[str, ...]] = None, conventional_messages: bool = False
+) -> str:
+    """Return the type group pattern.
 
-def get_pattern() -> str:
+    With conventional messages, the gitmoji is part of the subject, so the type
+    group is the bare type.
+    """
+    if conventional_messages:
+        return "|".join([re.escape(moji.type) for moji in get_registry(types)])
+    return "|".join([moji.pattern for moji in get_registry(types)])
+
+
+@functools.cache
+def get_pattern(
+    types: Optional[Tuple[str, ...]] = None, conventional_messages: bool = False
+) -> str:
     """Return the complete validation pattern."""
-    type_group = get_type_group_pattern()
+    type_group = get_type_group_pattern(types, conventional_messages)
     return PATTERN.format(type_group=type_group)
+
+
+@functools.cache
+def get_compiled_pattern(
+    types: Optional[Tuple[str, ...]] = None, conventional_messages: bool = False
+) -> "re.Pattern[str]":
+    """Return the compiled validation pattern.
+
+    The pattern is compiled once per process for each gitmoji set and shared by
+    all callers, so matching never goes through the `re` module's cache.
+
+    Args:
+        types: The types of the active gitmoji set. All gitmojis are active if
+            not given.
+        conventional_messages: Whether the gitmoji starts the subject instead
+            of the type group.
+    """
+    return re.compile(get_pattern(types, conventional_messages))
@@ -0,0 +1,55 @@
+"""Shared fixtures."""
+
+import subprocess
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+
+class GitRepo:
+    """A git repository of a test."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def git(self, *args: str) -> str:
+        """Run a git command in the repository and return its output."""
+        return subprocess.run(
+            ["git", "-C", str(self.path), *args],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+    def commit(self, *messages: str) -> List[str]:
+        """Create an empty commit per message and return the hashes, oldest first."""
+        shas = []
+        for message in messages:
+            self.git("commit", "--allow-empty", "-q", "-m", message)
+            shas.append(self.git("rev-parse", "HEAD").strip())
+        return shas
+
+
+GitRepoFactory = Callable[..., GitRepo]
+
+
+@pytest.fixture
+def git_repo(monkeypatch: pytest.MonkeyPatch) -> GitRepoFactory:
+    """Return a factory of repositories, committing with a test identity.
+
+    The factory takes the path of the repository, created if missing, and
+    extra arguments of `git init`.
+    """
+    for var in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{var}_NAME", "test")
+        monkeypatch.setenv(f"GIT_{var}_EMAIL", "test@example.com")
+    monkeypatch.delenv("GIT_DIR", raising=False)
+
+    def make(path: Path, *init_args: str) -> GitRepo:
+        path.mkdir(parents=True, exist_ok=True)
+        repo = GitRepo(path)
+        repo.git("init", "-q", *init_args)
+        return repo
+
+    return make
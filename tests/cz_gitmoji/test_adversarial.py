@@ -0,0 +1,90 @@
+"""Performance tests of the plugin patterns on adversarial input.
+
+Commit messages validated by server-side hooks may come from untrusted forks,
+so no pattern may take more than linear time on any input. The inputs are
+large enough for a quadratic pattern to take minutes, while a linear one takes
+milliseconds.
+"""
+
+import functools
+import re
+import time
+from typing import Callable, Dict
+
+import pytest
+
+from cz_gitmoji import bump
+from cz_gitmoji.main import CommitizenGitmojiCz
+from shared import matcher, utils
+from shared.gitmojis import GitmojiEnum
+
+SIZE = 100_000
+# generous, so that slow machines don't fail, and far below quadratic time
+TIME_BOUND = 0.5
+
+ADVERSARIAL_INPUTS: Dict[str, str] = {
+    "spaces in subject": "feat: a" + " " * SIZE + "b\nbody",
+    "spaces after type": "feat" + " " * SIZE,
+    "spaces after icon": f"{GitmojiEnum.FEAT}" + " " * SIZE + "feat: a",
+    "repeated icons": f"{GitmojiEnum.FEAT} " * SIZE + "feat: a",
+    "repeated shortcodes": ":sparkles: " * SIZE + "feat: a",
+    "open parentheses": "feat" + "(" * SIZE + ": a",
+    "close parentheses": "feat(" + ")" * SIZE + " a",
+    "unclosed scope": "feat(" + "a" * SIZE + "\n",
+    "repeated scopes": "feat" + "(a)" * SIZE + " a",
+    "repeated markers": "feat" + "!:" * SIZE,
+    "megabyte subject": "feat: " + "a" * (10 * SIZE) + "\nno blank line",
+    "megabyte body": "feat: a\n\n" + "a\n" * (5 * SIZE),
+    "indented lines": "feat: a" + "\n " * SIZE + "b",
+    "many headers": "feat(a\n" * SIZE,
+    "many breaking headers": "feat(a)!: b\n" * (SIZE // 10),
+}
+
+
+def _matcher(backend: str) -> Callable[[str], object]:
+    # as hooks validate messages
+    if backend == matcher.RE2 and matcher.re2 is None:
+        pytest.skip("needs google-re2")
+    return matcher.get_matcher(backend).validate
+
+
+def _schema_pattern() -> Callable[[str], object]:
+    # as `cz check` matches messages
+    return re.compile(utils.get_pattern()).match
+
+
+def _commit_parser(flags: int) -> Callable[[str], object]:
+    # as the changelog parses titles and body paragraphs
+    return re.compile(CommitizenGitmojiCz.commit_parser, flags).match
+
+
+def _bump(message: str) -> object:
+    return bump.find_increment(
+        [message], CommitizenGitmojiCz.bump_pattern, CommitizenGitmojiCz.bump_map
+    )
+
+
+TARGETS: Dict[str, Callable[[], Callable[[str], object]]] = {
+    "schema pattern": _schema_pattern,
+    "commit parser": lambda: _commit_parser(re.MULTILINE),
+    "commit parser, body": lambda: _commit_parser(re.MULTILINE | re.DOTALL),
+    "bump pattern": lambda: _bump,
+    "changelog pattern": lambda: (
+        re.compile(CommitizenGitmojiCz.changelog_pattern).match
+    ),
+    **{
+        f"{backend} matcher": functools.partial(_matcher, backend)
+        for backend in matcher.BACKENDS
+    },
+}
+
+
+@pytest.mark.parametrize("target", TARGETS)
+@pytest.mark.parametrize("name", ADVERSARIAL_INPUTS)
+def test_linear_time(target: str, name: str) -> None:
+    """Verify the patterns handle pathological input in bounded time."""
+    match = TARGETS[target]()
+    message = ADVERSARIAL_INPUTS[name]
+    start = time.perf_counter()
+    match(message)
+    assert time.perf_counter() - start < TIME_BOUND
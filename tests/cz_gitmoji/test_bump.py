@@ -0,0 +1,170 @@
+"""Bump classifier tests."""
+
+import itertools
+import re
+from typing import List, Mapping, Optional
+
+import pytest
+from commitizen.cz.base import BaseCommitizen
+from commitizen.defaults import MAJOR, MINOR, PATCH
+from commitizen.git import GitCommit
+
+from cz_gitmoji.bump import (
+    BumpClassifier,
+    find_increment,
+    get_bump_classifier,
+    select_decisive_commits,
+)
+from cz_gitmoji.main import CommitizenGitmojiCz
+from shared.gitmojis import GitmojiEnum as GJ  # noqa: N814
+
+MESSAGES = [
+    "docs: some docs",
+    f"{GJ.FIX} fix: a bug",
+    "fix(core): a bug",
+    f"{GJ.HOTFIX} hotfix: urgent",
+    f"{GJ.REFACTOR} refactor: tidy up",
+    "perf: faster",
+    "feat: a feature",
+    f"{GJ.FEAT}  feat(ui): a feature",
+    "feat!: breaking feature",
+    "docs: some docs\n\nBREAKING CHANGE: removed the old docs",
+    "chore: body mentions\nfeat: on a later line",
+    f"{GJ.BOOM} boom: explode",
+    "not a conventional message",
+]
+BUMP_MAPS = [
+    CommitizenGitmojiCz.bump_map,
+    CommitizenGitmojiCz.bump_map_major_version_zero,
+]
+
+
+def _reference_increment(
+    messages: List[str], bump_map: Mapping[str, Optional[str]]
+) -> Optional[str]:
+    """Compute the increment rule by rule and line by line, like commitizen."""
+    ranks = {None: 0, PATCH: 1, MINOR: 2, MAJOR: 3}
+    best = None
+    for message in messages:
+        for line in message.split("\n"):
+            match = re.search(CommitizenGitmojiCz.bump_pattern, line)
+            if match is None:
+                continue
+            for rule, increment in bump_map.items():
+                if re.match(rule, match.group(1)):
+                    if ranks[increment] > ranks[best]:
+                        best = increment
+                    break
+    return best
+
+
+@pytest.mark.parametrize("bump_map", BUMP_MAPS)
+@pytest.mark.parametrize("message", MESSAGES)
+def test_classify_matches_commitizen(
+    message: str, bump_map: Mapping[str, Optional[str]]
+) -> None:
+    """Verify single messages get the increment commitizen computes."""
+    classifier = BumpClassifier(CommitizenGitmojiCz.bump_pattern, bump_map)
+    assert classifier.classify(message) == _reference_increment([message], bump_map)
+
+
+@pytest.mark.parametrize("bump_map", BUMP_MAPS)
+def test_find_increment_matches_commitizen(
+    bump_map: Mapping[str, Optional[str]],
+) -> None:
+    """Verify batches of messages get the increment commitizen computes."""
+    for messages in itertools.combinations(MESSAGES, 3):
+        assert find_increment(
+            messages, CommitizenGitmojiCz.bump_pattern, bump_map
+        ) == _reference_increment(list(messages), bump_map)
+
+
+def test_find_increment_stops_at_highest() -> None:
+    """Verify messages after the highest possible increment aren't read."""
+
+    def messages():
+        yield "fix: a bug"
+        yield "feat!: breaking"
+        pytest.fail("read past the breaking change")
+
+    assert (
+        find_increment(
+            messages(), CommitizenGitmojiCz.bump_pattern, CommitizenGitmojiCz.bump_map
+        )
+        == MAJOR
+    )
+
+
+def test_find_increment_none() -> None:
+    """Verify messages that don't bump the version give no increment."""
+    assert (
+        find_increment(
+            ["docs: some docs", "chore: tidy"],
+            CommitizenGitmojiCz.bump_pattern,
+            CommitizenGitmojiCz.bump_map,
+        )
+        is None
+    )
+
+
+def test_get_bump_classifier_is_cached() -> None:
+    """Verify the classifier is compiled once per pattern and map."""
+    pattern, bump_map = CommitizenGitmojiCz.bump_pattern, CommitizenGitmojiCz.bump_map
+    assert get_bump_classifier(pattern, bump_map) is get_bump_classifier(
+        pattern, dict(bump_map)
+    )
+
+
+def _commit(message: str) -> GitCommit:
+    title, _, body = message.partition("\n")
+    return GitCommit(rev=str(hash(message)), title=title, body=body)
+
+
+def test_select_decisive_commits() -> None:
+    """Verify one commit per bump map decides the increment."""
+    commits = [
+        _commit(message)
+        for message in ["docs: docs", "fix: a bug", "feat: a feature", "feat!: x"]
+    ]
+    selected = select_decisive_commits(
+        commits, CommitizenGitmojiCz.bump_pattern, BUMP_MAPS
+    )
+    assert [commit.message for commit in selected] == ["feat: a feature", "feat!: x"]
+    assert (
+        select_decisive_commits(
+            commits[:1], CommitizenGitmojiCz.bump_pattern, BUMP_MAPS
+        )
+        == []
+    )
+
+
+@pytest.mark.parametrize("bump_map", BUMP_MAPS)
+def test_filter_commits_before_bump(
+    cz_gitmoji: CommitizenGitmojiCz, bump_map: Mapping[str, Optional[str]]
+) -> None:
+    """Verify the filtered commits keep the increment for either map."""
+    commits = [_commit(message) for message in MESSAGES]
+    selected = cz_gitmoji.filter_commits_before_bump(commits)
+    assert len(selected) <= len(BUMP_MAPS)
+    assert _reference_increment(
+        [commit.message for commit in selected], bump_map
+    ) == _reference_increment(MESSAGES, bump_map)
+
+
+@pytest.mark.parametrize("bump_map", BUMP_MAPS)
+def test_filter_commits_before_bump_without_hooks(
+    cz_gitmoji: CommitizenGitmojiCz,
+    bump_map: Mapping[str, Optional[str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verify the increment on commitizen versions without filtering hooks.
+
+    Those versions evaluate every commit, the filter is only used by the
+    report, and both give the increment of the whole history.
+    """
+    monkeypatch.delattr(BaseCommitizen, "filter_commits_before_bump", raising=False)
+    commits = [_commit(message) for message in MESSAGES]
+    selected = cz_gitmoji.filter_commits_before_bump(commits)
+    assert _reference_increment(
+        [commit.message for commit in selected], bump_map
+    ) == _reference_increment(MESSAGES, bump_map)
@@ -0,0 +1,229 @@
+"""Incremental changelog tests."""
+
+import inspect
+from pathlib import Path
+from typing import List
+
+import pytest
+from commitizen import changelog as cz_changelog
+from commitizen import config, git
+from commitizen.changelog_formats import get_changelog_format
+from commitizen.exceptions import GitCommandError
+from commitizen.tags import TagRules
+
+from cz_gitmoji.changelog import (
+    ChangelogCache,
+    ChangelogRenderer,
+    CommitParser,
+    generate_tree,
+    iter_commits,
+    main,
+)
+from cz_gitmoji.main import CommitizenGitmojiCz
+from shared.gitmojis import GitmojiEnum as GJ  # noqa: N814
+from tests.conftest import GitRepo, GitRepoFactory
+
+MESSAGES = [
+    f"{GJ.FEAT} feat: first feature",
+    "fix(core): a bug",
+    f"{GJ.DOCS} docs: some docs\n\nwith a body",
+    "not a conventional message",
+    f"{GJ.BOOM} boom!: drop support\n\nBREAKING CHANGE: it is gone",
+    f"{GJ.PERF} perf(db): faster queries",
+]
+
+
+@pytest.fixture(name="repo")
+def fixture_repo(
+    tmp_path: Path, git_repo: GitRepoFactory, monkeypatch: pytest.MonkeyPatch
+) -> GitRepo:
+    """Return a git project with tagged releases as the working directory."""
+    monkeypatch.chdir(tmp_path)
+    repo = git_repo(tmp_path)
+    tmp_path.joinpath("pyproject.toml").write_text(
+        '[tool.commitizen]\nname = "cz_gitmoji"\n'
+    )
+    for index, message in enumerate(MESSAGES):
+        repo.commit(message)
+        if index % 2:
+            repo.git("tag", f"v0.{index}.0")
+    return repo
+
+
+@pytest.fixture(name="project")
+def fixture_project(repo: GitRepo) -> Path:
+    """Return the root of the git project."""
+    return repo.path
+
+
+def _topo_commits() -> List[git.GitCommit]:
+    """Read the commits in topological order with commitizen."""
+    # the arguments are a single string before commitizen 4.16
+    default = inspect.signature(git.get_commits).parameters["args"].default
+    args = "--topo-order" if isinstance(default, str) else ["--topo-order"]
+    return git.get_commits(args=args)  # type: ignore[arg-type, unused-ignore]
+
+
+def _expected() -> str:
+    """Render the changelog with commitizen."""
+    cfg = config.read_cfg()
+    cz = CommitizenGitmojiCz(cfg)
+    rules = TagRules()
+    tree = cz_changelog.generate_tree_from_commits(
+        _topo_commits(),
+        rules.get_version_tags(git.get_tags()),
+        cz.commit_parser,
+        cz.changelog_pattern,
+        change_type_map=cz.change_type_map,
+        changelog_message_builder_hook=cz.changelog_message_builder_hook,
+        rules=rules,
+    )
+    tree = cz_changelog.generate_ordered_changelog_tree(tree, cz.change_type_order)
+    template = get_changelog_format(cfg, "CHANGELOG.md").template
+    return cz_changelog.render_changelog(
+        tree, cz.template_loader, template, incremental=False
+    ).lstrip("\n")
+
+
+def _render(cache_path: Path, stream: bool = False) -> str:
+    """Render the changelog with a cache."""
+    renderer = ChangelogRenderer(config.read_cfg())
+    cache = ChangelogCache(cache_path, renderer.parser.fingerprint)
+    try:
+        return renderer.render(cache=cache, stream=stream)
+    finally:
+        cache.close()
+
+
+def test_iter_commits(project: Path) -> None:
+    """Verify the streamed commits are those commitizen reads."""
+    expected = _topo_commits()
+    commits = list(iter_commits(args=["--topo-order"], chunk_size=16))
+    assert [vars(commit) for commit in commits] == [vars(commit) for commit in expected]
+    assert [commit.rev for commit in iter_commits("HEAD~2")] == [
+        commit.rev for commit in expected[:2]
+    ]
+
+
+def test_iter_commits_error(project: Path) -> None:
+    """Verify git errors are raised."""
+    with pytest.raises(GitCommandError):
+        list(iter_commits("unknown-revision"))
+
+
+def test_generate_tree(project: Path) -> None:
+    """Verify the tree is the one commitizen generates."""
+    cz = CommitizenGitmojiCz(config.read_cfg())
+    commits = _topo_commits()
+    tags = TagRules().get_version_tags(git.get_tags())
+    expected = cz_changelog.generate_tree_from_commits(
+        commits,
+        tags,
+        cz.commit_parser,
+        cz.changelog_pattern,
+        change_type_map=cz.change_type_map,
+        changelog_message_builder_hook=cz.changelog_message_builder_hook,
+    )
+    assert list(generate_tree(commits, tags, CommitParser(cz))) == list(expected)
+
+
+def test_parse_cache(project: Path) -> None:
+    """Verify parsed commits are served from the cache."""
+    cz = CommitizenGitmojiCz(config.read_cfg())
+    parser = CommitParser(cz)
+    commits = git.get_commits()
+    cache = ChangelogCache(project / "cache.sqlite3", parser.fingerprint)
+    try:
+        first = list(generate_tree(commits, [], parser, cache))
+        cached = cache.get_entries([commit.rev for commit in commits])
+        assert set(cached) == {commit.rev for commit in commits}
+        assert list(generate_tree(commits, [], parser, cache)) == first
+    finally:
+        cache.close()
+
+
+def test_fingerprint_depends_on_rules(project: Path) -> None:
+    """Verify entries parsed with other rules are not reused."""
+    cz = CommitizenGitmojiCz(config.read_cfg())
+    default = CommitParser(cz).fingerprint
+    assert CommitParser(cz, {"feat": "Features"}).fingerprint != default
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        pytest.param([], id="unchanged"),
+        pytest.param([["commit", "feat: new feature"]], id="new-commit"),
+        pytest.param(
+            [["commit", "fix: new fix"], ["tag", "v1.0.0"]],
+            id="new-tag",
+        ),
+        pytest.param([["tag", "v0.2.0", "HEAD~4"]], id="tag-in-cached-release"),
+        pytest.param([["tag", "-d", "v0.3.0"]], id="deleted-tag"),
+        pytest.param([["tag", "-f", "v0.3.0", "HEAD~1"]], id="moved-tag"),
+        pytest.param([["reset", "-q", "--hard", "HEAD~3"]], id="rewritten-history"),
+    ],
+)
+@pytest.mark.parametrize("stream", [False, True])
+def test_incremental(
+    project: Path, repo: GitRepo, change: List[List[str]], stream: bool
+) -> None:
+    """Verify the changelog is the same with cached releases as without."""
+    cache_path = project / "cache.sqlite3"
+    assert _render(cache_path, stream) == _expected()
+    for args in change:
+        if args[0] == "commit":
+            repo.commit(args[1])
+        else:
+            repo.git(*args)
+    assert _render(cache_path, stream) == _expected()
+
+
+def test_iter_render(project: Path) -> None:
+    """Verify the changelog is rendered one release at a time."""
+    renderer = ChangelogRenderer(config.read_cfg())
+    chunks = list(renderer.iter_render(stream=True))
+    assert len(chunks) == len(git.get_tags())
+    assert "".join(chunks) == _expected()
+
+
+def test_failed_render_keeps_cache(project: Path, repo: GitRepo) -> None:
+    """Verify releases are only cached once the changelog is rendered."""
+    cache_path = project / "cache.sqlite3"
+    _render(cache_path)
+    repo.commit("feat: new feature")
+    repo.git("tag", "v1.0.0")
+    renderer = ChangelogRenderer(config.read_cfg())
+    cache = ChangelogCache(cache_path, renderer.parser.fingerprint)
+    try:
+        next(renderer.iter_render(cache=cache))
+        log = cache.get_release_log(renderer.releases_fingerprint)
+        assert log.tags is not None
+        assert "v1.0.0" not in log.tags
+        assert [release.tag for release in log] == ["v0.5.0", "v0.3.0", "v0.1.0"]
+    finally:
+        cache.close()
+    assert _render(cache_path) == _expected()
+
+
+def test_main(project: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Verify the changelog is written and the cache is kept in git."""
+    main([])
+    assert (project / "CHANGELOG.md").read_text() == _expected()
+    assert (project / ".git" / "cz-gitmoji-changelog.sqlite3").exists()
+    main(["--dry-run", "--no-cache", "--stream"])
+    assert capsys.readouterr().out == _expected()
+
+
+def test_extras_invalidate_releases(project: Path) -> None:
+    """Verify releases rendered with other template extras are not reused."""
+    project.joinpath("release.md.j2").write_text(
+        "{% for release in tree %}## {{ release.version }} {{ suffix }}\n{% endfor %}"
+    )
+    cache_path = project / "cache.sqlite3"
+    for suffix in ("first", "second"):
+        project.joinpath("pyproject.toml").write_text(
+            '[tool.commitizen]\nname = "cz_gitmoji"\ntemplate = "release.md.j2"\n'
+            f'extras = {{ suffix = "{suffix}" }}\n'
+        )
+        assert f"## v0.5.0 {suffix}\n" in _render(cache_path)
@@ -1,9 +1,15 @@
+import re
 from typing import Any, Dict, Optional, Tuple
 
 import pytest
+from commitizen.config import BaseConfig
 from commitizen.cz.exceptions import AnswerRequiredError
 
+from cz_gitmoji import bump
 from cz_gitmoji.main import CommitizenGitmojiCz, parse_scope, parse_subject
+from shared.gitmojis import GitmojiEnum
+from shared.settings import CONVENTIONAL_TYPES
+from shared.shortcodes import get_translator
 from shared.spec import mojis
 
 
@@ -97,3 +103,85 @@ def test_process_commit(cz_gitmoji: CommitizenGitmojiCz) -> None:
     invalid_commit = "This is not a valid commit message"
     processed = cz_gitmoji.process_commit(invalid_commit)
     assert processed == ""
+
+
+def test_schema_pattern_accepts_shortcodes(cz_gitmoji: CommitizenGitmojiCz) -> None:
+    """Verify shortcodes are accepted in place of the icon of the type."""
+    pattern = re.compile(cz_gitmoji.schema_pattern())
+    assert pattern.match(":sparkles: feat(core): a feature")
+    assert pattern.match(":sparkles:  feat: a feature")
+    assert not pattern.match(":bug: feat: a feature")
+    assert cz_gitmoji.process_commit(":bug: fix: a bug") == "a bug"
+
+
+def test_message_gitmoji_format(
+    cz_gitmoji: CommitizenGitmojiCz,
+    messages: Tuple[Dict[str, Any], str],
+) -> None:
+    """Verify the gitmojis of the message are written in the configured format."""
+    answers, expected = messages
+    cz_gitmoji.config.settings["gitmoji_format"] = "code"  # type: ignore[typeddict-unknown-key]
+    message = cz_gitmoji.message(answers)
+    assert message == get_translator().to_codes(expected)
+
+
+@pytest.mark.parametrize(
+    ["message", "increment"],
+    [
+        (":sparkles: feat: a feature", "MINOR"),
+        (":bug: fix(core): a bug", "PATCH"),
+        (":boom: boom: a breaking change", "MAJOR"),
+        (":memo: docs: documentation", None),
+    ],
+)
+def test_bump_shortcodes(message: str, increment: Optional[str]) -> None:
+    """Verify messages with a shortcode bump as those with the icon."""
+    assert (
+        bump.find_increment(
+            [message], CommitizenGitmojiCz.bump_pattern, CommitizenGitmojiCz.bump_map
+        )
+        == increment
+    )
+
+
+def test_changelog_pattern_shortcodes() -> None:
+    """Verify excluded types are excluded with a shortcode too."""
+    pattern = re.compile(CommitizenGitmojiCz.changelog_pattern)
+    assert not pattern.match(":tada: init: initial version")
+    assert pattern.match(":sparkles: feat: a feature")
+
+
+def test_conventional_types_only(config: BaseConfig) -> None:
+    """Verify only the conventional types are offered, accepted and parsed."""
+    config.settings["conventional_types_only"] = True  # type: ignore[typeddict-unknown-key]
+    cz_gitmoji = CommitizenGitmojiCz(config)
+    choices = cz_gitmoji.questions()[0]["choices"]  # type: ignore[typeddict-item]
+    assert len(choices) == len(CONVENTIONAL_TYPES)
+    pattern = re.compile(cz_gitmoji.schema_pattern())
+    assert pattern.match(f"{GitmojiEnum.FEAT} feat: a feature")
+    assert not pattern.match(f"{GitmojiEnum.BOOM} boom: a breaking change")
+    assert cz_gitmoji.commit_parser is not None
+    commit_parser = re.compile(cz_gitmoji.commit_parser)
+    assert commit_parser.match("fix: a fix")
+    assert not commit_parser.match("boom: a breaking change")
+    assert CommitizenGitmojiCz.commit_parser != cz_gitmoji.commit_parser
+
+
+def test_conventional_messages(
+    config: BaseConfig,
+    messages: Tuple[Dict[str, Any], str],
+) -> None:
+    """Verify the gitmoji starts the subject and is validated there."""
+    config.settings["conventional_messages"] = True  # type: ignore[typeddict-unknown-key]
+    cz_gitmoji = CommitizenGitmojiCz(config)
+    answers, _ = messages
+    icon, gtype = answers["prefix"].split(" ")
+    message = cz_gitmoji.message(answers)
+    assert message.startswith(f"{gtype}(")
+    assert f": {icon} {answers['subject']}" in message
+    pattern = re.compile(cz_gitmoji.schema_pattern())
+    assert pattern.match(message)
+    assert not pattern.match(f"{GitmojiEnum.FEAT} feat: a feature")
+    assert (
+        cz_gitmoji.process_commit(message) == message.split(": ", 1)[1].split("\n")[0]
+    )
@@ -0,0 +1,144 @@
+"""Multi-repository report tests."""
+
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from cz_gitmoji.report import (
+    InvalidCommit,
+    main,
+    report_repositories,
+    report_repository,
+)
+from shared.gitmojis import GitmojiEnum as GJ  # noqa: N814
+from tests.conftest import GitRepoFactory
+
+MakeRepo = Callable[..., Path]
+
+
+@pytest.fixture
+def make_repo(git_repo: GitRepoFactory) -> MakeRepo:
+    """Return a factory of repositories released at a version, with new commits."""
+
+    def make(path: Path, version: str, *messages: str) -> Path:
+        repo = git_repo(path)
+        path.joinpath("pyproject.toml").write_text(
+            f'[tool.commitizen]\nname = "cz_gitmoji"\nversion = "{version}"\n'
+        )
+        repo.git("add", "pyproject.toml")
+        repo.git("commit", "-q", "-m", f"{GJ.INIT} init: initial version")
+        repo.git("tag", version)
+        repo.commit(*messages)
+        return path
+
+    return make
+
+
+def test_report_repository(tmp_path: Path, make_repo: MakeRepo) -> None:
+    """Verify the next version, sections and invalid commits are reported."""
+    repo = make_repo(
+        tmp_path / "repo",
+        "1.2.0",
+        f"{GJ.FIX} fix(core): a bug",
+        "feat: a feature",
+        "not conventional",
+        "Merge branch 'main'",
+    )
+    report = report_repository(repo)
+    assert report.error is None
+    assert report.current_version == "1.2.0"
+    assert report.increment == "MINOR"
+    assert report.next_version == "1.3.0"
+    assert list(report.sections) == [
+        f"{GJ.FEAT} Features",
+        f"{GJ.FIX}{GJ.HOTFIX} Fixes",
+    ]
+    (fix,) = report.sections[f"{GJ.FIX}{GJ.HOTFIX} Fixes"]
+    assert fix["scope"] == "core"
+    assert fix["message"] == "a bug"
+    assert [commit.title for commit in report.invalid_commits] == ["not conventional"]
+    assert isinstance(report.invalid_commits[0], InvalidCommit)
+
+
+def test_report_major_version_zero(tmp_path: Path, make_repo: MakeRepo) -> None:
+    """Verify breaking changes only bump the minor version before 1.0.0."""
+    repo = make_repo(tmp_path / "repo", "0.2.0", "feat!: breaking")
+    repo.joinpath("pyproject.toml").write_text(
+        '[tool.commitizen]\nname = "cz_gitmoji"\nversion = "0.2.0"\n'
+        "major_version_zero = true\n"
+    )
+    report = report_repository(repo)
+    assert report.next_version == "0.3.0"
+
+
+def test_report_errors_are_kept(tmp_path: Path, make_repo: MakeRepo) -> None:
+    """Verify a failing repository doesn't stop the others."""
+    repo = make_repo(tmp_path / "repo", "1.0.0")
+    reports = report_repositories([tmp_path / "missing", repo], jobs=1)
+    assert reports[0].error is not None
+    assert reports[1].error is None
+    assert reports[1].increment is None
+    assert reports[1].next_version is None
+
+
+def test_report_repositories_in_parallel(tmp_path: Path, make_repo: MakeRepo) -> None:
+    """Verify the reports of a pool are those of a single process, in order."""
+    repos = [
+        make_repo(tmp_path / f"repo{index}", f"1.{index}.0", f"fix: bug {index}")
+        for index in range(3)
+    ]
+    parallel = report_repositories(repos, jobs=2)
+    assert parallel == report_repositories(repos, jobs=1)
+    assert [report.next_version for report in parallel] == ["1.0.1", "1.1.1", "1.2.1"]
+
+
+def test_main(
+    tmp_path: Path,
+    make_repo: MakeRepo,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Verify the JSON report is written and the changelogs regenerated."""
+    repo = make_repo(tmp_path / "repo", "1.0.0", "feat: a feature")
+    output = tmp_path / "report.json"
+    main([str(repo), "--jobs", "1", "--output", str(output), "--write-changelog"])
+    (report,) = json.loads(output.read_text())["repositories"]
+    assert report["next_version"] == "1.1.0"
+    assert report["changelog"] == str(repo / "CHANGELOG.md")
+    assert "a feature" in (repo / "CHANGELOG.md").read_text()
+    assert capsys.readouterr().out == ""
+
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        main(["missing", "--jobs", "1"])
+    (report,) = json.loads(capsys.readouterr().out)["repositories"]
+    assert report["error"]
+
+
+def test_main_rejects_negative_jobs(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Verify a negative number of jobs is a usage error."""
+    with pytest.raises(SystemExit, match="2"):
+        main([str(tmp_path), "--jobs", "-1"])
+    assert "must be at least 0, not -1" in capsys.readouterr().err
+
+
+def test_report_conventional_messages(tmp_path: Path, make_repo: MakeRepo) -> None:
+    """Verify invalid commits are found in the mode of the project."""
+    repo = make_repo(
+        tmp_path / "repo",
+        "1.0.0",
+        f"feat: {GJ.FEAT} a feature",
+        f"{GJ.FIX} fix: a bug",
+    )
+    repo.joinpath("pyproject.toml").write_text(
+        '[tool.commitizen]\nname = "cz_gitmoji"\nversion = "1.0.0"\n'
+        "conventional_messages = true\n"
+    )
+    report = report_repository(repo)
+    assert [commit.title for commit in report.invalid_commits] == [
+        f"{GJ.FIX} fix: a bug"
+    ]
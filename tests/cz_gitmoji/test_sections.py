@@ -0,0 +1,79 @@
+"""Changelog section lookup tests."""
+
+import pytest
+from commitizen import changelog
+from commitizen.git import GitCommit
+
+from cz_gitmoji.main import CommitizenGitmojiCz
+from cz_gitmoji.sections import SectionTable, get_section_table
+from shared.gitmojis import GitmojiEnum as GJ  # noqa: N814
+from shared.registry import VARIATION_SELECTOR, get_registry
+
+REFACTOR_BARE_ICON = GJ.REFACTOR.value.rstrip(VARIATION_SELECTOR)
+
+
+def test_change_type_map_keys_are_type_groups() -> None:
+    """Verify every key of the change type map is the value of its gitmoji."""
+    spellings = get_registry().spellings
+    for key in CommitizenGitmojiCz.change_type_map:
+        assert spellings[key].value == key
+
+
+@pytest.mark.parametrize(
+    "change_type",
+    [
+        f"{GJ.REFACTOR} refactor",
+        f"{GJ.REFACTOR}  refactor",
+        f"{REFACTOR_BARE_ICON} refactor",
+        f"{REFACTOR_BARE_ICON}  refactor",
+        "refactor",
+    ],
+)
+def test_section(change_type: str) -> None:
+    """Verify every spelling of a type group has the section of its gitmoji."""
+    table = get_section_table(CommitizenGitmojiCz.change_type_map)
+    assert table.normalize(change_type) == f"{GJ.REFACTOR} refactor"
+    assert table.section(change_type) == f"{GJ.REFACTOR} Refactorings"
+
+
+def test_section_keys_of_custom_map() -> None:
+    """Verify spellings are normalized to the keys of the map."""
+    table = SectionTable(
+        {"feat": "Features", "BREAKING CHANGE": "Breaking"}, get_registry()
+    )
+    assert table.normalize(f"{GJ.FEAT}  feat") == "feat"
+    assert table.section(f"{GJ.FEAT} feat") == "Features"
+    assert table.section("BREAKING CHANGE") == "Breaking"
+    # gitmojis without key are normalized to their value
+    assert table.normalize("docs") == f"{GJ.DOCS} docs"
+    assert table.section("unknown") == "unknown"
+
+
+def test_get_section_table_is_cached() -> None:
+    """Verify the table is built once per change type map."""
+    change_type_map = CommitizenGitmojiCz.change_type_map
+    assert get_section_table(change_type_map) is get_section_table(
+        dict(change_type_map)
+    )
+
+
+def test_changelog_groups_spellings(cz_gitmoji: CommitizenGitmojiCz) -> None:
+    """Verify the changelog groups every spelling of a type in one section."""
+    titles = [
+        f"{GJ.PERF} perf: with icon",
+        f"{GJ.PERF.value.rstrip(VARIATION_SELECTOR)} perf: without selector",
+        f"{GJ.PERF}  perf: two spaces",
+        "perf: without icon",
+    ]
+    commits = [GitCommit(rev=str(i), title=title) for i, title in enumerate(titles)]
+    tree = changelog.generate_tree_from_commits(
+        commits,
+        [],
+        cz_gitmoji.commit_parser,
+        cz_gitmoji.changelog_pattern,
+        change_type_map=cz_gitmoji.change_type_map,
+        changelog_message_builder_hook=cz_gitmoji.changelog_message_builder_hook,
+    )
+    (release,) = tree
+    assert list(release["changes"]) == [f"{GJ.PERF} Performance"]
+    assert len(release["changes"][f"{GJ.PERF} Performance"]) == len(titles)
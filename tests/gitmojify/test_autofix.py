@@ -0,0 +1,129 @@
+"""Autofix tests."""
+
+import io
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from gitmojify import autofix
+from shared.gitmojis import GitmojiEnum as GJ  # noqa: N814
+from shared.registry import get_registry
+
+
+@pytest.mark.parametrize(
+    ["message", "rewritten", "rule"],
+    [
+        ("docs: a section", f"{GJ.DOCS} docs: a section", autofix.VALID),
+        (f"{GJ.DOCS} docs: a section", f"{GJ.DOCS} docs: a section", autofix.VALID),
+        ("Fix bug", f"{GJ.FIX} fix: bug", autofix.TYPE),
+        ("feat - add x", f"{GJ.FEAT} feat: add x", autofix.TYPE),
+        ("[FIX] crash on start", f"{GJ.FIX} fix: crash on start", autofix.TYPE),
+        ("Feat!: drop py2\nbody", f"{GJ.FEAT} feat!: drop py2\n\nbody", autofix.TYPE),
+        (":sparkles: add y", f"{GJ.FEAT} feat: add y", autofix.ICON),
+        (f"{GJ.FIX}crash", f"{GJ.FIX} fix: crash", autofix.ICON),
+        (":bug: Fixed crash", f"{GJ.FIX} fix: crash", autofix.ICON),
+        (":bug: Feature flags", f"{GJ.FIX} fix: Feature flags", autofix.ICON),
+        ("Documentation update", f"{GJ.DOCS} docs: update", autofix.ALIAS),
+        ("Fixed(core): null", f"{GJ.FIX} fix(core): null", autofix.INFLECTION),
+        ("refac: cleanup", f"{GJ.REFACTOR} refactor: cleanup", autofix.PREFIX),
+        ("Added support", f"{GJ.FEAT} feat: Added support", autofix.VERB),
+        (f"{GJ.FEAT} fix: wrong icon", f"{GJ.FIX} fix: wrong icon", autofix.CONFLICT),
+    ],
+)
+def test_fix(message: str, rewritten: str, rule: str) -> None:
+    """Verify messages are rewritten by the expected rule."""
+    rewrite = autofix.get_autofixer().fix(message)
+    assert rewrite.ok
+    assert rewrite.rewritten == rewritten
+    assert rewrite.rule == rule
+    assert rewrite.confidence == autofix.CONFIDENCE[rule]
+
+
+@pytest.mark.parametrize("message", ["", "Fix", "random words", "Update readme"])
+def test_fix_no_rule(message: str) -> None:
+    """Verify messages no rule applies to are not rewritten."""
+    rewrite = autofix.get_autofixer().fix(message)
+    assert not rewrite.ok
+    assert rewrite.confidence == 0.0
+
+
+def test_fix_allowed_prefixes() -> None:
+    """Verify messages with an allowed prefix are kept as is."""
+    rewrite = autofix.get_autofixer().fix("Merge branch 'main'", ("Merge",))
+    assert rewrite.rewritten == "Merge branch 'main'"
+    assert rewrite.rule == autofix.ALLOWED
+
+
+def test_build_dispatch_table() -> None:
+    """Verify the most confident rule wins and ambiguous prefixes are dropped."""
+    registry = get_registry()
+    table = autofix.build_dispatch_table(registry)
+    assert table["feat"].name == autofix.TYPE
+    assert table["feature"].name == autofix.ALIAS
+    assert table["features"].name == autofix.INFLECTION
+    assert table[":sparkles:"].gitmoji == registry.by_type["feat"]
+    assert table["refact"].name == autofix.PREFIX
+    # `dep-drop`, `dep-bump`, ...
+    assert "dep" not in table
+    assert not table["added"].consumes
+
+
+def test_dispatch_table_follows_registry() -> None:
+    """Verify rules of types outside the gitmoji set are left out."""
+    table = autofix.build_dispatch_table(get_registry(("fix", "feat")))
+    assert table["bug"].gitmoji.type == "fix"
+    assert "docs" not in table
+    assert "documentation" not in table
+    assert "remove" not in table
+
+
+def test_autofix_many_is_lazy() -> None:
+    """Verify messages are rewritten as they are read."""
+    messages = iter(["fix bug", "feat - x"])
+    rewrites = autofix.autofix_many(messages)
+    assert next(rewrites).rewritten == f"{GJ.FIX} fix: bug"
+    assert next(messages) == "feat - x"
+
+
+def test_main(capsysbinary: pytest.CaptureFixture[bytes]) -> None:
+    """Verify messages are rewritten from stdin and reported on stderr."""
+    stdin = io.TextIOWrapper(io.BytesIO(b"Fix bug\0Added x\0nope\0docs: ok"))
+    with mock.patch.object(sys, "stdin", stdin), pytest.raises(SystemExit):
+        autofix.main(["--min-confidence", "0.6"])
+    captured = capsysbinary.readouterr()
+    assert captured.out.decode().split("\0") == [
+        f"{GJ.FIX} fix: bug",
+        "Added x",
+        "nope",
+        f"{GJ.DOCS} docs: ok",
+        "",
+    ]
+    assert captured.err.decode().splitlines() == [
+        "message 0: type rule (0.90)",
+        "message 1: verb rule not confident enough (0.50)",
+        "message 2: no rule applies",
+        "message 3: valid rule (1.00)",
+    ]
+
+
+def test_main_conventional_messages(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsysbinary: pytest.CaptureFixture[bytes],
+) -> None:
+    """Verify messages are rewritten in the mode of the project."""
+    tmp_path.joinpath(".cz.toml").write_text(
+        '[tool.commitizen]\nname = "cz_gitmoji"\nconventional_messages = true\n'
+    )
+    monkeypatch.chdir(tmp_path)
+    stdin = io.TextIOWrapper(io.BytesIO(f"Fix bug\0docs: ok\0{GJ.FEAT} x".encode()))
+    with mock.patch.object(sys, "stdin", stdin):
+        autofix.main([])
+    assert capsysbinary.readouterr().out.decode().split("\0") == [
+        f"fix: {GJ.FIX} bug",
+        f"docs: {GJ.DOCS} ok",
+        f"feat: {GJ.FEAT} x",
+        "",
+    ]
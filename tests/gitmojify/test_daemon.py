@@ -0,0 +1,122 @@
+"""Daemon and client tests."""
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterator
+from unittest import mock
+
+import pytest
+
+from gitmojify import client, daemon, mojify
+from shared.gitmojis import GitmojiEnum
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Return a project as the working directory, with a short socket path."""
+    tmp_path.joinpath(".git").mkdir()
+    monkeypatch.chdir(tmp_path)
+    # unix socket paths are limited to about a hundred bytes
+    runtime_dir = tempfile.mkdtemp(prefix="gitmojify-")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", runtime_dir)
+    yield tmp_path
+    shutil.rmtree(runtime_dir)
+
+
+@pytest.fixture
+def server(project: Path) -> Iterator[daemon.GitmojifyServer]:
+    """Run the daemon of the project in a thread."""
+    path = client.get_socket_path()
+    os.makedirs(os.path.dirname(path))
+    with daemon.GitmojifyServer(path, os.getcwd()) as gitmojify_server:
+        thread = threading.Thread(
+            target=gitmojify_server.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        thread.start()
+        yield gitmojify_server
+        gitmojify_server.shutdown()
+        thread.join()
+
+
+def test_client_uses_daemon(server: daemon.GitmojifyServer, project: Path) -> None:
+    """Verify the message file is gitmojified by the daemon."""
+    project.joinpath("COMMIT_EDITMSG").write_text("feat: a feature\n# comment\n")
+    with mock.patch.object(mojify, "run", side_effect=AssertionError):
+        client.main(["-f", "COMMIT_EDITMSG"])
+    assert (
+        project.joinpath("COMMIT_EDITMSG").read_text()
+        == f"{GitmojiEnum.FEAT} feat: a feature\n"
+    )
+
+
+def test_daemon_reloads_settings(
+    server: daemon.GitmojifyServer,
+    project: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Verify the settings are reloaded when a config file changes."""
+    client.main(["-m", "feat: a feature"])
+    assert capsys.readouterr().out == f"{GitmojiEnum.FEAT} feat: a feature"
+    project.joinpath(".cz.toml").write_text(
+        '[tool.commitizen]\nname = "cz_gitmoji"\ngitmoji_format = "code"\n'
+    )
+    client.main(["-m", "feat: a feature"])
+    assert capsys.readouterr().out == ":sparkles: feat: a feature"
+
+
+def test_stalled_client_does_not_block(
+    server: daemon.GitmojifyServer,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Verify a client that never finishes its request times out on its own."""
+    monkeypatch.setattr(daemon._Handler, "timeout", 0.05)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+        stalled.connect(client.get_socket_path())
+        with mock.patch.object(mojify, "run", side_effect=AssertionError):
+            client.main(["-m", "feat: a feature"])
+    assert capsys.readouterr().out == f"{GitmojiEnum.FEAT} feat: a feature"
+
+
+@pytest.mark.usefixtures("server")
+def test_client_reports_errors(capsys: pytest.CaptureFixture[str]) -> None:
+    """Verify invalid messages are reported by the client."""
+    with pytest.raises(SystemExit, match="1"):
+        client.main(["-m", "unknown: a change"])
+    assert capsys.readouterr().err == (
+        "invalid commit message: unknown type at offset 0\n"
+    )
+
+
+@pytest.mark.usefixtures("project")
+def test_client_falls_back(capsys: pytest.CaptureFixture[str]) -> None:
+    """Verify the message is gitmojified in process without daemon."""
+    with pytest.raises(OSError):
+        client.request(["-m", "feat: a feature"])
+    client.main(["-m", "feat: a feature"])
+    assert capsys.readouterr().out == f"{GitmojiEnum.FEAT} feat: a feature"
+
+
+def test_daemon_leaves_command_lines_to_client(
+    server: daemon.GitmojifyServer,
+) -> None:
+    """Verify other projects and unsupported command lines are run in process."""
+    assert server.respond("/elsewhere", ["-m", "feat: a"]) == [client.FALLBACK]
+    assert server.respond(server.cwd, ["--help"]) == [client.FALLBACK]
+    assert server.respond(server.cwd, ["--stdin"]) == [client.FALLBACK]
+
+
+def test_serve_refuses_second_daemon(server: daemon.GitmojifyServer) -> None:
+    """Verify a single daemon serves a project."""
+    with pytest.raises(RuntimeError, match="already running"):
+        daemon.serve(client.get_socket_path(), server.cwd)
+
+
+def test_encode_decode() -> None:
+    """Verify fields survive a round trip, the last one may contain NUL bytes."""
+    fields = [client.OK, "utf-8", "", "feat: a\0b"]
+    assert client.decode(client.encode(fields), 3) == fields
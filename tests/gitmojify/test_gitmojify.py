@@ -1,10 +1,16 @@
+import io
+import subprocess
+import sys
 from pathlib import Path
+from typing import List, Optional
 from unittest import mock
 
 import attrs
 import pytest
 
 from gitmojify import mojify
+from shared import settings
+from shared.diagnostics import Diagnostic, Failure, InvalidMessageError
 from shared.gitmojis import GitmojiEnum
 from shared.spec import mojis
 
@@ -55,6 +61,7 @@ def test_run_file(tmp_path: Path, message: str) -> None:
             config=None,
             commit_msg_file=filepath.as_posix(),
             message=None,
+            gitmoji_format=None,
         ),
     ):
         mojify.run()
@@ -65,7 +72,9 @@ def test_run_message(message: str, capsys: pytest.CaptureFixture[str]) -> None:
     """Verify the commit message is modified."""
     with mock.patch(
         "argparse.ArgumentParser.parse_args",
-        return_value=mock.MagicMock(config=None, commit_msg_file=None, message=message),
+        return_value=mock.MagicMock(
+            config=None, commit_msg_file=None, message=message, gitmoji_format=None
+        ),
     ):
         mojify.run()
     captured = capsys.readouterr()
@@ -143,6 +152,7 @@ def test_run_with_allowed_prefixes(tmp_path: Path):
             config=None,
             allowed_prefixes=["custom"],
             convert_prefixes=None,
+            gitmoji_format=None,
         ),
     ):
         mojify.run()
@@ -163,6 +173,7 @@ def test_run_with_convert_prefixes(tmp_path: Path):
             config=None,
             allowed_prefixes=None,
             convert_prefixes=["Merge"],
+            gitmoji_format=None,
         ),
     ):
         mojify.run()
@@ -187,6 +198,7 @@ def test_run_with_options(tmp_path: Path):
                 config="path/to/config",
                 allowed_prefixes=None,
                 convert_prefixes=None,
+                gitmoji_format=None,
             ),
         ),
         mock.patch(
@@ -195,6 +207,9 @@ def test_run_with_options(tmp_path: Path):
                 allowed_prefixes=["custom"],
                 convert_prefixes=["Merge"],
                 encoding="utf-8",
+                gitmoji_format=None,
+                types=None,
+                conventional_messages=False,
             ),
         ),
     ):
@@ -211,6 +226,7 @@ def test_run_with_options(tmp_path: Path):
                 config="path/to/config",
                 allowed_prefixes=None,
                 convert_prefixes=None,
+                gitmoji_format=None,
             ),
         ),
         mock.patch(
@@ -219,6 +235,9 @@ def test_run_with_options(tmp_path: Path):
                 allowed_prefixes=None,
                 convert_prefixes=["Merge"],
                 encoding="utf-8",
+                gitmoji_format=None,
+                types=None,
+                conventional_messages=False,
             ),
         ),
     ):
@@ -280,8 +299,10 @@ def test_gitmojify_with_allowed_prefixes():
 def test_gitmojify_invalid_message():
     """Test gitmojify with an invalid message."""
     message = "invalid commit message"
-    with pytest.raises(ValueError, match="invalid commit message"):
+    with pytest.raises(ValueError, match="invalid commit message") as exc:
         mojify.gitmojify(message)
+    assert isinstance(exc.value, InvalidMessageError)
+    assert exc.value.diagnostic == Diagnostic(Failure.UNKNOWN_TYPE, 0)
 
 
 def test_gitmojify_with_existing_gitmoji():
@@ -289,3 +310,225 @@ def test_gitmojify_with_existing_gitmoji():
     message = "🐛 fix: resolve bug"
     result = mojify.gitmojify(message)
     assert result == message
+
+
+@pytest.mark.parametrize(
+    ["message_in", "gitmoji_format", "message_out"],
+    [
+        (":sparkles: feat: a feature", None, ":sparkles: feat: a feature"),
+        (":sparkles: feat: a feature", "icon", f"{GitmojiEnum.FEAT} feat: a feature"),
+        ("feat: fix :bug:", "code", ":sparkles: feat: fix :bug:"),
+        (
+            f"{GitmojiEnum.FEAT} feat: a feature\n\nwith {GitmojiEnum.PERF}",
+            "code",
+            ":sparkles: feat: a feature\n\nwith :zap:",
+        ),
+        ("feat: a feature", "icon", f"{GitmojiEnum.FEAT} feat: a feature"),
+    ],
+)
+def test_gitmojify_shortcodes(
+    message_in: str, gitmoji_format: Optional[str], message_out: str
+) -> None:
+    """Verify shortcodes are accepted and gitmojis normalized to a format."""
+    assert mojify.gitmojify(message_in, gitmoji_format=gitmoji_format) == message_out
+
+
+def test_gitmojify_shortcode_of_another_type() -> None:
+    """Verify the shortcode must be that of the type."""
+    with pytest.raises(InvalidMessageError) as exc:
+        mojify.gitmojify(":bug: feat: a feature")
+    assert exc.value.diagnostic.failure is Failure.WRONG_ICON
+
+
+@pytest.mark.parametrize(
+    ["message_in", "message_out"],
+    [
+        ("feat: a feature", f"feat: {GitmojiEnum.FEAT} a feature"),
+        ("fix(core)!: a fix\n\nbody", f"fix(core)!: {GitmojiEnum.FIX} a fix\n\nbody"),
+        (f"feat: {GitmojiEnum.FEAT} a feature", f"feat: {GitmojiEnum.FEAT} a feature"),
+        ("feat: :sparkles: a feature", "feat: :sparkles: a feature"),
+    ],
+)
+def test_gitmojify_conventional_messages(message_in: str, message_out: str) -> None:
+    """Verify the gitmoji is put at the start of the subject."""
+    assert mojify.gitmojify(message_in, conventional_messages=True) == message_out
+
+
+def test_gitmojify_conventional_types_only() -> None:
+    """Verify types outside the conventional set are rejected."""
+    types = settings.CONVENTIONAL_TYPES
+    assert (
+        mojify.gitmojify("docs: a doc", types=types)
+        == f"{GitmojiEnum.DOCS} docs: a doc"
+    )
+    with pytest.raises(InvalidMessageError) as exc:
+        mojify.gitmojify("boom: a breaking change", types=types)
+    assert exc.value.diagnostic.failure is Failure.UNKNOWN_TYPE
+
+
+def test_gitmojify_many_is_lazy() -> None:
+    """Verify messages are gitmojified one at a time, in order."""
+    consumed = []
+
+    def messages():
+        for message in ["feat: a", "fix: b"]:
+            consumed.append(message)
+            yield message
+
+    results = mojify.gitmojify_many(messages())
+    assert next(results) == f"{GitmojiEnum.FEAT} feat: a"
+    assert consumed == ["feat: a"]
+    assert list(results) == [f"{GitmojiEnum.FIX} fix: b"]
+
+
+def test_run_stdin(
+    monkeypatch: pytest.MonkeyPatch, capsysbinary: pytest.CaptureFixture[bytes]
+) -> None:
+    """Verify messages are streamed from stdin to stdout."""
+    stdin = io.TextIOWrapper(io.BytesIO(b"feat: a\0invalid\0Merge b\0"))
+    monkeypatch.setattr(sys, "stdin", stdin)
+    args = mock.MagicMock(
+        config=None,
+        commit_msg_file=None,
+        message=None,
+        stdin=True,
+        allowed_prefixes=None,
+        convert_prefixes=["Merge"],
+        jobs=1,
+        chunk_size=mojify.DEFAULT_CHUNK_SIZE,
+        gitmoji_format=None,
+    )
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args", mock.MagicMock(return_value=args)
+    )
+    with pytest.raises(SystemExit, match="1"):
+        mojify.run()
+    captured = capsysbinary.readouterr()
+    assert captured.out.decode().split("\0") == [
+        f"{GitmojiEnum.FEAT} feat: a",
+        "invalid",
+        f"{GitmojiEnum.MERGE} merge: b",
+        "",
+    ]
+    assert b"message 1: invalid commit message" in captured.err
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_gitmojify_parallel(jobs: int) -> None:
+    """Verify results keep the input order and errors are reported per item."""
+    messages = ["feat: a", "invalid", "fix: b"] * 5
+    results = list(mojify.gitmojify_parallel(messages, jobs=jobs, chunk_size=2))
+    assert [result.message for result in results] == messages
+    assert [result.ok for result in results] == [True, False, True] * 5
+    assert results[0].gitmojified == f"{GitmojiEnum.FEAT} feat: a"
+    assert results[1].gitmojified is None
+    assert results[1].error == "invalid commit message: unknown type at offset 0"
+    assert results[2].gitmojified == f"{GitmojiEnum.FIX} fix: b"
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "feat: a",
+        "feat: a\n",
+        "feat: a\n# comment",
+        "feat: a\n# comment\n",
+        "feat: a\n\nbody\n# comment\n\n",
+        f"feat: a\n# {mojify.CUT_LINE}\ndiff\n",
+        f"feat: a\n\n# comment\n# {mojify.CUT_LINE}\n# comment\n",
+    ],
+)
+def test_read_commit_msg_file_filters_comments(tmp_path: Path, content: str) -> None:
+    """Verify the message is read as filtering the whole file would."""
+    filepath = tmp_path / "COMMIT_EDITMSG"
+    filepath.write_text(content, encoding="utf-8")
+    assert mojify.read_commit_msg_file(filepath, "utf-8") == mojify._filter_comments(
+        content
+    )
+
+
+def test_read_commit_msg_file_stops_at_scissors(tmp_path: Path) -> None:
+    """Verify the diff below the scissors line is never read."""
+    filepath = tmp_path / "COMMIT_EDITMSG"
+    # the undecodable byte fails the read if the reader gets past the diff
+    filepath.write_bytes(
+        f"feat: a\n# comment\n# {mojify.CUT_LINE}\n".encode()
+        + b"+line\n" * 200_000
+        + b"\xff\n"
+    )
+    assert mojify.read_commit_msg_file(filepath, "utf-8") == "feat: a"
+
+
+# the instructions `git commit` adds below the message
+INSTRUCTIONS = (
+    "{char} Please enter the commit message for your changes. Lines starting\n"
+    "{char} with '{char}' will be ignored, and an empty message aborts the commit.\n"
+)
+
+
+@pytest.mark.parametrize(
+    ["comment", "content", "expected"],
+    [
+        (";", "feat: a\n\n#1 fixed\n; comment\n", "feat: a\n\n#1 fixed\n"),
+        (";", f"feat: a\n; {mojify.CUT_LINE}\ndiff", "feat: a"),
+        ("//", "feat: a\n// comment\n", "feat: a\n"),
+        (
+            "auto",
+            f"feat: a\n\n#1 fixed\n; comment\n; {mojify.CUT_LINE}\n",
+            "feat: a\n\n#1 fixed",
+        ),
+        (
+            "auto",
+            f"feat: a\n\n#1 fixed\n\n{INSTRUCTIONS.format(char=';')}",
+            "feat: a\n\n#1 fixed\n\n",
+        ),
+        ("auto", f"feat: a\n\n{INSTRUCTIONS.format(char='#')}", "feat: a\n\n"),
+        ("auto", "feat: a\n# comment\n", "feat: a\n"),
+        ("auto", "feat: a\n", "feat: a\n"),
+        ("auto", "feat: run it\n\n$ make test\n", "feat: run it\n\n$ make test\n"),
+        ("auto", "feat: a\n\n:tada: done\n", "feat: a\n\n:tada: done\n"),
+        ("auto", "feat: a\n\n; not a comment", "feat: a\n\n; not a comment"),
+    ],
+)
+def test_read_commit_msg_file_comment(
+    tmp_path: Path, comment: str, content: str, expected: str
+) -> None:
+    """Verify the configured comment string is honored, `auto` included."""
+    filepath = tmp_path / "COMMIT_EDITMSG"
+    filepath.write_text(content, encoding="utf-8")
+    assert mojify.read_commit_msg_file(filepath, "utf-8", comment) == expected
+
+
+def test_get_comment_string(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify the comment string is read from the git config."""
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "gitconfig"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+    assert mojify.get_comment_string() == "#"
+    subprocess.run(
+        ["git", "config", "--global", "core.commentChar", "auto"], check=True
+    )
+    assert mojify.get_comment_string() == "auto"
+    subprocess.run(["git", "config", "core.commentChar", ";"], check=True)
+    assert mojify.get_comment_string() == ";"
+
+
+@pytest.mark.parametrize(["jobs", "chunk_size"], [(2, 0), (2, -1), (1, 0), (-1, 2)])
+def test_gitmojify_parallel_rejects_counts(jobs: int, chunk_size: int) -> None:
+    """Verify no message is silently dropped by an invalid chunk size or job count."""
+    with pytest.raises(ValueError, match="must be at least"):
+        mojify.gitmojify_parallel(["feat: a"], jobs=jobs, chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize(
+    "argv", [["--stdin", "--chunk-size", "0"], ["--stdin", "--jobs", "-1"]]
+)
+def test_get_args_rejects_counts(
+    argv: List[str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Verify the command line rejects chunk sizes below 1 and negative jobs."""
+    with pytest.raises(SystemExit, match="2"):
+        mojify.get_args(argv)
+    assert "must be at least" in capsys.readouterr().err
@@ -0,0 +1,136 @@
+"""Range linter tests."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from gitmojify import lint
+from shared.classifier import get_classifier
+from shared.diagnostics import Diagnostic, Failure
+from shared.gitmojis import GitmojiEnum as GJ  # noqa: N814
+from tests.conftest import GitRepo, GitRepoFactory
+
+
+@pytest.fixture
+def repo(
+    tmp_path: Path, git_repo: GitRepoFactory, monkeypatch: pytest.MonkeyPatch
+) -> GitRepo:
+    """Create a repository with valid and invalid commit messages."""
+    repo = git_repo(tmp_path)
+    repo.commit(
+        f"{GJ.INIT} init: initial version",
+        "feat(core): a feature\n\nWith a body.",
+        "Merge branch 'main'",
+        "unknown: a change",
+        f"{GJ.FIX} fix(core):missing space",
+    )
+    monkeypatch.chdir(tmp_path)
+    return repo
+
+
+def test_lint_message() -> None:
+    """Verify the diagnostic of invalid messages is returned."""
+    classifier = get_classifier()
+    assert lint.lint_message("feat: a feature", classifier) is None
+    assert lint.lint_message("feat:a feature", classifier) == Diagnostic(
+        Failure.MISSING_SUBJECT, 5
+    )
+
+
+def test_lint_message_require_icon() -> None:
+    """Verify messages without gitmoji are only rejected if icons are required."""
+    classifier = get_classifier()
+    assert lint.lint_message(
+        "feat: a feature", classifier, require_icon=True
+    ) == Diagnostic(Failure.MISSING_ICON, 0)
+    assert (
+        lint.lint_message(f"{GJ.FEAT} feat: a feature", classifier, require_icon=True)
+        is None
+    )
+
+
+def test_iter_log(repo: GitRepo) -> None:
+    """Verify the commits are streamed newest first, as commitizen reads them."""
+    log = list(lint.iter_log())
+    assert [sha for sha, _ in log] == repo.git("rev-list", "HEAD").split()
+    assert log[3][1] == "feat(core): a feature\n\nWith a body."
+    assert next(lint.iter_log(["HEAD~1"]))[1] == "unknown: a change"
+    with pytest.raises(subprocess.CalledProcessError):
+        list(lint.iter_log(["missing"]))
+
+
+def test_lint_range(repo: GitRepo) -> None:
+    """Verify every failure is reported with its commit and reason."""
+    summary = lint.lint_range(allowed_prefixes=["Merge"])
+    assert summary.checked == 5
+    assert summary.skipped == 1
+    sha = repo.git("rev-parse", "HEAD").strip()
+    assert summary.failures == [
+        lint.LintFailure(
+            sha,
+            Diagnostic(Failure.MISSING_SUBJECT, 12),
+            f"{GJ.FIX} fix(core):missing space",
+        ),
+        lint.LintFailure(
+            repo.git("rev-parse", "HEAD~1").strip(),
+            Diagnostic(Failure.UNKNOWN_TYPE, 0),
+            "unknown: a change",
+        ),
+    ]
+    assert summary.counts() == {Failure.MISSING_SUBJECT: 1, Failure.UNKNOWN_TYPE: 1}
+    assert lint.lint_range(["HEAD~2"], allowed_prefixes=["Merge"]).ok
+    assert len(lint.lint_range(["HEAD~2"], require_icon=True).failures) == 2
+
+
+def test_main(repo: GitRepo, capsys: pytest.CaptureFixture[str]) -> None:
+    """Verify the failures and a summary are printed, and the exit code."""
+    with pytest.raises(SystemExit) as exc:
+        lint.main(["HEAD~2..HEAD"])
+    assert exc.value.code == 1
+    out, err = capsys.readouterr()
+    head, parent = repo.git("rev-parse", "HEAD", "HEAD~1").split()
+    assert out.splitlines() == [
+        f"{head} missing subject at offset 12: {GJ.FIX} fix(core):missing space",
+        f"{parent} unknown type at offset 0: unknown: a change",
+    ]
+    assert err == (
+        "2 commits checked, 0 skipped, 2 invalid (1 missing subject, 1 unknown type)\n"
+    )
+
+    lint.main(["HEAD~2", "--quiet"])
+    assert capsys.readouterr() == ("", "3 commits checked, 1 skipped, 0 invalid\n")
+
+    with pytest.raises(SystemExit) as exc:
+        lint.main(["missing"])
+    assert exc.value.code == 2
+
+
+@pytest.mark.parametrize("backend", ["parser", "re"])
+def test_main_matcher(
+    repo: GitRepo, capsys: pytest.CaptureFixture[str], backend: str
+) -> None:
+    """Verify every matcher reports the same failures."""
+    with pytest.raises(SystemExit):
+        lint.main(["HEAD~2..HEAD", "--matcher", backend])
+    out, _ = capsys.readouterr()
+    assert [line.split(" ", 1)[1] for line in out.splitlines()] == [
+        f"missing subject at offset 12: {GJ.FIX} fix(core):missing space",
+        "unknown type at offset 0: unknown: a change",
+    ]
+
+
+def test_main_conventional_messages(
+    repo: GitRepo, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Verify the messages are linted in the mode of the project, as `cz check` does."""
+    repo.path.joinpath(".cz.toml").write_text(
+        '[tool.commitizen]\nname = "cz_gitmoji"\nconventional_messages = true\n'
+    )
+    repo.commit(f"{GJ.FEAT} feat: add x", f"feat: {GJ.FEAT} add y")
+    with pytest.raises(SystemExit, match="1"):
+        lint.main(["HEAD~2..HEAD"])
+    out, _ = capsys.readouterr()
+    assert [line.split(" ", 1)[1] for line in out.splitlines()] == [
+        f"unknown type at offset 0: {GJ.FEAT} feat: add x",
+    ]
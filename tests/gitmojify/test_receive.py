@@ -0,0 +1,138 @@
+"""Pre-receive hook tests."""
+
+import contextlib
+import io
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from gitmojify import receive
+from shared.classifier import get_classifier
+from shared.diagnostics import Failure
+from shared.gitmojis import GitmojiEnum as GJ  # noqa: N814
+from tests.conftest import GitRepo, GitRepoFactory
+
+ZERO = "0" * 40
+
+
+@pytest.fixture
+def repo(
+    tmp_path: Path, git_repo: GitRepoFactory, monkeypatch: pytest.MonkeyPatch
+) -> GitRepo:
+    """Create a repository with a valid commit on its main branch."""
+    repo = git_repo(tmp_path / "repo", "-b", "main")
+    repo.commit(f"{GJ.INIT} init: initial version")
+    monkeypatch.chdir(repo.path)
+    return repo
+
+
+def _unreferenced(repo: GitRepo, *messages: str) -> List[str]:
+    """Commit the messages on a branch that is deleted, as pushed objects are."""
+    repo.git("checkout", "-q", "-b", "topic")
+    shas = repo.commit(*messages)
+    repo.git("checkout", "-q", "main")
+    repo.git("branch", "-q", "-D", "topic")
+    return shas
+
+
+def test_parse_updates() -> None:
+    """Verify the hook input is parsed and deletions bring no commits."""
+    updates = receive.parse_updates(
+        [f"{ZERO} {'a' * 40} refs/heads/new\n", f"{'b' * 40} {ZERO} refs/heads/old\n"]
+    )
+    assert [update.ref for update in updates] == ["refs/heads/new", "refs/heads/old"]
+    assert [update.deleted for update in updates] == [False, True]
+
+
+def test_rev_list(repo: GitRepo) -> None:
+    """Verify only the commits new to the repository are listed."""
+    main = repo.git("rev-parse", "HEAD").strip()
+    shas = _unreferenced(repo, "feat: a", "fix: b")
+    updates = [
+        receive.RefUpdate(ZERO, shas[-1], "refs/heads/topic"),
+        receive.RefUpdate(ZERO, main, "refs/heads/copy"),
+        receive.RefUpdate(main, ZERO, "refs/heads/gone"),
+    ]
+    assert receive.rev_list(updates) == shas[::-1]
+
+
+def test_iter_messages(repo: GitRepo) -> None:
+    """Verify messages are read in batch and joined as `git log` does."""
+    shas = _unreferenced(repo, "feat: a\nwrapped\n\n\nbody\n", "fix: b")
+    assert list(receive.iter_messages(shas)) == [
+        (shas[0], "feat: a wrapped\n\nbody"),
+        (shas[1], "fix: b"),
+    ]
+
+
+def test_check_push(repo: GitRepo, tmp_path: Path) -> None:
+    """Verify invalid messages are reported and valid ones are stored."""
+    shas = _unreferenced(repo, "feat: a", "unknown: b", "Merge branch 'c'")
+    updates = [receive.RefUpdate(ZERO, shas[-1], "refs/heads/topic")]
+    with contextlib.closing(
+        receive.ValidatedStore(tmp_path / "store.sqlite", "rules")
+    ) as store:
+        summary = receive.check_push(updates, get_classifier(), ["Merge"], store=store)
+        assert summary.checked == 3
+        assert summary.skipped == 1
+        assert [failure.sha for failure in summary.failures] == [shas[1]]
+        assert summary.failures[0].diagnostic.failure is Failure.UNKNOWN_TYPE
+        assert store.unknown(shas) == [shas[1]]
+
+        summary = receive.check_push(updates, get_classifier(), ["Merge"], store=store)
+        assert summary.checked == 3
+        assert summary.skipped == 2
+        assert len(summary.failures) == 1
+
+
+def test_store_is_keyed_by_ruleset(tmp_path: Path) -> None:
+    """Verify commits validated with other rules are validated again."""
+    path = tmp_path / "store.sqlite"
+    sha = "a" * 40
+    with contextlib.closing(receive.ValidatedStore(path, "rules")) as store:
+        store.add([sha])
+    with contextlib.closing(receive.ValidatedStore(path, "rules")) as store:
+        assert store.unknown([sha]) == []
+    with contextlib.closing(receive.ValidatedStore(path, "other rules")) as store:
+        assert store.unknown([sha]) == [sha]
+
+
+def test_main(
+    repo: GitRepo, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Verify the hook exits with 1 on invalid messages and stores in git dir."""
+    monkeypatch.setenv("GIT_DIR", str(repo.path / ".git"))
+    shas = _unreferenced(repo, "feat: a", "unknown: b")
+    stdin = io.StringIO(f"{ZERO} {shas[-1]} refs/heads/topic\n")
+    with pytest.raises(SystemExit, match="1"):
+        receive.main([], stdin)
+    captured = capsys.readouterr()
+    assert captured.out == f"{shas[1]} unknown type at offset 0: unknown: b\n"
+    assert captured.err == "1 of 2 new commits have invalid messages\n"
+    assert repo.path.joinpath(
+        ".git", "cz-conventional-gitmoji", "validated.sqlite"
+    ).exists()
+
+    receive.main([], io.StringIO(f"{ZERO} {shas[0]} refs/heads/topic\n"))
+
+
+def test_push(repo: GitRepo, git_repo: GitRepoFactory, tmp_path: Path) -> None:
+    """Verify the installed hook rejects a push with an invalid message."""
+    server = tmp_path / "server.git"
+    git_repo(server, "--bare")
+    hook = server / "hooks" / "pre-receive"
+    hook.write_text(
+        f"#!/bin/sh\nexec '{sys.executable}' -c "
+        "'from gitmojify.receive import main; main()'\n"
+    )
+    hook.chmod(0o755)
+    repo.git("remote", "add", "origin", str(server))
+    repo.git("push", "-q", "origin", "main")
+
+    repo.commit("unknown: b")
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        repo.git("push", "-q", "origin", "main")
+    assert "unknown type at offset 0: unknown: b" in exc_info.value.stderr
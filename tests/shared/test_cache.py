@@ -0,0 +1,97 @@
+"""Settings cache tests."""
+
+import os
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+import pytest
+
+from shared import cache, settings
+
+
+@pytest.fixture(name="project")
+def fixture_project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Return a git project as the working directory, with its own cache."""
+    project = tmp_path / "project"
+    project.joinpath(".git").mkdir(parents=True)
+    project.joinpath("pyproject.toml").write_text(
+        '[tool.commitizen]\nallowed_prefixes = ["WIP"]\n'
+    )
+    monkeypatch.chdir(project)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return project
+
+
+def _cache_files() -> List[Path]:
+    """Return the cache files."""
+    return list(cache.get_cache_dir().glob("settings-*.json"))
+
+
+def test_is_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify the cache is opt-in."""
+    monkeypatch.delenv(cache.CACHE_ENV_VAR, raising=False)
+    assert not cache.is_enabled()
+    monkeypatch.setenv(cache.CACHE_ENV_VAR, "1")
+    assert cache.is_enabled()
+
+
+def test_cached_settings(project: Path) -> None:
+    """Verify the settings are read once and then served from the cache."""
+    moji_settings = cache.get_cached_settings()
+    assert moji_settings == settings.get_settings()
+    assert len(_cache_files()) == 1
+
+    with mock.patch.object(cache, "get_settings") as get_settings:
+        cached_settings = cache.get_cached_settings()
+    get_settings.assert_not_called()
+    assert cached_settings == moji_settings
+
+
+def test_cache_invalidated_on_change(project: Path) -> None:
+    """Verify the cache is rebuilt when the config file changes."""
+    cache.get_cached_settings()
+    config = project / "pyproject.toml"
+    config.write_text('[tool.commitizen]\nallowed_prefixes = ["Draft"]\n')
+    # same size and mtime, only the hash changes
+    stat = config.stat()
+    os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    moji_settings = cache.get_cached_settings()
+    assert moji_settings.allowed_prefixes == ["Draft"]
+
+
+def test_cache_invalidated_on_version(project: Path) -> None:
+    """Verify the cache is rebuilt when the package version changes."""
+    cache.get_cached_settings()
+    spy = mock.patch.object(cache, "get_settings", wraps=cache.get_settings)
+    with mock.patch.object(cache, "__version__", "0.0.0"), spy as get_settings:
+        cache.get_cached_settings()
+    get_settings.assert_called_once()
+
+
+def test_corrupt_cache_ignored(project: Path) -> None:
+    """Verify a corrupt cache file is rebuilt."""
+    cache.get_cached_settings()
+    (cache_file,) = _cache_files()
+    cache_file.write_text("{")
+    moji_settings = cache.get_cached_settings()
+    assert moji_settings.allowed_prefixes == ["WIP"]
+    assert cache_file.read_text().startswith("{")
+    assert len(cache_file.read_text()) > 1
+
+
+def test_unwritable_cache_ignored(project: Path) -> None:
+    """Verify failing to write the cache is not an error."""
+    with mock.patch.object(cache, "_write_atomic", side_effect=OSError):
+        moji_settings = cache.get_cached_settings()
+    assert moji_settings.allowed_prefixes == ["WIP"]
+    assert not _cache_files()
+
+
+def test_write_atomic_leaves_no_temp_files(tmp_path: Path) -> None:
+    """Verify the temporary file is renamed into place."""
+    target = tmp_path / "cache" / "file.json"
+    cache._write_atomic(target, "{}")
+    cache._write_atomic(target, "[]")
+    assert target.read_text() == "[]"
+    assert [path.name for path in target.parent.iterdir()] == ["file.json"]
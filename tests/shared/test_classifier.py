@@ -0,0 +1,146 @@
+"""Classifier tests."""
+
+import re
+from typing import Optional
+
+import pytest
+
+from shared.classifier import get_classifier
+from shared.gitmojis import GitmojiEnum
+from shared.registry import VARIATION_SELECTOR
+from shared.utils import get_compiled_pattern, get_type_group_pattern
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "fix: resolve bug",
+        f"{GitmojiEnum.FIX} fix: resolve bug",
+        f"{GitmojiEnum.FIX}  fix(core)!: resolve bug\n\nbody",
+        f"{GitmojiEnum.FIXUP} fixup: squash me",
+        "fix-lint(a)(b): lint\n",
+        "fixup: a\nbody without blank line",
+        f"{GitmojiEnum.FEAT} fix: wrong icon",
+        f"{GitmojiEnum.FIX}   fix: too many spaces",
+        f"{GitmojiEnum.FIX}fix: no space",
+        "fixes: unknown type",
+        "fix:missing space",
+        "fix: ",
+        "fix (core): space before scope",
+        ":bug: fix: shortcode",
+        ":bug:  fix(core)!: shortcode",
+        ":sparkles: fix: shortcode of another type",
+        ":bug:fix: no space",
+        ":unknown: fix: unknown shortcode",
+        "fix: a\n\n",
+        "fix: a\n \n\t",
+        "fix: a\n \nbody after whitespace",
+        "fix: a\r\n",
+        "fix: a\r\n\r\nbody",
+        "fix: a \n\nbody\n\nmore",
+    ],
+)
+def test_classify_matches_pattern(message: str) -> None:
+    """Verify the classifier agrees with the validation pattern."""
+    match = get_compiled_pattern().match(message)
+    parsed = get_classifier().classify(message)
+    if match is None:
+        assert parsed is None
+        return
+    assert parsed is not None
+    assert parsed.type_group == match.group("type_group")
+    assert parsed.scope == match.group("scope")
+    assert parsed.subject == match.group("subject")
+    assert parsed.body == match.group("body")
+
+
+def test_body_is_sliced_on_access() -> None:
+    """Verify the body is kept as an offset into the message."""
+    message = "fix: a bug\n\n" + "body\n" * 1000
+    parsed = get_classifier().classify(message)
+    assert parsed is not None
+    assert parsed.body_start == len("fix: a bug")
+    assert parsed.body == message[parsed.body_start :]
+    assert "body\\n" not in repr(parsed)
+
+
+@pytest.mark.parametrize(
+    ["message", "has_icon"],
+    [("fix: bug", False), (f"{GitmojiEnum.FIX} fix: bug", True)],
+)
+def test_has_icon(message: str, has_icon: bool) -> None:
+    """Verify icons are detected."""
+    parsed = get_classifier().classify(message)
+    assert parsed is not None
+    assert parsed.gitmoji.type == "fix"
+    assert parsed.has_icon is has_icon
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "fix",
+        "fix-lint",
+        "fixup",
+        f"{GitmojiEnum.FIX} fix",
+        f"{GitmojiEnum.FIX}  fix",
+        f"{GitmojiEnum.DEVXP} devxp",
+        f"{GitmojiEnum.FIX} fixup",
+        "fi",
+        "fixups",
+        ":bug: fix",
+        ":bug:  fix",
+        ":sparkles: fix",
+    ],
+)
+def test_type_group_pattern(text: str) -> None:
+    """Verify the factored pattern matches the same type groups."""
+    expected: Optional[re.Match[str]] = re.fullmatch(get_type_group_pattern(), text)
+    actual = re.fullmatch(get_classifier().type_group_pattern, text)
+    assert (actual is None) is (expected is None)
+
+
+def test_get_classifier_keyed_on_types() -> None:
+    """Verify a classifier only knows its gitmoji set."""
+    classifier = get_classifier(("feat",))
+    assert classifier is get_classifier(("feat",))
+    assert classifier.classify("feat: a feature") is not None
+    assert classifier.classify("fix: a fix") is None
+
+
+@pytest.mark.parametrize(
+    ["message", "valid"],
+    [
+        ("feat: a feature", True),
+        (f"feat(core): {GitmojiEnum.FEAT} a feature", True),
+        (f"{GitmojiEnum.FEAT} feat: a feature", False),
+        (":sparkles: feat: a feature", False),
+        ("boom: a breaking change", False),
+    ],
+)
+def test_conventional_messages(message: str, valid: bool) -> None:
+    """Verify the reduced set only accepts the gitmoji in the subject."""
+    types = ("feat", "fix")
+    classifier = get_classifier(types, conventional_messages=True)
+    pattern = get_compiled_pattern(types, conventional_messages=True)
+    assert (classifier.classify(message) is not None) is valid
+    assert (pattern.match(message) is not None) is valid
+    assert re.fullmatch(classifier.type_group_pattern, "feat")
+
+
+@pytest.mark.parametrize(
+    ["text", "matches"],
+    [
+        ("refactor", True),
+        (f"{GitmojiEnum.REFACTOR}  refactor", True),
+        (f"{GitmojiEnum.REFACTOR.value.rstrip(VARIATION_SELECTOR)} refactor", True),
+        (f"{GitmojiEnum.FEAT}{VARIATION_SELECTOR} feat", True),
+        (f"{GitmojiEnum.FEAT} refactor", False),
+        (f"{GitmojiEnum.FEAT}   feat", False),
+    ],
+)
+def test_spelling_pattern(text: str, matches: bool) -> None:
+    """Verify the changelog pattern also matches icon variants."""
+    assert (
+        re.fullmatch(get_classifier().spelling_pattern, text) is not None
+    ) is matches
@@ -0,0 +1,57 @@
+"""Diagnostics tests."""
+
+import pytest
+
+from shared.classifier import get_classifier
+from shared.diagnostics import Diagnostic, Failure, InvalidMessageError
+from shared.gitmojis import GitmojiEnum
+from shared.utils import get_compiled_pattern
+
+
+@pytest.mark.parametrize(
+    ["message", "diagnostic"],
+    [
+        ("", Diagnostic(Failure.EMPTY_MESSAGE, 0)),
+        ("unknown: a change", Diagnostic(Failure.UNKNOWN_TYPE, 0)),
+        (f"{GitmojiEnum.FEAT}feat: no space", Diagnostic(Failure.UNKNOWN_TYPE, 0)),
+        (f"{GitmojiEnum.FIX}   fix: spaces", Diagnostic(Failure.UNKNOWN_TYPE, 3)),
+        (f"{GitmojiEnum.FIX} feat: a feature", Diagnostic(Failure.WRONG_ICON, 0)),
+        ("feat(a b): a feature", Diagnostic(Failure.BAD_SCOPE, 4)),
+        ("feat (core): a feature", Diagnostic(Failure.MISSING_COLON, 4)),
+        ("feat a feature", Diagnostic(Failure.MISSING_COLON, 4)),
+        ("feat(core)! a feature", Diagnostic(Failure.MISSING_COLON, 11)),
+        ("feat:a feature", Diagnostic(Failure.MISSING_SUBJECT, 5)),
+        (
+            f"{GitmojiEnum.FEAT}  feat(core)!: ",
+            Diagnostic(Failure.MISSING_SUBJECT, 15),
+        ),
+        ("feat: a feature\nno blank line", Diagnostic(Failure.BAD_BODY, 15)),
+    ],
+)
+def test_validate_invalid(message: str, diagnostic: Diagnostic) -> None:
+    """Verify the failure is that of the first part of the pattern not matched."""
+    assert get_compiled_pattern().match(message) is None
+    assert get_classifier().validate(message) == diagnostic
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "feat: a feature",
+        f"{GitmojiEnum.FEAT}  feat(core)!: a feature\n\nbody",
+        "fix-lint(a)(b): lint\n",
+    ],
+)
+def test_validate_valid(message: str) -> None:
+    """Verify valid messages are parsed as by `classify`."""
+    parsed = get_classifier().validate(message)
+    assert not isinstance(parsed, Diagnostic)
+    assert parsed == get_classifier().classify(message)
+
+
+def test_invalid_message_error() -> None:
+    """Verify the error carries the diagnostic and is a `ValueError`."""
+    error = InvalidMessageError(Diagnostic(Failure.MISSING_COLON, 4))
+    assert isinstance(error, ValueError)
+    assert error.diagnostic.failure is Failure.MISSING_COLON
+    assert str(error) == "invalid commit message: missing colon at offset 4"
@@ -0,0 +1,87 @@
+"""Git output streaming tests."""
+
+import io
+import subprocess
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from shared import gitlog
+from tests.conftest import GitRepo, GitRepoFactory
+
+
+@pytest.fixture
+def repo(
+    tmp_path: Path, git_repo: GitRepoFactory, monkeypatch: pytest.MonkeyPatch
+) -> GitRepo:
+    """Create a repository with a few commits as the working directory."""
+    repo = git_repo(tmp_path)
+    repo.commit("feat: a", "fix: b", "docs: c")
+    monkeypatch.chdir(tmp_path)
+    return repo
+
+
+@pytest.fixture
+def processes(monkeypatch: pytest.MonkeyPatch) -> List[subprocess.Popen[bytes]]:
+    """Record the processes started by the module."""
+    started: List[subprocess.Popen[bytes]] = []
+    popen = subprocess.Popen
+
+    def record(*args: object, **kwargs: object) -> subprocess.Popen[bytes]:
+        process = popen(*args, **kwargs)  # type: ignore[call-overload]
+        started.append(process)
+        return process
+
+    monkeypatch.setattr(subprocess, "Popen", record)
+    return started
+
+
+def test_read_messages() -> None:
+    """Verify NUL-separated messages are split across chunk boundaries."""
+    stream = io.BytesIO("feat: a\0fix: ✨\n\nbody\0docs: c".encode())
+    messages = list(gitlog.read_messages(stream, "utf-8", chunk_size=3))
+    assert messages == ["feat: a", "fix: ✨\n\nbody", "docs: c"]
+
+
+def test_read_messages_errors() -> None:
+    """Verify undecodable bytes are handled as requested."""
+    stream = io.BytesIO(b"feat: \xff\0")
+    assert list(gitlog.read_messages(stream, "utf-8", errors="replace")) == ["feat: �"]
+    with pytest.raises(UnicodeDecodeError):
+        list(gitlog.read_messages(io.BytesIO(b"feat: \xff\0"), "utf-8"))
+
+
+def test_iter_git_log(repo: GitRepo) -> None:
+    """Verify a record is streamed per commit, newest first."""
+    records = list(gitlog.iter_git_log(["--format=%s"], chunk_size=4))
+    assert records == ["docs: c", "fix: b", "feat: a"]
+
+
+def test_iter_git_log_error(repo: GitRepo) -> None:
+    """Verify git errors are raised with the output of git."""
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        list(gitlog.iter_git_log(["unknown-revision"]))
+    assert b"unknown-revision" in exc_info.value.stderr
+
+
+def test_iter_git_log_stops_early(
+    repo: GitRepo, processes: List[subprocess.Popen[bytes]]
+) -> None:
+    """Verify git is stopped and reaped when the records are not all read."""
+    records = gitlog.iter_git_log(["--format=%s"], chunk_size=1)
+    assert next(records) == "docs: c"
+    records.close()
+    (process,) = processes
+    assert process.returncode is not None
+    assert process.stdout is not None and process.stdout.closed
+
+
+def test_git_output_left_early(
+    repo: GitRepo, processes: List[subprocess.Popen[bytes]]
+) -> None:
+    """Verify leaving the block before the end of the output is not an error."""
+    with gitlog.git_output(["log", "--format=%s"]) as stdout:
+        assert stdout.readline() == b"docs: c\n"
+    (process,) = processes
+    assert process.returncode is not None
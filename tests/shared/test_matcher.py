@@ -0,0 +1,96 @@
+"""Matcher backend tests."""
+
+import random
+from typing import List
+
+import pytest
+
+from shared import matcher
+from shared.classifier import TypeClassifier, get_classifier
+from shared.gitmojis import GitmojiEnum
+
+BACKENDS = [
+    matcher.PARSER,
+    matcher.RE,
+    pytest.param(
+        matcher.RE2,
+        marks=pytest.mark.skipif(matcher.re2 is None, reason="needs google-re2"),
+    ),
+]
+MESSAGES = [
+    "",
+    "feat: a feature",
+    f"{GitmojiEnum.FEAT}  feat(core)!: a feature\n\nbody\n\nfooter",
+    ":sparkles: feat: a shortcode",
+    f"{GitmojiEnum.FIX} feat: wrong icon",
+    "fix-lint(a)(b): lint\n",
+    "feat(a b): bad scope",
+    "feat:no space",
+    "feat: a\nno blank line",
+    "feat: a\n \n\t",
+    "feat: a\r\n\r\nbody",
+]
+# fragments of commit messages, mixed at random into inputs for the matchers
+FRAGMENTS = [
+    "feat",
+    "fix",
+    f"{GitmojiEnum.FEAT}",
+    ":sparkles:",
+    " ",
+    "  ",
+    "(",
+    ")",
+    "(core)",
+    "!",
+    ":",
+    ": ",
+    "subject",
+    "\n",
+    "\n\n",
+    "\r",
+    "\t",
+]
+
+
+def _random_messages(count: int) -> List[str]:
+    """Return messages made of random fragments, the same on every run."""
+    rng = random.Random(0)
+    return ["".join(rng.choices(FRAGMENTS, k=rng.randint(1, 12))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_agree(backend: str) -> None:
+    """Verify every backend parses and rejects messages as the parser does."""
+    classifier = get_classifier()
+    backend_matcher = matcher.get_matcher(backend)
+    for message in MESSAGES + _random_messages(2000):
+        assert backend_matcher.validate(message) == classifier.validate(message)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_follow_gitmoji_set(backend: str) -> None:
+    """Verify the matcher only accepts the types of its gitmoji set."""
+    backend_matcher = matcher.get_matcher(backend, ("feat",), True)
+    assert backend_matcher is matcher.get_matcher(backend, ("feat",), True)
+    assert backend_matcher.classify(f"feat: {GitmojiEnum.FEAT} a feature")
+    assert backend_matcher.classify(f"{GitmojiEnum.FEAT} feat: a feature") is None
+    assert backend_matcher.classify("fix: a fix") is None
+
+
+def test_default_is_parser() -> None:
+    """Verify the classifier is the default matcher."""
+    assert isinstance(matcher.get_matcher(), TypeClassifier)
+    assert isinstance(matcher.get_matcher(matcher.RE), matcher.PatternMatcher)
+
+
+def test_unknown_backend() -> None:
+    """Verify unknown backends are rejected."""
+    with pytest.raises(ValueError, match="unknown matcher: pcre"):
+        matcher.get_matcher("pcre")
+
+
+def test_re2_missing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify the re2 backend reports the missing package."""
+    monkeypatch.setattr(matcher, "re2", None)
+    with pytest.raises(ValueError, match="google-re2"):
+        matcher.get_matcher(matcher.RE2, ("docs",))
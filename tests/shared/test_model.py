@@ -0,0 +1,42 @@
+"""Gitmoji model tests."""
+
+import sys
+
+import attrs
+
+from shared.model import Gitmoji
+
+
+def _gitmoji() -> Gitmoji:
+    """Return a gitmoji built from non-interned strings."""
+    return Gitmoji(
+        type="-feat"[1:],
+        icon="✨",
+        code=":sparkles:",
+        desc="Introduce new features.",
+    )
+
+
+def test_derived_strings() -> None:
+    """Verify the derived strings are precomputed."""
+    moji = _gitmoji()
+    assert moji.value == "✨ feat"
+    assert moji.name == "✨ feat: Introduce new features."
+    assert moji.pattern == "((?:✨|:sparkles:) {1,2})?feat"
+    assert moji.value is moji.value
+
+
+def test_strings_are_interned() -> None:
+    """Verify equal gitmojis share their strings."""
+    moji, other = _gitmoji(), _gitmoji()
+    assert moji.type is sys.intern("feat")
+    assert moji.value is other.value
+    assert moji.name is other.name
+
+
+def test_equality_ignores_derived_strings() -> None:
+    """Verify gitmojis compare and hash by their defining fields."""
+    moji = _gitmoji()
+    assert moji == _gitmoji()
+    assert hash(moji) == hash(_gitmoji())
+    assert attrs.evolve(moji, type="fix").value == "✨ fix"
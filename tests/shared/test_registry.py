@@ -0,0 +1,84 @@
+"""Gitmoji registry tests."""
+
+from typing import Optional
+
+import pytest
+
+from shared.gitmojis import GitmojiEnum
+from shared.registry import VARIATION_SELECTOR, GitmojiRegistry, get_registry
+from shared.spec import mojis
+
+
+def test_registry_indexes() -> None:
+    """Verify every gitmoji can be looked up by each of its keys."""
+    registry = get_registry()
+    assert len(registry) == len(mojis)
+    for moji in registry:
+        assert registry.by_type[moji.type] is moji
+        assert registry.by_icon[moji.icon] is moji
+        assert registry.by_code[moji.code] is moji
+
+
+def test_registry_enum_lookup() -> None:
+    """Verify every enum member maps to its gitmoji."""
+    registry = get_registry()
+    for member in GitmojiEnum:
+        moji = registry.from_enum(member)
+        assert moji.icon == member.value
+        assert registry.by_name[member.name] is moji
+    assert registry.by_name["FIX_LINT"].type == "fix-lint"
+
+
+def test_get_registry_is_cached() -> None:
+    """Verify the registry is built once per gitmoji set."""
+    assert get_registry() is get_registry()
+    assert get_registry(("feat", "fix")) is get_registry(("feat", "fix"))
+
+
+def test_get_registry_subset() -> None:
+    """Verify a subset shares the gitmojis of the full registry."""
+    registry = get_registry(("feat", "fix"))
+    assert registry.types == ("feat", "fix")
+    assert registry.by_type["feat"] is get_registry().by_type["feat"]
+    assert "docs" not in registry.by_type
+    assert list(registry.by_name) == ["FIX", "FEAT"]
+    with pytest.raises(KeyError):
+        registry.from_enum(GitmojiEnum.DOCS)
+
+
+def test_get_registry_unknown_type() -> None:
+    """Verify unknown types are rejected."""
+    with pytest.raises(KeyError):
+        get_registry(("unknown",))
+
+
+def test_registry_from_gitmojis() -> None:
+    """Verify a registry can be built from any gitmojis."""
+    registry = GitmojiRegistry(list(get_registry())[:3])
+    assert len(registry) == 3
+    assert registry.types == get_registry().types[:3]
+
+
+@pytest.mark.parametrize(
+    ["spelling", "expected"],
+    [
+        ("refactor", "refactor"),
+        (f"{GitmojiEnum.REFACTOR} refactor", "refactor"),
+        (f"{GitmojiEnum.REFACTOR}  refactor", "refactor"),
+        (
+            f"{GitmojiEnum.REFACTOR.value.rstrip(VARIATION_SELECTOR)} refactor",
+            "refactor",
+        ),
+        (f"{GitmojiEnum.FEAT}{VARIATION_SELECTOR} feat", "feat"),
+        (f"{GitmojiEnum.DEVXP} devxp", "devxp"),
+        (":recycle:  refactor", "refactor"),
+        (f"{GitmojiEnum.FEAT} fix", None),
+        (":sparkles: fix", None),
+        (f"{GitmojiEnum.FEAT}   feat", None),
+        (f"{GitmojiEnum.FEAT}feat", None),
+    ],
+)
+def test_registry_spellings(spelling: str, expected: Optional[str]) -> None:
+    """Verify type groups are found whatever the icon variant and spacing."""
+    moji = get_registry().spellings.get(spelling)
+    assert (moji.type if moji else None) == expected
@@ -0,0 +1,120 @@
+"""Settings tests."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from commitizen.exceptions import ConfigFileNotFound
+
+from shared import settings
+
+
+@pytest.fixture(name="project")
+def fixture_project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Return an empty git project as the working directory."""
+    tmp_path.joinpath(".git").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_read_pyproject(project: Path) -> None:
+    """Verify the commitizen section of pyproject.toml is read."""
+    project.joinpath("pyproject.toml").write_text(
+        '[tool.commitizen]\nallowed_prefixes = ["WIP"]\nencoding = "latin-1"\n'
+    )
+    moji_settings = settings.get_settings()
+    assert moji_settings.allowed_prefixes == ["WIP"]
+    assert moji_settings.convert_prefixes == settings.DEFAULT_CONVERT_PREFIXES
+    assert moji_settings.encoding == "latin-1"
+
+
+def test_read_json_before_pyproject(project: Path) -> None:
+    """Verify config files are looked up in the order commitizen uses."""
+    project.joinpath("pyproject.toml").write_text(
+        '[tool.commitizen]\nallowed_prefixes = ["WIP"]\n'
+    )
+    project.joinpath(".cz.json").write_text(
+        json.dumps({"commitizen": {"convert_prefixes": ["Merge"]}})
+    )
+    moji_settings = settings.get_settings()
+    assert moji_settings.allowed_prefixes == settings.DEFAULT_ALLOWED_PREFIXES
+    assert moji_settings.convert_prefixes == ["Merge"]
+
+
+def test_read_git_root(project: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify the config file at the root of the git project is found."""
+    project.joinpath("cz.toml").write_text(
+        '[tool.commitizen]\nallowed_prefixes = ["WIP"]\n'
+    )
+    subdir = project.joinpath("sub")
+    subdir.mkdir()
+    monkeypatch.chdir(subdir)
+    assert settings.get_settings().allowed_prefixes == ["WIP"]
+
+
+@pytest.mark.usefixtures("project")
+def test_defaults() -> None:
+    """Verify the defaults are used without config file."""
+    moji_settings = settings.get_settings()
+    assert moji_settings.allowed_prefixes == settings.DEFAULT_ALLOWED_PREFIXES
+    assert moji_settings.encoding == settings.DEFAULT_ENCODING
+
+
+def test_yaml_falls_back_to_commitizen(project: Path) -> None:
+    """Verify commitizen reads the config files we can't read."""
+    project.joinpath(".cz.yaml").write_text("commitizen:\n  encoding: latin-1\n")
+    with mock.patch.object(
+        settings,
+        "_read_commitizen_settings",
+        return_value={"allowed_prefixes": [], "encoding": "latin-1"},
+    ) as read_commitizen_settings:
+        assert settings.get_settings().encoding == "latin-1"
+    read_commitizen_settings.assert_called_once_with(None)
+
+
+@pytest.mark.usefixtures("project")
+def test_missing_file_raises() -> None:
+    """Verify commitizen reports a missing config file."""
+    with pytest.raises(ConfigFileNotFound):
+        settings.get_settings("missing.toml")
+
+
+def test_commitizen_not_imported() -> None:
+    """Verify reading the settings doesn't import commitizen."""
+    code = (
+        "import sys; from gitmojify import mojify; mojify.get_settings(); "
+        "print('commitizen' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_commitizen_not_imported_with_tomli() -> None:
+    """Verify `tomli` reads the settings where `tomllib` is missing."""
+    # `tomli` is only installed before Python 3.11, it is the same parser
+    setup = (
+        "import tomllib; sys.modules['tomli'] = tomllib; sys.modules['tomllib'] = None"
+        if sys.version_info >= (3, 11)
+        else "sys.modules['tomllib'] = None"
+    )
+    code = (
+        f"import sys; {setup}; from gitmojify import mojify; "
+        "print(mojify.get_settings().encoding, 'commitizen' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    assert result.stdout.strip() == "utf-8 False"
+
+
+def test_types() -> None:
+    """Verify only the conventional types are active when configured."""
+    moji_settings = settings.MojiSettings(allowed_prefixes=[], encoding="utf-8")
+    assert moji_settings.types is None
+    moji_settings.conventional_types_only = True
+    assert moji_settings.types == settings.CONVENTIONAL_TYPES
@@ -0,0 +1,46 @@
+"""Shortcode translation tests."""
+
+import pytest
+
+from shared.gitmojis import GitmojiEnum
+from shared.registry import VARIATION_SELECTOR, get_registry
+from shared.shortcodes import ShortcodeTranslator, get_translator
+
+
+def test_round_trip() -> None:
+    """Verify every gitmoji is translated both ways."""
+    translator = get_translator()
+    for moji in get_registry():
+        assert translator.to_icons(f"a {moji.code} b") == f"a {moji.icon} b"
+        assert translator.to_codes(f"a {moji.icon} b") == f"a {moji.code} b"
+
+
+@pytest.mark.parametrize(
+    ["text", "codes"],
+    [
+        ("plain ascii text", "plain ascii text"),
+        (f"{GitmojiEnum.PERF.value.rstrip(VARIATION_SELECTOR)} perf", ":zap: perf"),
+        (f"{GitmojiEnum.FEAT}{VARIATION_SELECTOR}{GitmojiEnum.FIX}", ":sparkles::bug:"),
+        (f"{GitmojiEnum.DEVXP} and ü", ":technologist: and ü"),
+    ],
+)
+def test_to_codes(text: str, codes: str) -> None:
+    """Verify icon variants and sequences are translated in a single scan."""
+    assert get_translator().to_codes(text) == codes
+
+
+def test_to_icons_keeps_unknown_shortcodes() -> None:
+    """Verify unknown shortcodes and lone colons are kept."""
+    text = ":unknown: a: b :bug::"
+    assert get_translator().to_icons(text) == f":unknown: a: b {GitmojiEnum.FIX}:"
+
+
+def test_normalize() -> None:
+    """Verify the text is written in the requested format."""
+    translator = ShortcodeTranslator(get_registry(("feat",)))
+    assert (
+        translator.normalize(":sparkles: :bug:", "icon") == f"{GitmojiEnum.FEAT} :bug:"
+    )
+    assert translator.normalize(":sparkles:", None) == ":sparkles:"
+    with pytest.raises(ValueError, match="unknown gitmoji format"):
+        translator.normalize(":sparkles:", "emoji")
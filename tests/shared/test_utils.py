@@ -0,0 +1,37 @@
+"""Shared utils tests."""
+
+import re
+
+from shared import utils
+from shared.spec import mojis
+
+
+def test_get_gitmojis_subset() -> None:
+    """Verify a subset of gitmojis is returned in the requested order."""
+    gitmojis = utils.get_gitmojis(("feat", "fix"))
+    assert [moji.type for moji in gitmojis] == ["feat", "fix"]
+    assert len(utils.get_gitmojis()) == len(mojis)
+
+
+def test_get_compiled_pattern_is_cached() -> None:
+    """Verify the compiled pattern is built once and reused."""
+    pattern = utils.get_compiled_pattern()
+    assert isinstance(pattern, re.Pattern)
+    assert pattern is utils.get_compiled_pattern()
+    assert pattern.pattern == utils.get_pattern()
+
+
+def test_get_compiled_pattern_keyed_on_types() -> None:
+    """Verify each gitmoji set gets its own pattern."""
+    pattern = utils.get_compiled_pattern(("feat", "fix"))
+    assert pattern is not utils.get_compiled_pattern()
+    assert pattern.match("feat: a feature")
+    assert pattern.match("docs: some docs") is None
+
+
+def test_get_pattern_conventional_messages() -> None:
+    """Verify the type group is the bare type with conventional messages."""
+    assert utils.get_type_group_pattern(("feat", "fix"), True) == "feat|fix"
+    pattern = utils.get_compiled_pattern(("feat", "fix"), True)
+    assert pattern is utils.get_compiled_pattern(("feat", "fix"), True)
+    assert pattern is not utils.get_compiled_pattern(("feat", "fix"))